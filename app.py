@@ -1,28 +1,76 @@
 from flask import Flask
 from models import db
+from models.search import install_search_indexes
 from routes.auth_routes import auth_bp
 from routes.user_routes import user_bp
 from routes.accounting_routes import accounting_bp
 from routes.invoice_routes import invoice_bp
 from routes.transaction_routes import transaction_bp
+from routes.customer_routes import customer_bp
+from services.overdue_sweeper import start_overdue_sweeper
+from services.replication_service import start_replica_jobs
+from utils.engine import ENGINE_SETTING_KEYS, init_engine
+from utils.metrics import init_metrics
+from utils.profiling import init_profiling
+from utils.query_stats import init_query_stats
+from utils.replica import init_replica
+from utils.schema import ensure_indexes
+from utils.slow_queries import init_slow_query_log
 import os
 
 app = Flask(__name__)
 
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or 'sqlite:///accounting.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['DB_ENGINE_PROFILE'] = os.environ.get('DB_ENGINE_PROFILE', 'production')
+app.config.update({key: os.environ[key] for key in ENGINE_SETTING_KEYS[1:] if key in os.environ})
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
+app.config['DASHBOARD_CACHE_TTL'] = int(os.environ.get('DASHBOARD_CACHE_TTL', 30))
+app.config['BULK_INSERT_CHUNK_SIZE'] = int(os.environ.get('BULK_INSERT_CHUNK_SIZE', 1000))
+app.config['BULK_MAX_ROWS'] = int(os.environ.get('BULK_MAX_ROWS', 50000))
+app.config['OVERDUE_GRACE_DAYS'] = int(os.environ.get('OVERDUE_GRACE_DAYS', 30))
+app.config['OVERDUE_SWEEP_INTERVAL'] = int(os.environ.get('OVERDUE_SWEEP_INTERVAL', 0))
+if os.environ.get('REPLICA_DATABASE_URL'):
+    app.config['SQLALCHEMY_BINDS'] = {'replica': os.environ['REPLICA_DATABASE_URL']}
+app.config['REPLICA_MAX_LAG'] = float(os.environ.get('REPLICA_MAX_LAG', 30))
+app.config['REPLICA_LAG_CHECK_INTERVAL'] = float(os.environ.get('REPLICA_LAG_CHECK_INTERVAL', 1))
+app.config['REPLICA_HEARTBEAT_INTERVAL'] = int(os.environ.get('REPLICA_HEARTBEAT_INTERVAL', 5))
+app.config['REPLICA_SYNC_INTERVAL'] = int(os.environ.get('REPLICA_SYNC_INTERVAL', 0))
+app.config['QUERY_STATS_ENABLED'] = os.environ.get('QUERY_STATS_ENABLED', 'true').lower() in ('1', 'true', 'yes', 'on')
+app.config['QUERY_REPEAT_THRESHOLD'] = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 5))
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+app.config['SLOW_QUERY_THRESHOLD_MS'] = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+app.config['SLOW_QUERY_LOG_SIZE'] = int(os.environ.get('SLOW_QUERY_LOG_SIZE', 100))
+app.config['SLOW_QUERY_EXPLAIN'] = os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() in ('1', 'true', 'yes', 'on')
+app.config['PROFILE_HISTORY_SIZE'] = int(os.environ.get('PROFILE_HISTORY_SIZE', 20))
+app.config['PROFILE_TOP_FUNCTIONS'] = int(os.environ.get('PROFILE_TOP_FUNCTIONS', 30))
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+app.config['PASSWORD_HASH_QUEUE_LIMIT'] = int(os.environ.get('PASSWORD_HASH_QUEUE_LIMIT', 64))
+app.config['PASSWORD_HASH_TIMEOUT'] = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
 
-db.init_app(app)
+init_engine(app, db)
+init_replica(app, db)
+init_query_stats(app)
+init_metrics(app)
+init_slow_query_log(app, db)
+init_profiling(app)
 
 app.register_blueprint(auth_bp)
 app.register_blueprint(user_bp)
 app.register_blueprint(accounting_bp)
 app.register_blueprint(invoice_bp)
 app.register_blueprint(transaction_bp)
+app.register_blueprint(customer_bp)
 
 with app.app_context():
     db.create_all()
+    ensure_indexes(db.engine, db.metadata)
+    with db.engine.begin() as connection:
+        install_search_indexes(connection)
+
+start_overdue_sweeper(app)
+start_replica_jobs(app)
 
 @app.route('/')
 def hello_world():
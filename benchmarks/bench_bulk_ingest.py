@@ -0,0 +1,75 @@
+"""
+Bulk transaction ingestion benchmark
+
+Compares importing a bank feed one TransactionService.create_transaction
+call at a time (one invoice lookup and one commit per row) with a single
+TransactionService.create_transactions_bulk call.
+
+Usage:
+    python -m benchmarks.bench_bulk_ingest [size ...]
+"""
+import os
+import random
+import sys
+import time
+from benchmarks.common import create_benchmark_app, seed_ledger
+from services.transaction_service import TransactionService
+
+YEAR = 2024
+INVOICE_COUNT = 1000
+DEFAULT_SIZES = [1000, 10000, 50000]
+MAX_PER_ROW_SIZE = 10000
+
+
+def make_feed(size, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            'invoice_id': rng.randint(1, INVOICE_COUNT),
+            'amount': round(rng.uniform(10, 5000), 2),
+            'date': f'{YEAR}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+            'type': 'income' if rng.random() < 0.6 else 'expense'
+        }
+        for _ in range(size)
+    ]
+
+
+def timed(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+def main(sizes):
+    print(f"{'rows':>8}  {'per row (ms)':>12}  {'bulk (ms)':>10}  {'speedup':>8}")
+
+    for size in sizes:
+        feed = make_feed(size)
+        timings = []
+
+        for bulk in (False, True):
+            if not bulk and size > MAX_PER_ROW_SIZE:
+                timings.append(None)
+                continue
+
+            app, database_path = create_benchmark_app()
+            try:
+                seed_ledger(app, 0, YEAR, invoice_count=INVOICE_COUNT)
+
+                with app.app_context():
+                    if bulk:
+                        timings.append(timed(lambda: TransactionService.create_transactions_bulk(feed)))
+                    else:
+                        timings.append(timed(lambda: [TransactionService.create_transaction(**row) for row in feed]))
+            finally:
+                os.unlink(database_path)
+
+        per_row, bulk = timings
+        if per_row is None:
+            print(f"{size:>8}  {'-':>12}  {bulk * 1000:>10.1f}  {'-':>8}")
+        else:
+            print(f"{size:>8}  {per_row * 1000:>12.1f}  {bulk * 1000:>10.1f}  {per_row / bulk:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,92 @@
+"""
+Engine profile concurrency benchmark
+
+Runs reader threads listing transactions and searching invoices while one
+writer thread keeps inserting transactions, once per engine profile. In
+the default rollback-journal mode every commit locks readers out; in WAL
+mode (production profile) readers keep going while the writer commits.
+
+Usage:
+    python -m benchmarks.bench_engine_profiles [readers ...]
+"""
+import os
+import sys
+import threading
+import time
+from benchmarks.common import create_benchmark_app, seed_ledger
+from services.invoice_service import InvoiceService
+from services.transaction_service import TransactionService
+
+YEAR = 2024
+SEED_TRANSACTIONS = 50000
+DURATION = 5.0
+DEFAULT_READERS = [1, 4, 16]
+PROFILES = ['default', 'production']
+
+
+def run_workload(app, readers):
+    stop = threading.Event()
+    read_latencies = []
+    writes = []
+    errors = []
+    lock = threading.Lock()
+
+    def reader(index):
+        with app.app_context():
+            while not stop.is_set():
+                started = time.perf_counter()
+                if index % 2:
+                    result = InvoiceService.get_invoices_by_status('pending', include_total=False)
+                else:
+                    result = TransactionService.get_all_transactions(include_total=False)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if result['success']:
+                        read_latencies.append(elapsed)
+                    else:
+                        errors.append(result['message'])
+
+    def writer():
+        with app.app_context():
+            while not stop.is_set():
+                result = TransactionService.create_transaction(1, 10.0, f'{YEAR}-06-01', 'income')
+                with lock:
+                    if result['success']:
+                        writes.append(1)
+                    else:
+                        errors.append(result['message'])
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    read_latencies.sort()
+    p95 = read_latencies[int(len(read_latencies) * 0.95)] if read_latencies else 0.0
+    p99 = read_latencies[int(len(read_latencies) * 0.99)] if read_latencies else 0.0
+    return len(read_latencies) / DURATION, p95, p99, len(writes) / DURATION, len(errors)
+
+
+def main(reader_counts):
+    print(f"{'profile':>10}  {'readers':>7}  {'reads/s':>8}  {'p95 (ms)':>9}  {'p99 (ms)':>9}  {'writes/s':>8}  {'errors':>6}")
+
+    for readers in reader_counts:
+        for profile in PROFILES:
+            app, database_path = create_benchmark_app(profile=profile)
+            try:
+                seed_ledger(app, SEED_TRANSACTIONS, YEAR)
+                reads, p95, p99, writes, errors = run_workload(app, readers)
+                print(f"{profile:>10}  {readers:>7}  {reads:>8.1f}  {p95 * 1000:>9.1f}  {p99 * 1000:>9.1f}  "
+                      f"{writes:>8.1f}  {errors:>6}")
+            finally:
+                for suffix in ('', '-wal', '-shm'):
+                    if os.path.exists(database_path + suffix):
+                        os.unlink(database_path + suffix)
+
+
+if __name__ == '__main__':
+    main([int(readers) for readers in sys.argv[1:]] or DEFAULT_READERS)
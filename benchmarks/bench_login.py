@@ -0,0 +1,114 @@
+"""
+Login throughput benchmark
+
+Sends bursts of concurrent POST /api/auth/login requests and compares
+hashing inline on the request threads (PASSWORD_HASH_WORKERS=0) with the
+bounded hashing pool, for each configured hash method. Reports successful
+logins per second, latency percentiles of the successful logins and the
+number of requests turned away with 503.
+
+Usage:
+    python -m benchmarks.bench_login [concurrency ...]
+"""
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+from benchmarks.common import create_benchmark_app
+from models.user import User, db
+from utils.passwords import init_password_hasher
+
+DEFAULT_CONCURRENCY = [1, 8, 32]
+LOGINS_PER_CLIENT = 4
+USER_COUNT = 100
+PASSWORD = 'benchmark-password'
+METHODS = ['pbkdf2:sha256:600000', 'scrypt:32768:8:1']
+WORKERS = min(4, os.cpu_count() or 1)
+QUEUE_LIMIT = 8
+
+
+def seed_users(app, method):
+    pwhash = generate_password_hash(PASSWORD, method=method)
+    now = datetime.now()
+    with app.app_context():
+        db.session.execute(insert(User), [
+            {
+                'fullname': f'User {i}',
+                'email': f'user{i}@example.com',
+                'password': pwhash,
+                'role': 'user',
+                'created_at': now,
+                'updated_at': now
+            }
+            for i in range(USER_COUNT)
+        ])
+        db.session.commit()
+
+
+def login_burst(app, concurrency):
+    latencies = []
+    rejected = []
+    lock = threading.Lock()
+    start = threading.Barrier(concurrency)
+
+    def client_thread(index):
+        client = app.test_client()
+        start.wait()
+        for attempt in range(LOGINS_PER_CLIENT):
+            email = f'user{(index * LOGINS_PER_CLIENT + attempt) % USER_COUNT}@example.com'
+            started = time.perf_counter()
+            response = client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+            elapsed = time.perf_counter() - started
+            with lock:
+                if response.status_code == 200:
+                    latencies.append(elapsed)
+                elif response.status_code == 503:
+                    rejected.append(elapsed)
+
+    threads = [threading.Thread(target=client_thread, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, sorted(latencies), rejected
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main(concurrency_levels):
+    print(f"workers={WORKERS} queue_limit={QUEUE_LIMIT} logins/client={LOGINS_PER_CLIENT}")
+    print(f"{'method':>22}  {'clients':>7}  {'mode':>6}  {'logins/s':>8}  {'p50 (ms)':>9}  {'p95 (ms)':>9}  {'503s':>5}")
+
+    for method in METHODS:
+        app, database_path = create_benchmark_app()
+        try:
+            seed_users(app, method)
+
+            for concurrency in concurrency_levels:
+                for mode, workers in (('inline', 0), ('pool', WORKERS)):
+                    app.config.update({
+                        'PASSWORD_HASH_METHOD': method,
+                        'PASSWORD_HASH_WORKERS': workers,
+                        'PASSWORD_HASH_QUEUE_LIMIT': QUEUE_LIMIT,
+                        'PASSWORD_HASH_TIMEOUT': 30
+                    })
+                    init_password_hasher(app)
+
+                    elapsed, latencies, rejected = login_burst(app, concurrency)
+                    print(f"{method:>22}  {concurrency:>7}  {mode:>6}  {len(latencies) / elapsed:>8.1f}  "
+                          f"{percentile(latencies, 0.5) * 1000:>9.1f}  {percentile(latencies, 0.95) * 1000:>9.1f}  "
+                          f"{len(rejected):>5}")
+        finally:
+            os.unlink(database_path)
+
+
+if __name__ == '__main__':
+    main([int(level) for level in sys.argv[1:]] or DEFAULT_CONCURRENCY)
@@ -0,0 +1,95 @@
+"""
+User and customer search benchmark
+
+Compares the previous '%query%' LIKE search (one full scan for the page
+and another for the COUNT(*) total) with the FTS5 indexes behind
+UserService.search_users and CustomerService.search_customers, for a
+rare name, a common first name and a two-word autocomplete prefix.
+
+Usage:
+    python -m benchmarks.bench_search [size ...]
+"""
+import os
+import random
+import sys
+from datetime import datetime
+from sqlalchemy import insert
+from benchmarks.common import FIRST_NAMES, LAST_NAMES, STREETS, create_benchmark_app, time_call
+from models.customer import Customer
+from models.user import User, db
+from services.customer_service import CustomerService
+from services.user_service import UserService
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+CHUNK_SIZE = 20000
+QUERIES = ['zanzibar', 'mary', 'jen gar']
+
+
+def seed_people(app, size, seed=42):
+    """Bulk load users and customers with generated names; one of each is 'Zanzibar'"""
+    rng = random.Random(seed)
+    now = datetime.now()
+
+    def name(i):
+        if i == size // 2:
+            return 'Zanzibar Quill'
+        return f'{rng.choice(FIRST_NAMES).title()} {rng.choice(LAST_NAMES).title()}'
+
+    with app.app_context():
+        for start in range(0, size, CHUNK_SIZE):
+            users = []
+            customers = []
+            for i in range(start, min(start + CHUNK_SIZE, size)):
+                fullname = name(i)
+                email = f"{fullname.lower().replace(' ', '.')}{i}@example.com"
+                users.append({
+                    'fullname': fullname,
+                    'email': email,
+                    'password': 'not-a-hash',
+                    'role': 'user',
+                    'created_at': now,
+                    'updated_at': now
+                })
+                customers.append({
+                    'name': fullname,
+                    'address': f'{rng.randint(1, 999)} {rng.choice(STREETS).title()} Street',
+                    'phone': f'555-{rng.randint(0, 9999999):07d}',
+                    'email': email,
+                    'created_at': now,
+                    'updated_at': now
+                })
+            db.session.execute(insert(User), users)
+            db.session.execute(insert(Customer), customers)
+        db.session.commit()
+
+
+def like_search(model, columns, query, per_page=10):
+    pattern = f'%{query.lower()}%'
+    return model.query.filter(
+        db.or_(*[getattr(model, column).ilike(pattern) for column in columns])
+    ).paginate(page=1, per_page=per_page, error_out=False)
+
+
+def main(sizes):
+    print(f"{'rows':>8}  {'table':>9}  {'query':>9}  {'LIKE (ms)':>10}  {'FTS5 (ms)':>10}  {'speedup':>8}")
+
+    for size in sizes:
+        app, database_path = create_benchmark_app()
+        try:
+            seed_people(app, size)
+
+            with app.app_context():
+                for table, model, columns, search in (
+                    ('users', User, ['fullname', 'email'], UserService.search_users),
+                    ('customers', Customer, ['name', 'email', 'phone', 'address'], CustomerService.search_customers)
+                ):
+                    for query in QUERIES:
+                        like = time_call(lambda: like_search(model, columns, query))
+                        fts = time_call(lambda: search(query))
+                        print(f"{size:>8}  {table:>9}  {query:>9}  {like * 1000:>10.1f}  {fts * 1000:>10.1f}  {like / fts:>7.1f}x")
+        finally:
+            os.unlink(database_path)
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
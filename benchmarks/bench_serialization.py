@@ -0,0 +1,86 @@
+"""
+List serialization benchmark
+
+Compares loading a page as ORM objects and calling to_dict on each (the
+previous list path) with selecting the same columns through Core and
+serializing them with the precompiled row serializers, for 100-row
+transaction and invoice pages and a monthly report's transaction list.
+Both sides produce identical JSON, which is checked before timing.
+
+Usage:
+    python -m benchmarks.bench_serialization [transactions]
+"""
+import json
+import os
+import sys
+from datetime import date
+from benchmarks.common import create_benchmark_app, seed_ledger, time_call
+from models.invoice import Invoice
+from models.serialization import invoice_rows, transaction_rows
+from models.transaction import Transaction
+from models.user import db
+
+DEFAULT_TRANSACTIONS = 200000
+YEAR = 2024
+PAGE_SIZE = 100
+ROUNDS = 200
+
+
+def cases():
+    january = (Transaction.date >= date(YEAR, 1, 1), Transaction.date <= date(YEAR, 1, 31))
+    return [
+        (
+            f'transactions page ({PAGE_SIZE})',
+            lambda: [t.to_dict() for t in Transaction.query.order_by(Transaction.date.desc()).limit(PAGE_SIZE).offset(1000)],
+            lambda: transaction_rows.serialize_all(db.session.execute(
+                transaction_rows.select().order_by(Transaction.date.desc()).limit(PAGE_SIZE).offset(1000)
+            )),
+            ROUNDS
+        ),
+        (
+            f'invoices page ({PAGE_SIZE})',
+            lambda: [i.to_dict() for i in Invoice.query.filter_by(status='paid').order_by(Invoice.date.desc()).limit(PAGE_SIZE)],
+            lambda: invoice_rows.serialize_all(db.session.execute(
+                invoice_rows.select().where(Invoice.status == 'paid').order_by(Invoice.date.desc()).limit(PAGE_SIZE)
+            )),
+            ROUNDS
+        ),
+        (
+            'monthly report rows',
+            lambda: [t.to_dict() for t in Transaction.query.filter(*january)],
+            lambda: transaction_rows.serialize_all(db.session.execute(transaction_rows.select().where(*january))),
+            5
+        )
+    ]
+
+
+def per_call(function, rounds):
+    def run():
+        for _ in range(rounds):
+            function()
+            db.session.remove()
+    return time_call(run) / rounds
+
+
+def main(transaction_count):
+    app, database_path = create_benchmark_app()
+    try:
+        seed_ledger(app, transaction_count, YEAR)
+
+        print(f"{'case':>24}  {'rows':>6}  {'ORM (ms)':>9}  {'Core (ms)':>9}  {'speedup':>8}")
+        with app.app_context():
+            for name, orm, core, rounds in cases():
+                expected = json.dumps(orm())
+                assert json.dumps(core()) == expected, name
+                db.session.remove()
+
+                orm_time = per_call(orm, rounds)
+                core_time = per_call(core, rounds)
+                rows = len(core())
+                print(f"{name:>24}  {rows:>6}  {orm_time * 1000:>9.2f}  {core_time * 1000:>9.2f}  {orm_time / core_time:>7.1f}x")
+    finally:
+        os.unlink(database_path)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TRANSACTIONS)
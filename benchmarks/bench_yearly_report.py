@@ -0,0 +1,50 @@
+"""
+Yearly report benchmark
+
+Compares the previous yearly report composition (get_financial_summary,
+get_profit_loss_statement and twelve get_monthly_report calls, each of
+which hydrates and serializes every transaction of its month) with the
+single-pass AccountingService.get_yearly_report.
+
+Usage:
+    python -m benchmarks.bench_yearly_report [size ...]
+"""
+import os
+import sys
+from benchmarks.common import create_benchmark_app, seed_ledger, time_call
+from services.accounting_service import AccountingService
+
+YEAR = 2024
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def legacy_yearly_report(year):
+    start_date = f"{year}-01-01"
+    end_date = f"{year}-12-31"
+
+    AccountingService.get_financial_summary(start_date, end_date)
+    AccountingService.get_profit_loss_statement(start_date, end_date)
+
+    for month in range(1, 13):
+        AccountingService.get_monthly_report(year, month)
+
+
+def main(sizes):
+    print(f"{'transactions':>12}  {'legacy (ms)':>12}  {'single pass (ms)':>16}  {'speedup':>8}")
+
+    for size in sizes:
+        app, database_path = create_benchmark_app()
+        try:
+            seed_ledger(app, size, YEAR)
+
+            with app.app_context():
+                legacy = time_call(lambda: legacy_yearly_report(YEAR))
+                single_pass = time_call(lambda: AccountingService.get_yearly_report(YEAR))
+
+            print(f"{size:>12}  {legacy * 1000:>12.1f}  {single_pass * 1000:>16.1f}  {legacy / single_pass:>7.1f}x")
+        finally:
+            os.unlink(database_path)
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,132 @@
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from flask import Flask
+from sqlalchemy import insert
+from models.user import db
+from models.customer import Customer
+from models.invoice import Invoice
+from models.transaction import Transaction
+from routes.auth_routes import auth_bp
+from routes.user_routes import user_bp
+from routes.accounting_routes import accounting_bp
+from routes.invoice_routes import invoice_bp
+from routes.transaction_routes import transaction_bp
+from routes.customer_routes import customer_bp
+from services.rollup_service import RollupService
+from utils.engine import init_engine
+
+FIRST_NAMES = ['james', 'mary', 'john', 'patricia', 'robert', 'jennifer', 'michael', 'linda',
+               'william', 'elizabeth', 'david', 'barbara', 'richard', 'susan', 'joseph', 'jessica']
+LAST_NAMES = ['smith', 'johnson', 'williams', 'brown', 'jones', 'garcia', 'miller', 'davis',
+              'rodriguez', 'martinez', 'hernandez', 'lopez', 'gonzalez', 'wilson', 'anderson']
+STREETS = ['main', 'oak', 'pine', 'maple', 'cedar', 'elm', 'washington', 'lake', 'hill']
+
+
+def create_benchmark_app(database_path=None, profile='default'):
+    """
+    Create an application bound to a scratch SQLite database
+
+    Args:
+        database_path: SQLite file path (default: new temporary file)
+        profile: Engine profile (see utils.engine.ENGINE_PROFILES)
+
+    Returns:
+        Tuple: (app, database_path)
+    """
+    if database_path is None:
+        db_fd, database_path = tempfile.mkstemp(suffix='.db')
+        os.close(db_fd)
+
+    app = Flask(__name__)
+    app.config.update({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'SECRET_KEY': 'benchmark-secret-key',
+        'DB_ENGINE_PROFILE': profile
+    })
+
+    init_engine(app, db)
+
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(user_bp)
+    app.register_blueprint(accounting_bp)
+    app.register_blueprint(invoice_bp)
+    app.register_blueprint(transaction_bp)
+    app.register_blueprint(customer_bp)
+
+    with app.app_context():
+        db.create_all()
+
+    return app, database_path
+
+
+def seed_ledger(app, transaction_count, year, invoice_count=None, seed=42, chunk_size=10000):
+    """
+    Bulk load customers, invoices and transactions spread over one year
+
+    Rows are inserted with executemany and the daily rollups are rebuilt
+    once at the end.
+    """
+    rng = random.Random(seed)
+    invoice_count = invoice_count or max(1, transaction_count // 10)
+    first_day = date(year, 1, 1)
+    days_in_year = (date(year, 12, 31) - first_day).days + 1
+    now = datetime.now()
+
+    with app.app_context():
+        db.session.execute(insert(Customer), [
+            {
+                'name': f'Customer {i}',
+                'address': f'Address {i}',
+                'phone': f'555-{i:04d}',
+                'email': f'customer{i}@example.com',
+                'created_at': now,
+                'updated_at': now
+            }
+            for i in range(1, 101)
+        ])
+
+        invoices = []
+        for i in range(invoice_count):
+            invoices.append({
+                'customer_id': rng.randint(1, 100),
+                'date': first_day + timedelta(days=rng.randrange(days_in_year)),
+                'total_amount': round(rng.uniform(100, 10000), 2),
+                'status': rng.choice(['paid', 'paid', 'pending', 'overdue', 'cancelled']),
+                'created_at': now,
+                'updated_at': now
+            })
+        db.session.execute(insert(Invoice), invoices)
+
+        rows = []
+        for i in range(transaction_count):
+            rows.append({
+                'invoice_id': rng.randint(1, invoice_count),
+                'amount': round(rng.uniform(10, 5000), 2),
+                'date': first_day + timedelta(days=rng.randrange(days_in_year)),
+                'type': 'income' if rng.random() < 0.6 else 'expense',
+                'created_at': now,
+                'updated_at': now
+            })
+            if len(rows) >= chunk_size:
+                db.session.execute(insert(Transaction), rows)
+                rows = []
+        if rows:
+            db.session.execute(insert(Transaction), rows)
+
+        db.session.commit()
+        RollupService.rebuild_daily_rollups()
+
+
+def time_call(function, repeat=3):
+    """Return the best wall-clock time in seconds over several runs"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
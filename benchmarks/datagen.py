@@ -0,0 +1,343 @@
+"""
+Synthetic ledger generator
+
+Bulk loads users, customers, invoices and transactions with production-like
+distributions, for benchmarks at any scale up to tens of millions of rows:
+
+- a few customers hold most invoices (Zipf distributed, see customer_skew)
+- business days carry more activity than weekends and volume grows over
+  the period (see growth)
+- invoice totals and expenses are log-normally distributed
+- payments fall on or after their invoice's date and cover part of it
+- unpaid invoices older than 30 days are overdue, as the overdue sweep
+  leaves them
+
+Rows go in with executemany in chunks, with the secondary and full-text
+search indexes dropped; those indexes and the daily rollups are built once
+at the end. The same seed always produces
+the same data.
+
+The spec is saved next to the database (PATH.spec.json), so the benchmark
+suite can run against it with --database.
+
+Usage:
+    python -m benchmarks.datagen PATH [--transactions N] [--customers N] [--invoices N]
+                                      [--users N] [--start YYYY-MM-DD] [--days N] [--seed N]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from sqlalchemy import text
+from benchmarks.common import FIRST_NAMES, LAST_NAMES, STREETS, create_benchmark_app
+from models.customer import Customer
+from models.invoice import Invoice
+from models.search import SEARCH_INDEXES, install_search_indexes
+from models.transaction import Transaction
+from models.user import User, db
+from services.rollup_service import RollupService
+from utils.passwords import hash_password
+from utils.schema import ensure_indexes
+from typing import Any, Callable, Dict, Optional
+
+ADMIN_EMAIL = 'admin@benchmark.test'
+SPEC_SUFFIX = '.spec.json'
+PASSWORD = 'benchmark-password'
+CHUNK_SIZE = 20000
+
+
+class DatasetSpec:
+    """
+    Size and shape of a generated ledger
+
+    Args:
+        transactions: Transaction rows
+        customers: Customer rows
+        invoices: Invoice rows (default: one per 10 transactions)
+        users: User rows, the first of which is an admin
+        start: First day of the period
+        days: Length of the period in days
+        customer_skew: Zipf exponent of invoices per customer; 0 spreads them evenly
+        growth: Activity on the last day relative to the first
+        weekend_share: Activity on a weekend day relative to a business day
+        status_weights: Share of each invoice status
+        type_weights: Share of each transaction type
+        seed: Random seed
+    """
+
+    def __init__(self, transactions: int = 100000, customers: int = 1000, invoices: Optional[int] = None,
+                 users: int = 50, start: date = date(2023, 1, 1), days: int = 730,
+                 customer_skew: float = 1.1, growth: float = 1.5, weekend_share: float = 0.3,
+                 status_weights: Optional[Dict[str, float]] = None,
+                 type_weights: Optional[Dict[str, float]] = None, seed: int = 42):
+        self.transactions = transactions
+        self.customers = customers
+        self.invoices = invoices if invoices is not None else max(1, transactions // 10)
+        self.users = max(1, users)
+        self.start = start
+        self.days = days
+        self.customer_skew = customer_skew
+        self.growth = growth
+        self.weekend_share = weekend_share
+        self.status_weights = status_weights or {'paid': 0.65, 'pending': 0.2, 'overdue': 0.1, 'cancelled': 0.05}
+        self.type_weights = type_weights or {'income': 0.6, 'expense': 0.37, 'refund': 0.03}
+        self.seed = seed
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=self.days - 1)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DatasetSpec':
+        return cls(**{**data, 'start': date.fromisoformat(data['start'])})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'transactions': self.transactions,
+            'customers': self.customers,
+            'invoices': self.invoices,
+            'users': self.users,
+            'start': self.start.isoformat(),
+            'days': self.days,
+            'customer_skew': self.customer_skew,
+            'growth': self.growth,
+            'weekend_share': self.weekend_share,
+            'status_weights': self.status_weights,
+            'type_weights': self.type_weights,
+            'seed': self.seed
+        }
+
+
+def _day_weights(spec: DatasetSpec):
+    weights = []
+    for offset in range(spec.days):
+        day = spec.start + timedelta(days=offset)
+        trend = 1 + (spec.growth - 1) * offset / max(1, spec.days - 1)
+        weights.append(trend * (spec.weekend_share if day.weekday() >= 5 else 1.0))
+    return list(accumulate(weights))
+
+
+def _customer_weights(spec: DatasetSpec):
+    return list(accumulate(1 / math.pow(rank, spec.customer_skew) for rank in range(1, spec.customers + 1)))
+
+
+def _insert_chunks(model, rows, chunk_size: int) -> None:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(model.__table__.insert(), chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(model.__table__.insert(), chunk)
+
+
+def generate_users(spec: DatasetSpec, rng: random.Random, now: datetime):
+    # One hash for everyone: hashing millions of passwords would dominate the load
+    pwhash = hash_password(PASSWORD)
+    for i in range(spec.users):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            'fullname': 'Benchmark Admin' if i == 0 else f'{first.title()} {last.title()}',
+            'email': ADMIN_EMAIL if i == 0 else f'{first}.{last}{i}@example.com',
+            'password': pwhash,
+            'role': 'admin' if i == 0 else 'user',
+            'created_at': now,
+            'updated_at': now
+        }
+
+
+def generate_customers(spec: DatasetSpec, rng: random.Random, now: datetime):
+    for i in range(1, spec.customers + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            'name': f'{first.title()} {last.title()} {rng.choice(["Ltd", "Inc", "LLC", "GmbH", "& Co"])}',
+            'address': f'{rng.randint(1, 999)} {rng.choice(STREETS).title()} Street',
+            'phone': f'555-{rng.randint(0, 9999999):07d}',
+            'email': f'{last}{i}@example.com',
+            'created_at': now,
+            'updated_at': now
+        }
+
+
+def generate_invoices(spec: DatasetSpec, rng: random.Random, now: datetime, dates: list, totals: list,
+                      chunk_size: int = CHUNK_SIZE):
+    """Invoice rows; fills dates and totals, by invoice id - 1, for the transactions"""
+    day_weights = _day_weights(spec)
+    customer_weights = _customer_weights(spec)
+    statuses, status_weights = zip(*spec.status_weights.items())
+    offsets = range(spec.days)
+    customers = range(1, spec.customers + 1)
+    recent = spec.days - 30
+
+    for done in range(0, spec.invoices, chunk_size):
+        size = min(chunk_size, spec.invoices - done)
+        for offset, customer_id, status in zip(
+            rng.choices(offsets, cum_weights=day_weights, k=size),
+            rng.choices(customers, cum_weights=customer_weights, k=size),
+            rng.choices(statuses, weights=status_weights, k=size)
+        ):
+            # Left as the overdue sweep leaves them: pending only within the grace period
+            if status in ('pending', 'overdue'):
+                status = 'pending' if offset >= recent else 'overdue'
+            total = round(max(1.0, rng.lognormvariate(7.0, 1.0)), 2)
+            dates.append(offset)
+            totals.append(total)
+            yield {
+                'customer_id': customer_id,
+                'date': spec.start + timedelta(days=offset),
+                'total_amount': total,
+                'status': status,
+                'created_at': now,
+                'updated_at': now
+            }
+
+
+def generate_transactions(spec: DatasetSpec, rng: random.Random, now: datetime, dates: list, totals: list,
+                          chunk_size: int = CHUNK_SIZE):
+    types, type_weights = zip(*spec.type_weights.items())
+    last_offset = spec.days - 1
+    day = [spec.start + timedelta(days=offset) for offset in range(spec.days)]
+
+    for done in range(0, spec.transactions, chunk_size):
+        size = min(chunk_size, spec.transactions - done)
+        for type_ in rng.choices(types, weights=type_weights, k=size):
+            invoice = rng.randrange(spec.invoices)
+            if type_ == 'expense':
+                amount = rng.lognormvariate(5.0, 1.2)
+            else:
+                amount = totals[invoice] * rng.uniform(0.1, 1.0)
+            yield {
+                'invoice_id': invoice + 1,
+                'amount': round(max(0.01, amount), 2),
+                'date': day[min(last_offset, dates[invoice] + rng.randrange(45))],
+                'type': type_,
+                'created_at': now,
+                'updated_at': now
+            }
+
+
+def generate_dataset(app, spec: DatasetSpec, chunk_size: int = CHUNK_SIZE,
+                     progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+    Load a generated ledger into an application's (empty) database
+
+    Args:
+        app: Flask application
+        spec: Dataset size and shape
+        chunk_size: Rows per executemany
+        progress: Called with a message after each step (optional)
+
+    Returns:
+        Dict: Row counts and the load time of each step in seconds
+    """
+    rng = random.Random(spec.seed)
+    now = datetime.now()
+    report = progress or (lambda message: None)
+    timings = {}
+
+    def step(name, function):
+        started = time.perf_counter()
+        function()
+        db.session.commit()
+        timings[name] = round(time.perf_counter() - started, 2)
+        report(f'{name}: {timings[name]}s')
+
+    # Invoice dates (as offsets) and totals, by id - 1, for the transactions
+    dates, totals = [], []
+
+    with app.app_context():
+        # Building the secondary and full-text indexes once after the load is
+        # much faster than updating them row by row
+        loaded = [User.__table__, Customer.__table__, Invoice.__table__, Transaction.__table__]
+        with db.engine.begin() as connection:
+            for table in loaded:
+                for index in table.indexes:
+                    index.drop(connection, checkfirst=True)
+            for search_index in SEARCH_INDEXES:
+                for trigger in ('ai', 'ad', 'au'):
+                    connection.execute(text(f'DROP TRIGGER IF EXISTS {search_index.name}_{trigger}'))
+                search_index.drop(connection)
+
+        step('users', lambda: _insert_chunks(User, generate_users(spec, rng, now), chunk_size))
+        step('customers', lambda: _insert_chunks(Customer, generate_customers(spec, rng, now), chunk_size))
+        step('invoices', lambda: _insert_chunks(
+            Invoice, generate_invoices(spec, rng, now, dates, totals, chunk_size), chunk_size
+        ))
+        step('transactions', lambda: _insert_chunks(
+            Transaction, generate_transactions(spec, rng, now, dates, totals, chunk_size), chunk_size
+        ))
+        step('indexes', lambda: ensure_indexes(db.engine, db.metadata))
+        step('rollups', RollupService.rebuild_daily_rollups)
+
+        def search_indexes():
+            with db.engine.begin() as connection:
+                install_search_indexes(connection)
+        step('search indexes', search_indexes)
+
+    return {
+        'users': spec.users,
+        'customers': spec.customers,
+        'invoices': spec.invoices,
+        'transactions': spec.transactions,
+        'seconds': timings
+    }
+
+
+def spec_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the DatasetSpec options to a command line parser"""
+    defaults = DatasetSpec()
+    parser.add_argument('--transactions', type=int, default=defaults.transactions)
+    parser.add_argument('--customers', type=int, default=defaults.customers)
+    parser.add_argument('--invoices', type=int, default=None, help='default: transactions / 10')
+    parser.add_argument('--users', type=int, default=defaults.users)
+    parser.add_argument('--start', type=date.fromisoformat, default=defaults.start)
+    parser.add_argument('--days', type=int, default=defaults.days)
+    parser.add_argument('--customer-skew', type=float, default=defaults.customer_skew)
+    parser.add_argument('--growth', type=float, default=defaults.growth)
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+
+def spec_from_arguments(arguments: argparse.Namespace) -> DatasetSpec:
+    return DatasetSpec(
+        transactions=arguments.transactions,
+        customers=arguments.customers,
+        invoices=arguments.invoices,
+        users=arguments.users,
+        start=arguments.start,
+        days=arguments.days,
+        customer_skew=arguments.customer_skew,
+        growth=arguments.growth,
+        seed=arguments.seed
+    )
+
+
+def load_spec(database_path: str) -> DatasetSpec:
+    """The spec a database was generated with, from the file written next to it"""
+    with open(database_path + SPEC_SUFFIX) as file:
+        return DatasetSpec.from_dict(json.load(file))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic ledger database')
+    parser.add_argument('path', help='SQLite database file to create')
+    spec_arguments(parser)
+    arguments = parser.parse_args()
+    if os.path.exists(arguments.path) and os.path.getsize(arguments.path):
+        parser.error(f'{arguments.path} already exists; the generator fills an empty database')
+
+    spec = spec_from_arguments(arguments)
+    app, database_path = create_benchmark_app(arguments.path)
+    result = generate_dataset(app, spec, progress=print)
+    with open(database_path + SPEC_SUFFIX, 'w') as file:
+        json.dump(spec.to_dict(), file, indent=2)
+    print(f"Generated {result['transactions']} transactions, {result['invoices']} invoices, "
+          f"{result['customers']} customers and {result['users']} users in {database_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,695 @@
+"""
+Service and route benchmark suite
+
+Times every public service method and every route of the application
+against a generated ledger (see benchmarks.datagen), stores the results as
+JSON and compares them with a baseline run:
+
+- each case runs once untimed, then --rounds times; its median, fastest
+  and slowest round are kept with the number of SQL statements it ran
+- the in-process caches are emptied before every round, so cached
+  endpoints are measured cold
+- write cases add, update and delete rows dated before the dataset's
+  period (or users in a scratch e-mail domain), which are deleted after
+  every round; the admin and the regular user, the only dataset rows
+  they have to change, are restored, so runs against the same database
+  stay comparable
+- a case regresses when its fastest round is slower than the baseline's
+  by more than --threshold (and by more than --min-delta milliseconds, to
+  ignore noise on sub-millisecond cases), or when it runs more SQL
+  statements than before
+
+The run exits with status 1 when a case regresses or fails, and refuses
+to compare against a baseline recorded on a different dataset.
+
+Usage:
+    python -m benchmarks.suite [--transactions N ...] [--database PATH]
+                               [--rounds N] [--filter TEXT] [--output results.json]
+                               [--baseline baseline.json] [--threshold 0.2]
+"""
+import argparse
+import inspect
+import json
+import logging
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+import sqlalchemy
+from benchmarks.common import create_benchmark_app
+from benchmarks.datagen import (ADMIN_EMAIL, PASSWORD, DatasetSpec, generate_dataset, load_spec, spec_arguments,
+                               spec_from_arguments)
+from models.daily_rollup import DailyRollup
+from models.invoice import Invoice
+from models.transaction import Transaction
+from models.user import User, db
+from services import (accounting_service, count_service, customer_service, invoice_service,
+                      replication_service, rollup_service, transaction_service, user_service)
+from services.accounting_service import AccountingService
+from services.count_service import CountService
+from services.customer_service import CustomerService
+from services.invoice_service import InvoiceService
+from services.replication_service import ReplicationService
+from services.rollup_service import RollupService
+from services.transaction_service import TransactionService
+from services.user_service import UserService
+from utils.cache import all_caches
+from utils.jwt_utils import JWTUtils
+from utils.metrics import init_metrics
+from utils.profiling import init_profiling
+from utils.query_stats import init_query_stats, track_queries
+from utils.slow_queries import init_slow_query_log
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_ROUNDS = 5
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_MIN_DELTA_MS = 1.0
+BULK_ROWS = 1000
+SCRATCH_DOMAIN = 'benchmark.invalid'
+
+SERVICE_MODULES = [accounting_service, count_service, customer_service, invoice_service,
+                   replication_service, rollup_service, transaction_service, user_service]
+
+# Service methods without a case of their own, and why
+EXCLUDED_METHODS = {
+    'ReplicationService.sync_sqlite_replica': 'needs a replica database',
+    'RollupService.rollup_key': 'helper of the transaction writes, timed through them',
+    'RollupService.apply_deltas': 'helper of the transaction writes, timed through them',
+    'RollupService.empty_aggregate': 'constant, no database work'
+}
+
+
+class Case:
+    """
+    One timed operation
+
+    Args:
+        name: 'service:Class.method[variant]' or 'route:METHOD /path'
+        run: Called once per round with the result of setup
+        setup: Untimed preparation before each round, e.g. inserting the
+            row a delete removes (optional)
+        rounds: Rounds for this case instead of the suite's (optional);
+            1 also skips the warm-up round, for cases that read everything
+    """
+
+    def __init__(self, name: str, run: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None,
+                 rounds: Optional[int] = None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.rounds = rounds
+
+
+class Fixtures:
+    """Ids, dates and credentials the cases work with, taken from the dataset"""
+
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        self.year = spec.end.year
+        self.month = spec.end.month
+        self.end = spec.end
+        self.start = spec.end - timedelta(days=90)
+        self.month_start = spec.end.replace(day=1)
+        # Rows the cases write are dated before the dataset and removed after each round
+        self.scratch_date = spec.start - timedelta(days=1)
+        self.customer_id = 1
+        self.invoice_id = 1
+        self.transaction_id = 1
+        self.admin_id = 1
+        self.user_id = 2
+        self.user_email = None
+        self.admin_headers = None
+        self.password_hash = None
+        self.saved_users = []
+        self.counter = 0
+
+    def load(self) -> None:
+        """Look up the users the cases work with and sign the admin token; needs an app context"""
+        user = db.session.get(User, self.user_id)
+        self.user_email = user.email
+        self.password_hash = user.password
+        users = User.__table__
+        self.saved_users = [
+            dict(row) for row in db.session.execute(
+                users.select().where(users.c.id.in_([self.admin_id, self.user_id]))
+            ).mappings()
+        ]
+        token = JWTUtils.generate_token({'id': self.admin_id, 'email': ADMIN_EMAIL, 'role': 'admin'})
+        self.admin_headers = {'Authorization': f'Bearer {token}'}
+
+    def tick(self) -> int:
+        """A new number on every call"""
+        self.counter += 1
+        return self.counter
+
+    def unique(self, prefix: str) -> str:
+        return f'{prefix}-{os.getpid()}-{time.time_ns()}-{self.tick()}'
+
+    def url_params(self) -> Dict[str, Any]:
+        return {
+            'year': self.year,
+            'month': self.month,
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'month_start': self.month_start.isoformat(),
+            'customer_id': self.customer_id,
+            'invoice_id': self.invoice_id,
+            'transaction_id': self.transaction_id,
+            'user_id': self.user_id,
+            'user_email': self.user_email
+        }
+
+    # Rows the write cases change or remove, inserted untimed before each round
+
+    def new_invoices(self, count: int) -> List[int]:
+        ids = []
+        for _ in range(count):
+            result = db.session.execute(Invoice.__table__.insert().values(
+                customer_id=self.customer_id, date=self.scratch_date, total_amount=100.0, status='pending'
+            ))
+            ids.append(result.inserted_primary_key[0])
+        db.session.commit()
+        return ids
+
+    def new_invoice(self) -> int:
+        return self.new_invoices(1)[0]
+
+    def new_transaction(self) -> int:
+        result = db.session.execute(Transaction.__table__.insert().values(
+            invoice_id=self.invoice_id, amount=10.0, date=self.scratch_date, type='expense'
+        ))
+        db.session.commit()
+        return result.inserted_primary_key[0]
+
+    def new_email(self, prefix: str) -> str:
+        return f'{self.unique(prefix)}@{SCRATCH_DOMAIN}'
+
+    def new_user(self) -> int:
+        result = db.session.execute(User.__table__.insert().values(
+            fullname='Benchmark Victim', email=self.new_email('victim'), password=self.password_hash, role='user'
+        ))
+        db.session.commit()
+        return result.inserted_primary_key[0]
+
+    def reset_password(self, user_id: int) -> None:
+        db.session.execute(User.__table__.update().where(User.id == user_id).values(password=self.password_hash))
+        db.session.commit()
+
+    def invoice_rows(self) -> List[Dict[str, Any]]:
+        return [
+            {'customer_id': self.customer_id, 'date': self.scratch_date.isoformat(), 'total_amount': 100.0 + i}
+            for i in range(BULK_ROWS)
+        ]
+
+    def transaction_rows(self) -> List[Dict[str, Any]]:
+        return [
+            {'invoice_id': self.invoice_id, 'amount': 10.0 + i, 'date': self.scratch_date.isoformat(), 'type': 'expense'}
+            for i in range(BULK_ROWS)
+        ]
+
+    def cleanup(self) -> None:
+        """
+        Undo what the write cases did, so every run sees the same dataset
+
+        Removes the rows they added and restores the two dataset users they
+        have to change (the admin's name through PUT /api/users/me, password
+        hashes through the password changes) as they were loaded.
+        """
+        db.session.execute(Transaction.__table__.delete().where(Transaction.date < self.spec.start))
+        db.session.execute(DailyRollup.__table__.delete().where(DailyRollup.date < self.spec.start))
+        db.session.execute(Invoice.__table__.delete().where(Invoice.date < self.spec.start))
+        db.session.execute(User.__table__.delete().where(User.email.like(f'%@{SCRATCH_DOMAIN}')))
+        for user in self.saved_users:
+            db.session.execute(User.__table__.update().where(User.id == user['id']).values(**user))
+        db.session.commit()
+
+
+def _heartbeat():
+    with db.engine.begin() as connection:
+        return ReplicationService.write_heartbeat(connection)
+
+
+def service_cases(f: Fixtures) -> List[Case]:
+    start, end = f.start.isoformat(), f.end.isoformat()
+    scratch = f.scratch_date.isoformat()
+    cases = {
+        'AccountingService.get_financial_summary': lambda: AccountingService.get_financial_summary(start, end),
+        'AccountingService.get_monthly_report': lambda: AccountingService.get_monthly_report(f.year, f.month),
+        'AccountingService.get_yearly_report': lambda: AccountingService.get_yearly_report(f.year),
+        'AccountingService.get_cash_flow': lambda: AccountingService.get_cash_flow(start_date=start, end_date=end),
+        'AccountingService.get_customer_analysis': lambda: AccountingService.get_customer_analysis(),
+        'AccountingService.get_customer_analysis[customer]': lambda: AccountingService.get_customer_analysis(f.customer_id),
+        'AccountingService.get_invoice_status_summary': AccountingService.get_invoice_status_summary,
+        'AccountingService.get_profit_loss_statement': lambda: AccountingService.get_profit_loss_statement(start, end),
+        'AccountingService.get_transaction_summary_by_type': AccountingService.get_transaction_summary_by_type,
+        'AccountingService.get_dashboard': AccountingService.get_dashboard,
+        'CountService.count_transactions': lambda: CountService.count_transactions(),
+        'CountService.count_transactions[type]': lambda: CountService.count_transactions('income'),
+        'CountService.count_invoices': lambda: CountService.count_invoices(),
+        'CountService.count_invoices[status]': lambda: CountService.count_invoices(status='paid'),
+        'CustomerService.search_customers': lambda: CustomerService.search_customers('smith'),
+        'CustomerService.autocomplete_customers': lambda: CustomerService.autocomplete_customers('jo'),
+        'InvoiceService.create_invoice': lambda: InvoiceService.create_invoice(f.customer_id, scratch, 100.0),
+        'InvoiceService.create_invoices_bulk': lambda: InvoiceService.create_invoices_bulk(f.invoice_rows()),
+        'InvoiceService.get_invoice_by_id': lambda: InvoiceService.get_invoice_by_id(f.invoice_id),
+        'InvoiceService.get_all_invoices': lambda: InvoiceService.get_all_invoices(),
+        'InvoiceService.get_all_invoices[keyset]': lambda: InvoiceService.get_all_invoices(cursor=''),
+        'InvoiceService.get_invoices_by_customer': lambda: InvoiceService.get_invoices_by_customer(f.customer_id),
+        'InvoiceService.get_invoices_by_status': lambda: InvoiceService.get_invoices_by_status('paid'),
+        'InvoiceService.get_invoices_by_status[keyset]': lambda: InvoiceService.get_invoices_by_status('paid', cursor=''),
+        'InvoiceService.iter_invoices': lambda: list(InvoiceService.iter_invoices(f.month_start, f.end)),
+        'InvoiceService.get_invoice_statistics': InvoiceService.get_invoice_statistics,
+        'ReplicationService.write_heartbeat': _heartbeat,
+        'ReplicationService.get_replica_status': ReplicationService.get_replica_status,
+        'RollupService.get_period_aggregate': lambda: RollupService.get_period_aggregate(f.start, f.end),
+        'RollupService.get_period_aggregate[month]': lambda: RollupService.get_period_aggregate(group_by='month'),
+        'TransactionService.create_transaction': lambda: TransactionService.create_transaction(
+            f.invoice_id, 10.0, scratch, 'expense'
+        ),
+        'TransactionService.create_transactions_bulk': lambda: TransactionService.create_transactions_bulk(f.transaction_rows()),
+        'TransactionService.get_transaction_by_id': lambda: TransactionService.get_transaction_by_id(f.transaction_id),
+        'TransactionService.get_all_transactions': lambda: TransactionService.get_all_transactions(),
+        'TransactionService.get_all_transactions[keyset]': lambda: TransactionService.get_all_transactions(cursor=''),
+        'TransactionService.get_transactions_by_invoice': lambda: TransactionService.get_transactions_by_invoice(f.invoice_id),
+        'TransactionService.get_transactions_by_type': lambda: TransactionService.get_transactions_by_type('income'),
+        'TransactionService.get_transactions_by_type[keyset]': lambda: TransactionService.get_transactions_by_type('income', cursor=''),
+        'TransactionService.iter_transactions': lambda: list(TransactionService.iter_transactions(f.month_start, f.end)),
+        'TransactionService.get_transaction_statistics': TransactionService.get_transaction_statistics,
+        'TransactionService.search_transactions': lambda: TransactionService.search_transactions('income'),
+        'TransactionService.search_transactions[filters]': lambda: TransactionService.search_transactions(
+            amount_min=100.0, amount_max=900.0, start_date=f.start, end_date=f.end, types=['income', 'refund']
+        ),
+        'UserService.get_user_by_id': lambda: UserService.get_user_by_id(f.user_id),
+        'UserService.get_user_by_email': lambda: UserService.get_user_by_email(f.user_email),
+        'UserService.get_all_users': lambda: UserService.get_all_users(),
+        'UserService.get_users_by_role': lambda: UserService.get_users_by_role('user'),
+        'UserService.authenticate_user': lambda: UserService.authenticate_user(ADMIN_EMAIL, PASSWORD),
+        'UserService.search_users': lambda: UserService.search_users('mary'),
+        'UserService.autocomplete_users': lambda: UserService.autocomplete_users('ja')
+    }
+    result = [Case(f'service:{name}', lambda _, run=run: run()) for name, run in cases.items()]
+
+    result += [
+        # Updates change scratch rows; the dataset's own rows are only read
+        Case('service:InvoiceService.update_invoice',
+             lambda invoice_id: InvoiceService.update_invoice(invoice_id, total_amount=1000.0), setup=f.new_invoice),
+        # Only the scratch invoices are dated before the dataset's first day
+        Case('service:InvoiceService.mark_overdue_invoices',
+             lambda _: InvoiceService.mark_overdue_invoices(grace_days=0, today=f.spec.start),
+             setup=lambda: f.new_invoices(100)),
+        Case('service:TransactionService.update_transaction',
+             lambda transaction_id: TransactionService.update_transaction(transaction_id, amount=100.0),
+             setup=f.new_transaction),
+        Case('service:UserService.update_user',
+             lambda user_id: UserService.update_user(user_id, fullname='Benchmark User'), setup=f.new_user),
+        Case('service:InvoiceService.delete_invoice', InvoiceService.delete_invoice, setup=f.new_invoice),
+        Case('service:InvoiceService.update_invoice_status',
+             lambda invoice_id: InvoiceService.update_invoice_status(invoice_id, 'paid'), setup=f.new_invoice),
+        Case('service:InvoiceService.update_invoice_status_bulk',
+             lambda invoice_ids: InvoiceService.update_invoice_status_bulk(invoice_ids, 'paid'),
+             setup=lambda: f.new_invoices(100)),
+        Case('service:TransactionService.delete_transaction', TransactionService.delete_transaction,
+             setup=f.new_transaction),
+        Case('service:UserService.delete_user', UserService.delete_user, setup=f.new_user),
+        Case('service:UserService.create_user',
+             lambda email: UserService.create_user('Benchmark User', email, PASSWORD),
+             setup=lambda: f.new_email('user')),
+        Case('service:UserService.create_admin_user',
+             lambda email: UserService.create_admin_user('Benchmark Admin', email, PASSWORD),
+             setup=lambda: f.new_email('admin')),
+        Case('service:UserService.change_password',
+             lambda _: UserService.change_password(f.user_id, PASSWORD, PASSWORD),
+             setup=lambda: f.reset_password(f.user_id)),
+        Case('service:RollupService.rebuild_daily_rollups', lambda _: RollupService.rebuild_daily_rollups(), rounds=1)
+    ]
+    return result
+
+
+# (method, URL template, JSON body or callable returning it, setup returning extra URL params, rounds)
+ROUTES = [
+    ('GET', '/api/accounting/summary?start_date={start}&end_date={end}', None, None, None),
+    ('GET', '/api/accounting/monthly-report/{year}/{month}', None, None, None),
+    ('GET', '/api/accounting/cash-flow?start_date={start}&end_date={end}', None, None, None),
+    ('GET', '/api/accounting/customer-analysis', None, None, None),
+    ('GET', '/api/accounting/customer-analysis/{customer_id}', None, None, None),
+    ('GET', '/api/accounting/invoice-summary', None, None, None),
+    ('GET', '/api/accounting/profit-loss?start_date={start}&end_date={end}', None, None, None),
+    ('GET', '/api/accounting/transaction-summary', None, None, None),
+    ('GET', '/api/accounting/dashboard', None, None, None),
+    ('GET', '/api/accounting/reports/yearly/{year}', None, None, None),
+    ('GET', '/api/accounting/health', None, None, None),
+    ('GET', '/api/accounting/diagnostics/database', None, None, None),
+    ('GET', '/api/accounting/diagnostics/replica', None, None, None),
+    ('GET', '/api/accounting/diagnostics/slow-queries', None, None, None),
+    ('DELETE', '/api/accounting/diagnostics/slow-queries', None, None, None),
+    ('GET', '/api/accounting/diagnostics/profiles', None, None, None),
+    ('GET', '/api/accounting/diagnostics/profiles/{profile_id}', None, 'profile', None),
+    ('DELETE', '/api/accounting/diagnostics/profiles', None, None, None),
+    ('POST', '/api/auth/register',
+     lambda f: {'fullname': 'Benchmark User', 'email': f.new_email('register'), 'password': PASSWORD},
+     None, None),
+    ('POST', '/api/auth/login', lambda f: {'email': ADMIN_EMAIL, 'password': PASSWORD}, None, None),
+    ('PUT', '/api/auth/change-password', lambda f: {'current_password': PASSWORD, 'new_password': PASSWORD},
+     'reset_admin_password', None),
+    ('GET', '/api/auth/profile', None, None, None),
+    ('POST', '/api/auth/refresh', None, None, None),
+    ('POST', '/api/auth/verify', None, None, None),
+    ('GET', '/api/customers/search?q=smith', None, None, None),
+    ('GET', '/api/customers/autocomplete?q=jo', None, None, None),
+    ('GET', '/api/invoices/', None, None, None),
+    ('POST', '/api/invoices/',
+     lambda f: {'customer_id': f.customer_id, 'date': f.scratch_date.isoformat(), 'total_amount': 100.0}, None, None),
+    ('POST', '/api/invoices/bulk', lambda f: {'invoices': f.invoice_rows()}, None, None),
+    ('PATCH', '/api/invoices/bulk/status', lambda f: {'invoice_ids': f.new_invoices(100), 'status': 'paid'}, None, None),
+    ('GET', '/api/invoices/{invoice_id}', None, None, None),
+    ('PUT', '/api/invoices/{new_id}', lambda f: {'total_amount': 1000.0}, 'new_invoice', None),
+    ('DELETE', '/api/invoices/{new_id}', None, 'new_invoice', None),
+    ('PATCH', '/api/invoices/{new_id}/status', lambda f: {'status': 'paid'}, 'new_invoice', None),
+    ('GET', '/api/invoices/customer/{customer_id}', None, None, None),
+    ('GET', '/api/invoices/status/paid', None, None, None),
+    ('GET', '/api/invoices/statistics', None, None, None),
+    ('GET', '/api/invoices/pending', None, None, None),
+    ('GET', '/api/invoices/paid', None, None, None),
+    ('GET', '/api/invoices/overdue', None, None, None),
+    ('GET', '/api/invoices/export?start_date={month_start}&end_date={end}', None, None, None),
+    ('GET', '/api/transactions/', None, None, None),
+    ('POST', '/api/transactions/',
+     lambda f: {'invoice_id': f.invoice_id, 'amount': 10.0, 'date': f.scratch_date.isoformat(), 'type': 'expense'},
+     None, None),
+    ('POST', '/api/transactions/bulk', lambda f: {'transactions': f.transaction_rows()}, None, None),
+    ('GET', '/api/transactions/{transaction_id}', None, None, None),
+    ('PUT', '/api/transactions/{new_id}', lambda f: {'amount': 100.0}, 'new_transaction', None),
+    ('DELETE', '/api/transactions/{new_id}', None, 'new_transaction', None),
+    ('GET', '/api/transactions/by-invoice/{invoice_id}', None, None, None),
+    ('GET', '/api/transactions/by-type/income', None, None, None),
+    ('GET', '/api/transactions/search?q=income&amount_min=100', None, None, None),
+    ('GET', '/api/transactions/stats', None, None, None),
+    ('GET', '/api/transactions/export?start_date={month_start}&end_date={end}', None, None, None),
+    ('GET', '/api/users/', None, None, None),
+    ('GET', '/api/users/{user_id}', None, None, None),
+    ('PUT', '/api/users/{new_id}', lambda f: {'fullname': 'Benchmark User'}, 'new_user', None),
+    ('DELETE', '/api/users/{new_id}', None, 'new_user', None),
+    ('GET', '/api/users/search?q=mary', None, None, None),
+    ('GET', '/api/users/autocomplete?q=ja', None, None, None),
+    ('GET', '/api/users/by-role/user', None, None, None),
+    ('GET', '/api/users/by-email/{user_email}', None, None, None),
+    ('GET', '/api/users/stats', None, None, None),
+    ('GET', '/api/users/me', None, None, None),
+    ('PUT', '/api/users/me', lambda f: {'fullname': f.unique('Admin')}, None, None),
+    ('GET', '/metrics', None, None, None)
+]
+
+
+def route_cases(app, f: Fixtures) -> List[Case]:
+    client = app.test_client()
+
+    setups = {
+        'new_invoice': lambda: {'new_id': f.new_invoice()},
+        'new_transaction': lambda: {'new_id': f.new_transaction()},
+        'new_user': lambda: {'new_id': f.new_user()},
+        'reset_admin_password': lambda: f.reset_password(f.admin_id) or {},
+        'profile': lambda: {'profile_id': client.get(
+            '/api/accounting/health', headers={**f.admin_headers, 'X-Profile': '1'}
+        ).headers['X-Profile-Id']}
+    }
+
+    def case(method, template, body, setup, rounds):
+        def prepare():
+            params = f.url_params()
+            if setup is not None:
+                params.update(setups[setup]())
+            return template.format(**params), body(f) if callable(body) else body
+
+        def run(prepared):
+            url, json_body = prepared
+            response = client.open(url, method=method, headers=f.admin_headers, json=json_body)
+            response.get_data()
+            if response.status_code >= 400:
+                raise RuntimeError(f'{method} {url} returned {response.status_code}')
+            return response
+
+        return Case(f'route:{method} {template}', run, setup=prepare, rounds=rounds)
+
+    return [case(*route) for route in ROUTES]
+
+
+def uncovered(app, cases: List[Case]) -> List[str]:
+    """
+    Routes and public service methods without a case
+
+    Args:
+        app: Flask application the route cases run against
+        cases: Benchmark cases
+
+    Returns:
+        List: 'route:METHOD rule' and 'service:Class.method' entries lacking a case
+    """
+    names = {case.name for case in cases}
+    covered_methods = {name.split(':', 1)[1].split('[')[0] for name in names if name.startswith('service:')}
+
+    adapter = app.url_map.bind('localhost')
+    covered_routes = set()
+    for method, template, _, _, _ in ROUTES:
+        path = template.split('?')[0].format_map(_Placeholders())
+        endpoint, _ = adapter.match(path, method=method)
+        covered_routes.add((method, endpoint))
+
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == 'static':
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            if (method, rule.endpoint) not in covered_routes:
+                missing.append(f'route:{method} {rule.rule}')
+
+    for module in SERVICE_MODULES:
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for name, _ in inspect.getmembers(cls, inspect.isfunction):
+                qualified = f'{cls.__name__}.{name}'
+                if not name.startswith('_') and qualified not in covered_methods and qualified not in EXCLUDED_METHODS:
+                    missing.append(f'service:{qualified}')
+    return missing
+
+
+class _Placeholders(dict):
+    """Fills URL templates with a value every int and string converter accepts"""
+
+    def __missing__(self, key):
+        return '1'
+
+
+def create_suite_app(database_path: Optional[str] = None):
+    """A benchmark application with the request instrumentation of app.py"""
+    app, database_path = create_benchmark_app(database_path)
+    init_query_stats(app)
+    init_metrics(app)
+    init_slow_query_log(app, db)
+    init_profiling(app)
+    return app, database_path
+
+
+def run_case(case: Case, rounds: int, cleanup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    rounds = case.rounds or rounds
+    timings = []
+    queries = 0
+
+    for index in range((0 if case.rounds == 1 else 1) + rounds):
+        for cache in all_caches():
+            cache.invalidate()
+        prepared = case.setup() if case.setup is not None else None
+        db.session.remove()
+
+        with track_queries() as stats:
+            started = time.perf_counter()
+            result = case.run(prepared)
+            elapsed = time.perf_counter() - started
+        db.session.remove()
+        if cleanup is not None:
+            cleanup()
+
+        if isinstance(result, dict) and result.get('success') is False:
+            raise RuntimeError(result.get('message'))
+        if index >= (0 if case.rounds == 1 else 1):
+            timings.append(elapsed)
+            queries = stats.count
+
+    return {
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'min_ms': round(min(timings) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3),
+        'rounds': len(timings),
+        'queries': queries
+    }
+
+
+def run_suite(app, spec: DatasetSpec, rounds: int = DEFAULT_ROUNDS, name_filter: Optional[str] = None,
+              progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+    Run every case (or those whose name contains name_filter)
+
+    Returns:
+        Dict: Run metadata, and per case its timings or its error
+    """
+    report = progress or (lambda message: None)
+    fixtures = Fixtures(spec)
+    results = {}
+    errors = {}
+
+    with app.app_context():
+        fixtures.load()
+        cases = service_cases(fixtures) + route_cases(app, fixtures)
+        for case in cases:
+            if name_filter and name_filter not in case.name:
+                continue
+            try:
+                results[case.name] = run_case(case, rounds, fixtures.cleanup)
+                report(f"{case.name}: median {results[case.name]['median_ms']} ms, fastest {results[case.name]['min_ms']} ms")
+            except Exception as e:
+                db.session.rollback()
+                fixtures.cleanup()
+                errors[case.name] = str(e)
+                report(f'{case.name}: FAILED {e}')
+
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': environment(),
+        'dataset': spec.to_dict(),
+        'rounds': rounds,
+        'results': results,
+        'errors': errors
+    }
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'sqlalchemy': sqlalchemy.__version__,
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'commit': commit
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD,
+            min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> List[Dict[str, Any]]:
+    """
+    Cases of current that regressed against baseline
+
+    A case regresses when its fastest round got slower by more than
+    threshold (a fraction) and by more than min_delta_ms, or when it ran
+    more SQL statements. The fastest round is compared rather than the
+    median since it is the least disturbed by other load on the machine.
+    Cases missing from either run are not compared.
+
+    Raises:
+        ValueError: If the runs used different datasets
+    """
+    if current['dataset'] != baseline['dataset']:
+        raise ValueError('The baseline was recorded on a different dataset')
+
+    regressions = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+
+        reasons = []
+        delta = result['min_ms'] - before['min_ms']
+        if delta > before['min_ms'] * threshold and delta > min_delta_ms:
+            reasons.append(f"fastest round {before['min_ms']} -> {result['min_ms']} ms")
+        if result['queries'] > before['queries']:
+            reasons.append(f"queries {before['queries']} -> {result['queries']}")
+        if reasons:
+            regressions.append({'name': name, 'reasons': reasons})
+    return regressions
+
+
+def print_results(run: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    previous = baseline['results'] if baseline else {}
+    print(f"{'case':<72}  {'median ms':>10}  {'fastest ms':>10}  {'baseline':>10}  {'change':>7}  {'queries':>7}")
+    for name, result in run['results'].items():
+        before = previous.get(name)
+        if before and before['min_ms']:
+            change = f"{(result['min_ms'] / before['min_ms'] - 1) * 100:+.0f}%"
+            base = f"{before['min_ms']:.2f}"
+        else:
+            change = base = '-'
+        print(f"{name[:72]:<72}  {result['median_ms']:>10.2f}  {result['min_ms']:>10.2f}  {base:>10}  {change:>7}  "
+              f"{result['queries']:>7}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark every service method and route')
+    parser.add_argument('--database', help='Existing database generated by benchmarks.datagen, '
+                                           'instead of generating one from the dataset options')
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument('--filter', help='Only run cases whose name contains this text')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Fail on regressions against this results file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed slowdown as a fraction (default: 0.2)')
+    parser.add_argument('--min-delta', type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help='Slowdowns below this many milliseconds are noise (default: 1)')
+    spec_arguments(parser)
+    arguments = parser.parse_args(argv)
+
+    # The per-request and slow query logs would drown the report
+    logging.getLogger('accounting').setLevel(logging.ERROR)
+
+    spec = load_spec(arguments.database) if arguments.database else spec_from_arguments(arguments)
+    app, database_path = create_suite_app(arguments.database)
+    try:
+        if arguments.database is None:
+            generate_dataset(app, spec, progress=lambda message: print(f'  load {message}', file=sys.stderr))
+
+        cases_missing = uncovered(app, service_cases(Fixtures(spec)) + route_cases(app, Fixtures(spec)))
+        for name in cases_missing:
+            print(f'warning: no benchmark case for {name}', file=sys.stderr)
+
+        run = run_suite(app, spec, arguments.rounds, arguments.filter,
+                        progress=lambda message: print(f'  {message}', file=sys.stderr))
+    finally:
+        if arguments.database is None:
+            os.unlink(database_path)
+
+    baseline = None
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+    print_results(run, baseline)
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(run, file, indent=2)
+
+    failed = bool(run['errors'])
+    for name, error in run['errors'].items():
+        print(f'FAILED {name}: {error}')
+
+    if baseline is not None:
+        try:
+            regressions = compare(run, baseline, arguments.threshold, arguments.min_delta)
+        except ValueError as e:
+            print(f'error: {e}', file=sys.stderr)
+            return 2
+        for regression in regressions:
+            print(f"REGRESSION {regression['name']}: {'; '.join(regression['reasons'])}")
+        failed = failed or bool(regressions)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
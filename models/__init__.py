@@ -2,5 +2,8 @@ from .user import User, db
 from .customer import Customer
 from .invoice import Invoice
 from .transaction import Transaction
+from .daily_rollup import DailyRollup
+from .replication import ReplicationHeartbeat
+from . import search
 
-__all__ = ['User', 'Customer', 'Invoice', 'Transaction', 'db'] 
\ No newline at end of file
+__all__ = ['User', 'Customer', 'Invoice', 'Transaction', 'DailyRollup', 'ReplicationHeartbeat', 'db'] 
@@ -0,0 +1,29 @@
+from .user import db
+
+class DailyRollup(db.Model):
+    __tablename__ = 'daily_rollups'
+    __table_args__ = (
+        db.Index('ix_daily_rollups_type_date', 'type', 'date'),
+    )
+
+    date = db.Column(db.Date, primary_key=True)
+    type = db.Column(db.String(50), primary_key=True)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, date, type, total_amount=0.0, transaction_count=0):
+        self.date = date
+        self.type = type
+        self.total_amount = total_amount
+        self.transaction_count = transaction_count
+
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat() if self.date else None,
+            'type': self.type,
+            'total_amount': self.total_amount,
+            'transaction_count': self.transaction_count
+        }
+
+    def __repr__(self):
+        return f"<DailyRollup {self.date} {self.type}>"
@@ -3,6 +3,11 @@ from .user import db
 
 class Invoice(db.Model):
     __tablename__ = 'invoices'
+    __table_args__ = (
+        db.Index('ix_invoices_date_id', 'date', 'id'),
+        db.Index('ix_invoices_status_date', 'status', 'date'),
+        db.Index('ix_invoices_customer_id_date', 'customer_id', 'date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
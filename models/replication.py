@@ -0,0 +1,23 @@
+from datetime import datetime
+from utils.replica import HEARTBEAT_TABLE
+from .user import db
+
+class ReplicationHeartbeat(db.Model):
+    """Single row the primary keeps touching; its age on a replica is the replica's lag"""
+    __tablename__ = HEARTBEAT_TABLE
+
+    id = db.Column(db.Integer, primary_key=True)
+    beat_at = db.Column(db.DateTime, nullable=False)
+
+    def __init__(self, beat_at, id=1):
+        self.id = id
+        self.beat_at = beat_at
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'beat_at': self.beat_at.isoformat() if self.beat_at else None
+        }
+
+    def __repr__(self):
+        return f"<ReplicationHeartbeat {self.beat_at}>"
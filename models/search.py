@@ -0,0 +1,225 @@
+import re
+from sqlalchemy import and_, column, event, func, inspect, or_, select, text
+from typing import Any, List, Optional, Sequence, Tuple
+from .user import User
+from .customer import Customer
+from .transaction import Transaction
+
+SEARCH_MODES = ('prefix', 'full')
+
+
+def search_index_supported(connection) -> bool:
+    """Whether the database can host FTS5 search indexes"""
+    return connection.dialect.name == 'sqlite'
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a free-text query into lowercase word terms"""
+    return re.findall(r'\w+', (query or '').lower())
+
+
+class SearchIndex:
+    """
+    External-content FTS5 index over some columns of a table
+
+    Triggers on the table keep the index in step with every write,
+    including bulk executemany statements. The index is created together
+    with the table and dropped with it.
+    """
+
+    def __init__(self, name: str, table, columns: Sequence[str], weights: Optional[Sequence[float]] = None):
+        self.name = name
+        self.table = table
+        self.columns = list(columns)
+        self.weights = list(weights) if weights else [1.0] * len(self.columns)
+
+        event.listen(table, 'after_create', lambda target, connection, **kw: self.install(connection))
+        event.listen(table, 'before_drop', lambda target, connection, **kw: self.drop(connection))
+
+    def ddl(self) -> List[str]:
+        """CREATE statements for the virtual table and its sync triggers"""
+        columns = ', '.join(self.columns)
+        new_values = ', '.join(f'new.{name}' for name in self.columns)
+        old_values = ', '.join(f'old.{name}' for name in self.columns)
+        insert_new = f'INSERT INTO {self.name}(rowid, {columns}) VALUES (new.id, {new_values});'
+        delete_old = f"INSERT INTO {self.name}({self.name}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.name} USING fts5("
+            f"{columns}, content='{self.table.name}', content_rowid='id')",
+            f'CREATE TRIGGER IF NOT EXISTS {self.name}_ai AFTER INSERT ON {self.table.name} BEGIN {insert_new} END',
+            f'CREATE TRIGGER IF NOT EXISTS {self.name}_ad AFTER DELETE ON {self.table.name} BEGIN {delete_old} END',
+            f'CREATE TRIGGER IF NOT EXISTS {self.name}_au AFTER UPDATE OF {columns} ON {self.table.name} '
+            f'BEGIN {delete_old} {insert_new} END'
+        ]
+
+    def install(self, connection) -> bool:
+        """
+        Create the index and its triggers if missing
+
+        An index created for an existing table is populated from it.
+
+        Args:
+            connection: SQLAlchemy connection
+
+        Returns:
+            bool: True if the index was created
+        """
+        if not search_index_supported(connection):
+            return False
+
+        if self.name in inspect(connection).get_table_names():
+            return False
+
+        for statement in self.ddl():
+            connection.execute(text(statement))
+        self.rebuild(connection)
+        return True
+
+    def rebuild(self, connection) -> None:
+        """Repopulate the index from its table"""
+        if search_index_supported(connection):
+            connection.execute(text(f"INSERT INTO {self.name}({self.name}) VALUES ('rebuild')"))
+
+    def drop(self, connection) -> None:
+        """Drop the index; its triggers go with the table"""
+        if search_index_supported(connection):
+            connection.execute(text(f'DROP TABLE IF EXISTS {self.name}'))
+
+    def match_expression(self, terms: Sequence[str], mode: str = 'prefix') -> str:
+        """
+        FTS5 MATCH expression requiring every term
+
+        Args:
+            terms: Search terms
+            mode: 'prefix' matches terms as word prefixes (autocomplete),
+                'full' only as whole words
+
+        Returns:
+            str: MATCH expression
+        """
+        suffix = '*' if mode == 'prefix' else ''
+        return ' '.join(f'"{term}"{suffix}' for term in terms)
+
+    def matching_ids(self, terms: Sequence[str], mode: str = 'prefix'):
+        """Select of the rowids matching the terms, for use in an IN predicate"""
+        return text(
+            f'SELECT rowid FROM {self.name} WHERE {self.name} MATCH :match'
+        ).bindparams(match=self.match_expression(terms, mode)).columns(column('rowid'))
+
+    def ranked_ids(self, connection, terms: Sequence[str], mode: str = 'prefix', limit: int = 10, offset: int = 0) -> List[int]:
+        """
+        Rowids matching the terms, best bm25 rank first
+
+        Args:
+            connection: SQLAlchemy connection or session
+            terms: Search terms
+            mode: 'prefix' or 'full'
+            limit: Maximum number of rowids
+            offset: Number of rowids to skip
+
+        Returns:
+            List: Rowids in rank order
+        """
+        weights = ', '.join(str(weight) for weight in self.weights)
+        return list(connection.execute(
+            text(
+                f'SELECT rowid FROM {self.name} WHERE {self.name} MATCH :match '
+                f'ORDER BY bm25({self.name}, {weights}), rowid LIMIT :limit OFFSET :offset'
+            ),
+            {'match': self.match_expression(terms, mode), 'limit': limit, 'offset': offset}
+        ).scalars())
+
+    def count(self, connection, terms: Sequence[str], mode: str = 'prefix') -> int:
+        """Number of rows matching the terms"""
+        return connection.execute(
+            text(f'SELECT count(*) FROM {self.name} WHERE {self.name} MATCH :match'),
+            {'match': self.match_expression(terms, mode)}
+        ).scalar()
+
+    def search(self, session, model, query: str, mode: str = 'prefix', limit: int = 10, offset: int = 0,
+               include_total: bool = True, columns: Optional[Sequence[Any]] = None) -> Tuple[List[Any], Optional[int]]:
+        """
+        Load the model rows matching a free-text query, best match first
+
+        Without FTS5 every term has to appear as a substring of one of the
+        indexed columns (LIKE), and rows come back in id order.
+
+        Args:
+            session: SQLAlchemy session
+            model: Mapped class of the indexed table
+            query: Free-text query
+            mode: 'prefix' or 'full'
+            limit: Maximum number of rows
+            offset: Number of rows to skip
+            include_total: Whether to count every matching row
+            columns: Table columns, including id, to load as plain rows
+                instead of model instances
+
+        Returns:
+            Tuple: (rows, total); total is None when include_total is False
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Search mode must be one of: {', '.join(SEARCH_MODES)}")
+
+        terms = search_terms(query)
+        if not terms:
+            return [], 0 if include_total else None
+
+        statement = select(*columns) if columns is not None else select(model)
+
+        if not search_index_supported(session.connection()):
+            indexed_columns = [getattr(model, name) for name in self.columns]
+            predicate = and_(*[
+                or_(*[func.lower(column).like(f'%{term}%') for column in indexed_columns])
+                for term in terms
+            ])
+            rows = session.execute(
+                statement.where(predicate).order_by(model.id).limit(limit).offset(offset)
+            ).all()
+            if columns is None:
+                rows = [row[0] for row in rows]
+            total = session.scalar(select(func.count()).select_from(model).where(predicate)) if include_total else None
+            return list(rows), total
+
+        ids = self.ranked_ids(session, terms, mode, limit, offset)
+        rows_by_id = {}
+        if ids:
+            result = session.execute(statement.where(model.id.in_(ids)))
+            rows_by_id = {row.id: row for row in (result if columns is not None else result.scalars())}
+        total = self.count(session, terms, mode) if include_total else None
+        return [rows_by_id[row_id] for row_id in ids if row_id in rows_by_id], total
+
+
+transaction_search = SearchIndex('transactions_fts', Transaction.__table__, ['type', 'amount'])
+user_search = SearchIndex('users_fts', User.__table__, ['fullname', 'email'], weights=[2.0, 1.0])
+customer_search = SearchIndex(
+    'customers_fts',
+    Customer.__table__,
+    ['name', 'email', 'phone', 'address'],
+    weights=[4.0, 2.0, 2.0, 1.0]
+)
+
+SEARCH_INDEXES = [transaction_search, user_search, customer_search]
+
+
+def install_search_indexes(connection) -> List[str]:
+    """
+    Create every search index missing from the database
+
+    Args:
+        connection: SQLAlchemy connection
+
+    Returns:
+        List: Names of the indexes created
+    """
+    return [index.name for index in SEARCH_INDEXES if index.install(connection)]
+
+
+def rebuild_search_indexes(connection) -> None:
+    """Repopulate every search index from its table"""
+    for index in SEARCH_INDEXES:
+        index.rebuild(connection)
@@ -0,0 +1,70 @@
+from sqlalchemy import Date, DateTime, select
+from typing import Any, Callable, Dict, List, Sequence
+from .user import User
+from .customer import Customer
+from .invoice import Invoice
+from .transaction import Transaction
+
+
+class RowSerializer:
+    """
+    Turns plain column tuples into the dicts a model's to_dict builds
+
+    List endpoints select the columns through Core instead of loading ORM
+    objects, and the row-to-dict function is generated once per table, so
+    a page costs one tuple unpack and one dict display per row. Date and
+    datetime columns are formatted exactly like to_dict does.
+    """
+
+    def __init__(self, table, fields: Sequence[str]):
+        self.table = table
+        self.fields = list(fields)
+        self.columns = [table.c[name] for name in self.fields]
+        self._serialize = self._compile()
+
+    def _compile(self) -> Callable[[Sequence[Any]], Dict[str, Any]]:
+        names = [f'_{index}' for index in range(len(self.columns))]
+        values = []
+        for field, name, column_ in zip(self.fields, names, self.columns):
+            if isinstance(column_.type, (Date, DateTime)):
+                values.append(f'{field!r}: {name}.isoformat() if {name} else None')
+            else:
+                values.append(f'{field!r}: {name}')
+
+        source = (
+            f'def serialize(row):\n'
+            f'    {", ".join(names)}, = row\n'
+            f'    return {{{", ".join(values)}}}\n'
+        )
+        namespace = {}
+        exec(compile(source, f'<{self.table.name} row serializer>', 'exec'), namespace)
+        return namespace['serialize']
+
+    def select(self):
+        """Core select of the serialized columns"""
+        return select(*self.columns)
+
+    def __call__(self, row: Sequence[Any]) -> Dict[str, Any]:
+        return self._serialize(row)
+
+    def serialize_all(self, rows) -> List[Dict[str, Any]]:
+        """Serialize every row of a result or list of rows"""
+        return list(map(self._serialize, rows))
+
+
+transaction_rows = RowSerializer(
+    Transaction.__table__,
+    ['id', 'invoice_id', 'amount', 'date', 'type', 'created_at', 'updated_at']
+)
+invoice_rows = RowSerializer(
+    Invoice.__table__,
+    ['id', 'customer_id', 'date', 'total_amount', 'status', 'created_at', 'updated_at']
+)
+customer_rows = RowSerializer(
+    Customer.__table__,
+    ['id', 'name', 'address', 'phone', 'email', 'created_at', 'updated_at']
+)
+user_rows = RowSerializer(
+    User.__table__,
+    ['id', 'fullname', 'email', 'role', 'created_at', 'updated_at']
+)
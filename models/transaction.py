@@ -3,6 +3,12 @@ from .user import db
 
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        db.Index('ix_transactions_date_id', 'date', 'id'),
+        db.Index('ix_transactions_type_date', 'type', 'date'),
+        db.Index('ix_transactions_invoice_id_date', 'invoice_id', 'date'),
+        db.Index('ix_transactions_amount', 'amount'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'), nullable=False)
@@ -1,8 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.passwords import hash_password, password_needs_rehash, verify_password
+from utils.replica import RoutingSession
 from datetime import datetime
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -18,14 +19,17 @@ class User(db.Model):
     def __init__(self, fullname, email, password, role='user'):
         self.fullname = fullname
         self.email = email.lower().strip()
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
         self.role = role
     
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        return verify_password(self.password, password)
+    
+    def password_needs_rehash(self):
+        return password_needs_rehash(self.password)
     
     def to_dict(self):
         return {
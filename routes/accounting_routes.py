@@ -1,10 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app
 from services.accounting_service import AccountingService
+from services.rollup_service import RollupService
+from services.replication_service import ReplicationService
+from models import db
+from models.search import install_search_indexes, rebuild_search_indexes, search_index_supported
+from utils.engine import engine_diagnostics
 from utils.jwt_utils import token_required, admin_required
+from utils.profiling import EXTENSION_KEY as REQUEST_PROFILER, SORT_COLUMNS
+from utils.schema import ensure_indexes
+from utils.slow_queries import EXTENSION_KEY as SLOW_QUERY_LOG
 from datetime import datetime
 
 accounting_bp = Blueprint('accounting', __name__, url_prefix='/api/accounting')
 
+MAX_CASH_FLOW_DAYS = 3660
+
 @accounting_bp.route('/summary', methods=['GET'])
 @token_required
 def get_financial_summary():
@@ -84,10 +94,14 @@ def get_monthly_report(year, month):
 @token_required
 def get_cash_flow():
     """
-    Cash
+    Cash flow report endpoint
+    Query parameters: period_days, start_date, end_date (YYYY-MM-DD format), opening_balance
     """
     try:
         period_days = request.args.get('period_days', 30, type=int)
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        opening_balance = request.args.get('opening_balance', type=float)
         
         if period_days < 1 or period_days > 365:
             return jsonify({
@@ -95,7 +109,39 @@ def get_cash_flow():
                 'message': 'Period must be between 1 and 365 days'
             }), 400
         
-        result = AccountingService.get_cash_flow(period_days)
+        if start_date:
+            try:
+                start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'message': 'Start date must be in YYYY-MM-DD format'
+                }), 400
+        
+        if end_date:
+            try:
+                end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'message': 'End date must be in YYYY-MM-DD format'
+                }), 400
+        
+        if start_date:
+            range_end = end_date_obj if end_date else datetime.now().date()
+            range_days = (range_end - start_date_obj).days + 1
+            if range_days < 1 or range_days > MAX_CASH_FLOW_DAYS:
+                return jsonify({
+                    'success': False,
+                    'message': f'Date range must be between 1 and {MAX_CASH_FLOW_DAYS} days'
+                }), 400
+        
+        result = AccountingService.get_cash_flow(
+            period_days,
+            start_date=start_date,
+            end_date=end_date,
+            opening_balance=opening_balance
+        )
         
         if result['success']:
             return jsonify(result), 200
@@ -240,29 +286,12 @@ def get_dashboard_data():
     Accounting dashboard endpoint
     """
     try:
-        end_date = datetime.now().date().isoformat()
-        start_date = (datetime.now().date().replace(day=1)).isoformat()
-        
-        financial_summary = AccountingService.get_financial_summary(start_date, end_date)
-        invoice_summary = AccountingService.get_invoice_status_summary()
-        transaction_summary = AccountingService.get_transaction_summary_by_type()
-        cash_flow = AccountingService.get_cash_flow(30)
+        result = AccountingService.get_dashboard()
         
-        dashboard_data = {
-            'success': True,
-            'dashboard': {
-                'financial_summary': financial_summary.get('summary'),
-                'invoice_summary': invoice_summary.get('invoice_summary'),
-                'transaction_summary': transaction_summary.get('transaction_summary'),
-                'cash_flow_summary': {
-                    'final_balance': cash_flow.get('cash_flow', {}).get('final_balance', 0),
-                    'period_days': 30
-                },
-                'last_updated': datetime.now().isoformat()
-            }
-        }
-        
-        return jsonify(dashboard_data), 200
+        if result['success']:
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 400
         
     except Exception as e:
         return jsonify({
@@ -284,33 +313,12 @@ def get_yearly_report(year):
                 'message': f'Year must be between 2000 and {current_year + 10}'
             }), 400
         
-        start_date = f"{year}-01-01"
-        end_date = f"{year}-12-31"
+        result = AccountingService.get_yearly_report(year)
         
-        financial_summary = AccountingService.get_financial_summary(start_date, end_date)
-        profit_loss = AccountingService.get_profit_loss_statement(start_date, end_date)
-        
-        monthly_data = []
-        for month in range(1, 13):
-            monthly_report = AccountingService.get_monthly_report(year, month)
-            if monthly_report['success']:
-                monthly_data.append({
-                    'month': month,
-                    'month_name': monthly_report['report']['period']['month_name'],
-                    'summary': monthly_report['report']['summary']
-                })
-        
-        yearly_report = {
-            'success': True,
-            'yearly_report': {
-                'year': year,
-                'financial_summary': financial_summary.get('summary'),
-                'profit_loss': profit_loss.get('profit_loss'),
-                'monthly_breakdown': monthly_data
-            }
-        }
-        
-        return jsonify(yearly_report), 200
+        if result['success']:
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 400
         
     except Exception as e:
         return jsonify({
@@ -328,3 +336,247 @@ def health_check():
         'message': 'Accounting service is running',
         'timestamp': datetime.now().isoformat()
     }), 200
+
+@accounting_bp.route('/diagnostics/database', methods=['GET'])
+@admin_required
+def database_diagnostics():
+    """
+    Active engine profile, connection pool state and live SQLite pragmas
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'database': engine_diagnostics(current_app, db.engine)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting database diagnostics: {str(e)}'
+        }), 500
+
+@accounting_bp.route('/diagnostics/replica', methods=['GET'])
+@admin_required
+def replica_diagnostics():
+    """
+    Read replica lag, lag tolerance and routing counters
+    """
+    try:
+        return jsonify(ReplicationService.get_replica_status()), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting replica status: {str(e)}'
+        }), 500
+
+@accounting_bp.route('/diagnostics/slow-queries', methods=['GET'])
+@admin_required
+def slow_query_diagnostics():
+    """
+    Recent statements over the slow query threshold, newest first
+    Query parameters: limit (optional)
+    """
+    try:
+        log = current_app.extensions.get(SLOW_QUERY_LOG)
+        if log is None:
+            return jsonify({
+                'success': False,
+                'message': 'Slow query log is disabled'
+            }), 404
+        
+        limit = request.args.get('limit', type=int)
+        if limit is not None and limit < 1:
+            return jsonify({
+                'success': False,
+                'message': 'limit must be a positive integer'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'slow_queries': log.to_dict(limit)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting slow queries: {str(e)}'
+        }), 500
+
+@accounting_bp.route('/diagnostics/slow-queries', methods=['DELETE'])
+@admin_required
+def clear_slow_queries():
+    """
+    Empty the slow query buffer
+    """
+    try:
+        log = current_app.extensions.get(SLOW_QUERY_LOG)
+        if log is None:
+            return jsonify({
+                'success': False,
+                'message': 'Slow query log is disabled'
+            }), 404
+        
+        dropped = log.clear()
+        return jsonify({
+            'success': True,
+            'message': f'{dropped} slow query entries cleared'
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error clearing slow queries: {str(e)}'
+        }), 500
+
+@accounting_bp.route('/diagnostics/profiles', methods=['GET'])
+@admin_required
+def list_profiles():
+    """
+    Requests profiled with the X-Profile header, newest first
+    """
+    try:
+        profiler = current_app.extensions.get(REQUEST_PROFILER)
+        if profiler is None:
+            return jsonify({
+                'success': False,
+                'message': 'Request profiling is disabled'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'profiles': [profile.summary() for profile in profiler.profiles()]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error listing profiles: {str(e)}'
+        }), 500
+
+@accounting_bp.route('/diagnostics/profiles/<profile_id>', methods=['GET'])
+@admin_required
+def get_profile(profile_id):
+    """
+    Top functions of a profiled request, or the raw profile
+    Query parameters: sort (cumulative, tottime, calls), limit, format (json, pstats)
+    """
+    try:
+        profiler = current_app.extensions.get(REQUEST_PROFILER)
+        profile = profiler.get(profile_id) if profiler is not None else None
+        if profile is None:
+            return jsonify({
+                'success': False,
+                'message': 'Profile not found'
+            }), 404
+        
+        if request.args.get('format') == 'pstats':
+            return Response(
+                profile.dump(),
+                mimetype='application/octet-stream',
+                headers={'Content-Disposition': f'attachment; filename=profile-{profile.id}.prof'}
+            )
+        
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in SORT_COLUMNS:
+            return jsonify({
+                'success': False,
+                'message': f"sort must be one of: {', '.join(SORT_COLUMNS)}"
+            }), 400
+        
+        limit = request.args.get('limit', profiler.top, type=int)
+        if limit < 1:
+            return jsonify({
+                'success': False,
+                'message': 'limit must be a positive integer'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'profile': profile.to_dict(limit, sort)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting profile: {str(e)}'
+        }), 500
+
+@accounting_bp.route('/diagnostics/profiles', methods=['DELETE'])
+@admin_required
+def clear_profiles():
+    """
+    Drop the kept request profiles
+    """
+    try:
+        profiler = current_app.extensions.get(REQUEST_PROFILER)
+        if profiler is None:
+            return jsonify({
+                'success': False,
+                'message': 'Request profiling is disabled'
+            }), 404
+        
+        dropped = profiler.clear()
+        return jsonify({
+            'success': True,
+            'message': f'{dropped} profiles cleared'
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error clearing profiles: {str(e)}'
+        }), 500
+
+@accounting_bp.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """
+    Rebuild the daily ledger rollups from the transactions table
+    """
+    result = RollupService.rebuild_daily_rollups()
+    print(result['message'])
+    
+    if not result['success']:
+        raise SystemExit(1)
+
+@accounting_bp.cli.command('ensure-indexes')
+def ensure_indexes_command():
+    """
+    Create the model indexes missing from an existing database
+    """
+    created = ensure_indexes(db.engine, db.metadata)
+    
+    if created:
+        print(f'Created {len(created)} indexes: {", ".join(created)}')
+    else:
+        print('All indexes are present')
+
+@accounting_bp.cli.command('rebuild-search-indexes')
+def rebuild_search_indexes_command():
+    """
+    Create missing full-text search indexes and repopulate the others
+    """
+    with db.engine.begin() as connection:
+        if not search_index_supported(connection):
+            print('Full-text search indexes are only available on SQLite')
+            return
+        
+        created = install_search_indexes(connection)
+        rebuild_search_indexes(connection)
+    
+    if created:
+        print(f'Created search indexes: {", ".join(created)}')
+    print('Search indexes rebuilt')
+
+@accounting_bp.cli.command('sync-replica')
+def sync_replica_command():
+    """
+    Copy the primary SQLite database over the read replica
+    """
+    result = ReplicationService.sync_sqlite_replica()
+    
+    if result['success']:
+        print(f"{result['message']} in {result['duration_ms']} ms")
+    else:
+        print(result['message'])
+        raise SystemExit(1)
@@ -41,6 +41,8 @@ def register():
                     'success': False,
                     'message': f'User created but token generation failed: {str(e)}'
                 }), 500
+        elif result.get('busy'):
+            return jsonify(result), 503, {'Retry-After': '1'}
         else:
             return jsonify(result), 400
             
@@ -83,6 +85,8 @@ def login():
                     'success': False,
                     'message': f'Authentication successful but token generation failed: {str(e)}'
                 }), 500
+        elif result.get('busy'):
+            return jsonify(result), 503, {'Retry-After': '1'}
         else:
             return jsonify(result), 401
             
@@ -116,6 +120,8 @@ def change_password():
         
         if result['success']:
             return jsonify(result), 200
+        elif result.get('busy'):
+            return jsonify(result), 503, {'Retry-After': '1'}
         else:
             return jsonify(result), 400
             
@@ -0,0 +1,62 @@
+from flask import Blueprint, request, jsonify
+from services.customer_service import CustomerService
+from utils.jwt_utils import token_required
+
+customer_bp = Blueprint('customers', __name__, url_prefix='/api/customers')
+
+@customer_bp.route('/search', methods=['GET'])
+@token_required
+def search_customers():
+    """Search customers by name, email, phone or address"""
+    try:
+        query = request.args.get('q', '')
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 10, type=int)
+        mode = request.args.get('mode', 'prefix')
+        
+        if not query:
+            return jsonify({
+                'success': False,
+                'message': 'Search query is required'
+            }), 400
+        
+        per_page = min(per_page, 100)
+        
+        result = CustomerService.search_customers(
+            query=query,
+            page=page,
+            per_page=per_page,
+            mode=mode
+        )
+        
+        if result['success']:
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 400
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error searching customers: {str(e)}'
+        }), 500
+
+@customer_bp.route('/autocomplete', methods=['GET'])
+@token_required
+def autocomplete_customers():
+    """Suggest customers for the text typed so far"""
+    try:
+        query = request.args.get('q', '')
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+        
+        result = CustomerService.autocomplete_customers(query=query, limit=limit)
+        
+        if result['success']:
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 400
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error searching customers: {str(e)}'
+        }), 500
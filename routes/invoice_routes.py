@@ -1,6 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
+import click
 from services.invoice_service import InvoiceService
 from utils.jwt_utils import token_required, admin_required
+from utils.export import EXPORT_FORMATS, export_lines, parse_export_dates
 
 invoice_bp = Blueprint('invoices', __name__, url_prefix='/api/invoices')
 
@@ -12,9 +14,11 @@ def get_invoices():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'true').lower() != 'false'
         per_page = min(per_page, 100)
         
-        result = InvoiceService.get_all_invoices(page=page, per_page=per_page)
+        result = InvoiceService.get_all_invoices(page=page, per_page=per_page, cursor=cursor, include_total=include_total)
         
         if result['success']:
             return jsonify(result), 200
@@ -90,6 +94,91 @@ def create_invoice():
             'message': f'Error creating invoice: {str(e)}'
         }), 500
 
+@invoice_bp.route('/bulk', methods=['POST'])
+@token_required
+def create_invoices_bulk():
+    """
+    Create many invoices in one request
+    Body: {"invoices": [{customer_id, date, total_amount, status}, ...]}
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('invoices'), list) or not data['invoices']:
+            return jsonify({
+                'success': False,
+                'message': 'A non-empty invoices list is required'
+            }), 400
+        
+        max_rows = current_app.config.get('BULK_MAX_ROWS', 50000)
+        if len(data['invoices']) > max_rows:
+            return jsonify({
+                'success': False,
+                'message': f'At most {max_rows} invoices can be created per request'
+            }), 400
+        
+        result = InvoiceService.create_invoices_bulk(
+            data['invoices'],
+            chunk_size=current_app.config.get('BULK_INSERT_CHUNK_SIZE', 1000)
+        )
+        
+        if result['success']:
+            return jsonify(result), 201
+        else:
+            return jsonify(result), 400
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error creating invoices: {str(e)}'
+        }), 500
+
+@invoice_bp.route('/bulk/status', methods=['PATCH'])
+@token_required
+def update_invoice_status_bulk():
+    """
+    Set the status of many invoices
+    Body: {"invoice_ids": [...], "status": "paid"}
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'status' not in data:
+            return jsonify({
+                'success': False,
+                'message': 'Status field is required'
+            }), 400
+        
+        if not isinstance(data.get('invoice_ids'), list) or not data['invoice_ids']:
+            return jsonify({
+                'success': False,
+                'message': 'A non-empty invoice_ids list is required'
+            }), 400
+        
+        max_rows = current_app.config.get('BULK_MAX_ROWS', 50000)
+        if len(data['invoice_ids']) > max_rows:
+            return jsonify({
+                'success': False,
+                'message': f'At most {max_rows} invoices can be updated per request'
+            }), 400
+        
+        result = InvoiceService.update_invoice_status_bulk(
+            data['invoice_ids'],
+            data['status'],
+            chunk_size=current_app.config.get('BULK_INSERT_CHUNK_SIZE', 1000)
+        )
+        
+        if result['success']:
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 400
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error updating invoice statuses: {str(e)}'
+        }), 500
+
 @invoice_bp.route('/<int:invoice_id>', methods=['PUT'])
 @token_required
 def update_invoice(invoice_id):
@@ -168,9 +257,10 @@ def get_invoices_by_customer(customer_id):
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
+        include_total = request.args.get('include_total', 'true').lower() != 'false'
         per_page = min(per_page, 100)
         
-        result = InvoiceService.get_invoices_by_customer(customer_id, page=page, per_page=per_page)
+        result = InvoiceService.get_invoices_by_customer(customer_id, page=page, per_page=per_page, include_total=include_total)
         
         if result['success']:
             return jsonify(result), 200
@@ -191,9 +281,11 @@ def get_invoices_by_status(status):
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'true').lower() != 'false'
         per_page = min(per_page, 100)
         
-        result = InvoiceService.get_invoices_by_status(status, page=page, per_page=per_page)
+        result = InvoiceService.get_invoices_by_status(status, page=page, per_page=per_page, cursor=cursor, include_total=include_total)
         
         if result['success']:
             return jsonify(result), 200
@@ -232,9 +324,11 @@ def get_pending_invoices():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'true').lower() != 'false'
         per_page = min(per_page, 100)
         
-        result = InvoiceService.get_invoices_by_status('pending', page=page, per_page=per_page)
+        result = InvoiceService.get_invoices_by_status('pending', page=page, per_page=per_page, cursor=cursor, include_total=include_total)
         
         if result['success']:
             return jsonify(result), 200
@@ -255,9 +349,11 @@ def get_paid_invoices():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'true').lower() != 'false'
         per_page = min(per_page, 100)
         
-        result = InvoiceService.get_invoices_by_status('paid', page=page, per_page=per_page)
+        result = InvoiceService.get_invoices_by_status('paid', page=page, per_page=per_page, cursor=cursor, include_total=include_total)
         
         if result['success']:
             return jsonify(result), 200
@@ -278,9 +374,11 @@ def get_overdue_invoices():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'true').lower() != 'false'
         per_page = min(per_page, 100)
         
-        result = InvoiceService.get_invoices_by_status('overdue', page=page, per_page=per_page)
+        result = InvoiceService.get_invoices_by_status('overdue', page=page, per_page=per_page, cursor=cursor, include_total=include_total)
         
         if result['success']:
             return jsonify(result), 200
@@ -292,3 +390,60 @@ def get_overdue_invoices():
             'success': False,
             'message': f'Error getting overdue invoices: {str(e)}'
         }), 500
+
+@invoice_bp.route('/export', methods=['GET'])
+@token_required
+def export_invoices():
+    """
+    Stream invoices as NDJSON or CSV
+    Query parameters: format (ndjson|csv), start_date, end_date (YYYY-MM-DD format), status, customer_id
+    """
+    try:
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'message': f'Format must be one of: {", ".join(EXPORT_FORMATS)}'
+            }), 400
+        
+        try:
+            start_date, end_date = parse_export_dates(request.args.get('start_date'), request.args.get('end_date'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        records = InvoiceService.iter_invoices(
+            start_date=start_date,
+            end_date=end_date,
+            status=request.args.get('status'),
+            customer_id=request.args.get('customer_id', type=int)
+        )
+        
+        return Response(
+            stream_with_context(export_lines(records, export_format, InvoiceService.EXPORT_FIELDS)),
+            mimetype=EXPORT_FORMATS[export_format],
+            headers={'Content-Disposition': f'attachment; filename=invoices.{export_format}'}
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error exporting invoices: {str(e)}'
+        }), 500
+
+@invoice_bp.cli.command('mark-overdue')
+@click.option('--grace-days', type=int, default=None, help='Days an invoice may stay pending (default: OVERDUE_GRACE_DAYS)')
+def mark_overdue_command(grace_days):
+    """
+    Move pending invoices past the grace period to overdue
+    """
+    if grace_days is None:
+        grace_days = current_app.config.get('OVERDUE_GRACE_DAYS', 30)
+    
+    result = InvoiceService.mark_overdue_invoices(grace_days)
+    print(result['message'])
+    
+    if not result['success']:
+        raise SystemExit(1)
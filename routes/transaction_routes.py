@@ -1,6 +1,7 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
 from services.transaction_service import TransactionService
 from utils.jwt_utils import token_required, admin_required
+from utils.export import EXPORT_FORMATS, export_lines, parse_export_dates
 
 transaction_bp = Blueprint('transactions', __name__, url_prefix='/api/transactions')
 
@@ -12,9 +13,11 @@ def get_transactions():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'true').lower() != 'false'
         per_page = min(per_page, 100)
         
-        result = TransactionService.get_all_transactions(page=page, per_page=per_page)
+        result = TransactionService.get_all_transactions(page=page, per_page=per_page, cursor=cursor, include_total=include_total)
         
         if result['success']:
             return jsonify(result), 200
@@ -90,6 +93,45 @@ def create_transaction():
             'message': f'Error creating transaction: {str(e)}'
         }), 500
 
+@transaction_bp.route('/bulk', methods=['POST'])
+@token_required
+def create_transactions_bulk():
+    """
+    Create many transactions in one request
+    Body: {"transactions": [{invoice_id, amount, date, type}, ...]}
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('transactions'), list) or not data['transactions']:
+            return jsonify({
+                'success': False,
+                'message': 'A non-empty transactions list is required'
+            }), 400
+        
+        max_rows = current_app.config.get('BULK_MAX_ROWS', 50000)
+        if len(data['transactions']) > max_rows:
+            return jsonify({
+                'success': False,
+                'message': f'At most {max_rows} transactions can be created per request'
+            }), 400
+        
+        result = TransactionService.create_transactions_bulk(
+            data['transactions'],
+            chunk_size=current_app.config.get('BULK_INSERT_CHUNK_SIZE', 1000)
+        )
+        
+        if result['success']:
+            return jsonify(result), 201
+        else:
+            return jsonify(result), 400
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error creating transactions: {str(e)}'
+        }), 500
+
 @transaction_bp.route('/<int:transaction_id>', methods=['PUT'])
 @token_required
 def update_transaction(transaction_id):
@@ -171,12 +213,16 @@ def get_transactions_by_type(type):
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'true').lower() != 'false'
         per_page = min(per_page, 100)
         
         result = TransactionService.get_transactions_by_type(
             type=type,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            cursor=cursor,
+            include_total=include_total
         )
         
         if result['success']:
@@ -193,16 +239,44 @@ def get_transactions_by_type(type):
 @transaction_bp.route('/search', methods=['GET'])
 @token_required
 def search_transactions():
-    """Search transactions"""
+    """
+    Search transactions
+    Query parameters: q, amount, amount_min, amount_max, start_date, end_date (YYYY-MM-DD format),
+    type (repeatable or comma-separated), invoice_id, page, per_page, include_total
+    """
     try:
         query = request.args.get('q', '')
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        include_total = request.args.get('include_total', 'true').lower() != 'false'
+        
+        filters = {}
+        for name in ('amount', 'amount_min', 'amount_max', 'invoice_id'):
+            value = request.args.get(name)
+            if value in (None, ''):
+                continue
+            try:
+                filters[name] = int(value) if name == 'invoice_id' else float(value)
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'message': f'{name} must be a number'
+                }), 400
+        
+        try:
+            start_date, end_date = parse_export_dates(request.args.get('start_date'), request.args.get('end_date'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        types = [value for values in request.args.getlist('type') for value in values.split(',') if value]
         
-        if not query:
+        if not query and not filters and not start_date and not end_date and not types:
             return jsonify({
                 'success': False,
-                'message': 'Search query is required'
+                'message': 'Search query or at least one filter is required'
             }), 400
         
         per_page = min(per_page, 100)
@@ -210,7 +284,12 @@ def search_transactions():
         result = TransactionService.search_transactions(
             query=query,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            start_date=start_date,
+            end_date=end_date,
+            types=types,
+            include_total=include_total,
+            **filters
         )
         
         if result['success']:
@@ -241,3 +320,44 @@ def get_transaction_statistics():
             'success': False,
             'message': f'Error getting statistics: {str(e)}'
         }), 500
+
+@transaction_bp.route('/export', methods=['GET'])
+@token_required
+def export_transactions():
+    """
+    Stream transactions as NDJSON or CSV
+    Query parameters: format (ndjson|csv), start_date, end_date (YYYY-MM-DD format), type
+    """
+    try:
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'message': f'Format must be one of: {", ".join(EXPORT_FORMATS)}'
+            }), 400
+        
+        try:
+            start_date, end_date = parse_export_dates(request.args.get('start_date'), request.args.get('end_date'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        records = TransactionService.iter_transactions(
+            start_date=start_date,
+            end_date=end_date,
+            type=request.args.get('type')
+        )
+        
+        return Response(
+            stream_with_context(export_lines(records, export_format, TransactionService.EXPORT_FIELDS)),
+            mimetype=EXPORT_FORMATS[export_format],
+            headers={'Content-Disposition': f'attachment; filename=transactions.{export_format}'}
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error exporting transactions: {str(e)}'
+        }), 500
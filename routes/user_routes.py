@@ -87,6 +87,8 @@ def update_user(user_id):
         
         if result['success']:
             return jsonify(result), 200
+        elif result.get('busy'):
+            return jsonify(result), 503, {'Retry-After': '1'}
         else:
             return jsonify(result), 400
             
@@ -120,6 +122,7 @@ def search_users():
         query = request.args.get('q', '')
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        mode = request.args.get('mode', 'prefix')
         
         if not query:
             return jsonify({
@@ -132,7 +135,8 @@ def search_users():
         result = UserService.search_users(
             query=query,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            mode=mode
         )
         
         if result['success']:
@@ -146,6 +150,26 @@ def search_users():
             'message': f'Error searching users: {str(e)}'
         }), 500
 
+@user_bp.route('/autocomplete', methods=['GET'])
+@admin_required
+def autocomplete_users():
+    try:
+        query = request.args.get('q', '')
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+        
+        result = UserService.autocomplete_users(query=query, limit=limit)
+        
+        if result['success']:
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 400
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error searching users: {str(e)}'
+        }), 500
+
 @user_bp.route('/by-role/<string:role>', methods=['GET'])
 @admin_required
 def get_users_by_role(role):
@@ -261,6 +285,8 @@ def update_current_user():
         
         if result['success']:
             return jsonify(result), 200
+        elif result.get('busy'):
+            return jsonify(result), 503, {'Retry-After': '1'}
         else:
             return jsonify(result), 400
             
@@ -1,5 +1,8 @@
 from .user_service import UserService
 from .accounting_service import AccountingService
 from .invoice_service import InvoiceService
+from .rollup_service import RollupService
+from .count_service import CountService
+from .customer_service import CustomerService
 
-__all__ = ['UserService', 'AccountingService', 'InvoiceService'] 
\ No newline at end of file
+__all__ = ['UserService', 'AccountingService', 'InvoiceService', 'RollupService', 'CountService', 'CustomerService'] 
@@ -0,0 +1,65 @@
+from models.daily_rollup import DailyRollup
+from models.invoice import Invoice, db
+from utils.cache import TTLCache, invalidate_on_write
+from utils.replica import primary
+from sqlalchemy import func
+from typing import Optional
+
+
+count_cache = invalidate_on_write(TTLCache('counts', default_ttl=300), 'transactions', 'invoices', 'daily_rollups')
+
+
+class CountService:
+    """
+    Row counts for paginated listings, cached per filter
+
+    Counts always come from the primary: they are cached across requests
+    and invalidated on commit, so a count read from a lagging replica
+    right after a write would outlive the write.
+    """
+
+    @staticmethod
+    @primary
+    def count_transactions(type: Optional[str] = None) -> int:
+        """
+        Number of transactions, optionally of one type
+        
+        Answered from the daily rollups, which every write path keeps in
+        step with the transactions table.
+        
+        Args:
+            type: Transaction type (optional)
+        
+        Returns:
+            int: Transaction count
+        """
+        def compute():
+            query = db.session.query(func.coalesce(func.sum(DailyRollup.transaction_count), 0))
+            if type is not None:
+                query = query.filter(DailyRollup.type == type)
+            return int(query.scalar())
+        
+        return count_cache.get_or_compute((str(db.engine.url), 'transactions', type), compute)
+
+    @staticmethod
+    @primary
+    def count_invoices(status: Optional[str] = None, customer_id: Optional[int] = None) -> int:
+        """
+        Number of invoices, optionally filtered by status or customer
+        
+        Args:
+            status: Invoice status (optional)
+            customer_id: Customer ID (optional)
+        
+        Returns:
+            int: Invoice count
+        """
+        def compute():
+            query = db.session.query(func.count(Invoice.id))
+            if status is not None:
+                query = query.filter(Invoice.status == status)
+            if customer_id is not None:
+                query = query.filter(Invoice.customer_id == customer_id)
+            return int(query.scalar())
+        
+        return count_cache.get_or_compute((str(db.engine.url), 'invoices', status, customer_id), compute)
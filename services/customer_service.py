@@ -0,0 +1,105 @@
+import math
+from models.customer import Customer, db
+from models.search import customer_search
+from models.serialization import customer_rows
+from utils.pagination import page_size
+from utils.replica import read_only
+from typing import Any, Dict
+
+
+class CustomerService:
+    
+    @staticmethod
+    @read_only
+    def search_customers(query: str, page: int = 1, per_page: int = 10, mode: str = 'prefix') -> Dict[str, Any]:
+        """
+        Search customers by name, email, phone or address
+        
+        Matches words of those columns through the customers_fts index,
+        best bm25 rank first; name matches weigh most, address matches least.
+        
+        Args:
+            query: Search query
+            page: Page number
+            per_page: Customers per page
+            mode: 'prefix' matches word prefixes, 'full' whole words only
+            
+        Returns:
+            Dict: Search results
+        """
+        try:
+            page = max(page, 1)
+            size = page_size(per_page)
+            rows, total = customer_search.search(
+                db.session,
+                Customer,
+                query,
+                mode=mode,
+                limit=size,
+                offset=(page - 1) * size,
+                columns=customer_rows.columns
+            )
+            
+            return {
+                'success': True,
+                'customers': customer_rows.serialize_all(rows),
+                'total': total,
+                'pages': math.ceil(total / size),
+                'current_page': page,
+                'per_page': size,
+                'query': query,
+                'mode': mode
+            }
+            
+        except ValueError as e:
+            return {
+                'success': False,
+                'message': str(e),
+                'customers': []
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error searching customers: {str(e)}',
+                'customers': []
+            }
+    
+    @staticmethod
+    @read_only
+    def autocomplete_customers(query: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Suggest customers whose indexed words start with the typed text
+        
+        Args:
+            query: Text typed so far
+            limit: Maximum number of suggestions
+            
+        Returns:
+            Dict: Suggestions with id, name and email
+        """
+        try:
+            rows, _ = customer_search.search(
+                db.session,
+                Customer,
+                query,
+                mode='prefix',
+                limit=limit,
+                include_total=False,
+                columns=customer_rows.columns
+            )
+            
+            return {
+                'success': True,
+                'suggestions': [
+                    {'id': row.id, 'name': row.name, 'email': row.email}
+                    for row in rows
+                ],
+                'query': query
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error searching customers: {str(e)}',
+                'suggestions': []
+            }
@@ -1,12 +1,26 @@
 from models.invoice import Invoice, db
 from models.customer import Customer
+from models.serialization import invoice_rows
+from services.count_service import CountService
+from utils.cache import mark_tables_written
+from utils.pagination import keyset_page, offset_page, page_size
+from utils.replica import read_only
+from sqlalchemy import insert, select, update
 from sqlalchemy.exc import IntegrityError
-from datetime import datetime, date
-from typing import List, Optional, Dict, Any
+from datetime import datetime, date, timedelta
+from typing import List, Optional, Dict, Any, Iterator
+import time
+
+
+ALLOWED_STATUSES = ['pending', 'paid', 'cancelled', 'overdue']
+
+IN_CLAUSE_SIZE = 5000
 
 
 class InvoiceService:
     
+    EXPORT_FIELDS = ['id', 'customer_id', 'date', 'total_amount', 'status', 'created_at', 'updated_at']
+    
     @staticmethod
     def create_invoice(customer_id: int, date: str, total_amount: float, status: str = 'pending') -> Dict[str, Any]:
         """
@@ -67,6 +81,121 @@ class InvoiceService:
                 'invoice': None
             }
     
+    @staticmethod
+    def create_invoices_bulk(rows: List[Dict[str, Any]], chunk_size: int = 1000) -> Dict[str, Any]:
+        """
+        Create many invoices in one database transaction
+        
+        Customer IDs are checked with a single IN query (per IN_CLAUSE_SIZE
+        distinct IDs), each distinct date string is parsed once, and valid
+        rows are inserted with executemany in chunks of chunk_size. Invalid
+        rows are reported by index and skipped.
+        
+        Args:
+            rows: Invoice dicts with customer_id, date, total_amount and
+                optional status (default, and used for unknown statuses: 'pending')
+            chunk_size: Rows per executemany call
+            
+        Returns:
+            Dict: Operation result with created/rejected counts and per-row errors
+        """
+        try:
+            errors = []
+            candidates = []
+            
+            for index, row in enumerate(rows):
+                if not isinstance(row, dict):
+                    errors.append({'index': index, 'message': 'Invoice must be an object'})
+                    continue
+                
+                missing = [field for field in ('customer_id', 'date', 'total_amount') if row.get(field) in (None, '')]
+                if missing:
+                    errors.append({'index': index, 'message': f'Required field is missing: {missing[0]}'})
+                    continue
+                
+                if isinstance(row['customer_id'], bool) or not isinstance(row['customer_id'], int):
+                    errors.append({'index': index, 'message': 'Customer ID must be an integer'})
+                    continue
+                
+                total_amount = row['total_amount']
+                if isinstance(total_amount, bool) or not isinstance(total_amount, (int, float)):
+                    errors.append({'index': index, 'message': 'Total amount must be a number'})
+                    continue
+                
+                if not isinstance(row['date'], str):
+                    errors.append({'index': index, 'message': 'Invalid date format. Must be YYYY-MM-DD'})
+                    continue
+                
+                candidates.append((index, row))
+            
+            customer_ids = sorted({row['customer_id'] for _, row in candidates})
+            existing_ids = set()
+            for start in range(0, len(customer_ids), IN_CLAUSE_SIZE):
+                existing_ids.update(db.session.execute(
+                    select(Customer.id).where(Customer.id.in_(customer_ids[start:start + IN_CLAUSE_SIZE]))
+                ).scalars())
+            
+            parsed_dates = {}
+            for value in {row['date'] for _, row in candidates}:
+                try:
+                    parsed_dates[value] = datetime.strptime(value, '%Y-%m-%d').date()
+                except ValueError:
+                    parsed_dates[value] = None
+            
+            values = []
+            for index, row in candidates:
+                if row['customer_id'] not in existing_ids:
+                    errors.append({'index': index, 'message': 'Customer not found'})
+                    continue
+                
+                invoice_date = parsed_dates[row['date']]
+                if invoice_date is None:
+                    errors.append({'index': index, 'message': 'Invalid date format. Must be YYYY-MM-DD'})
+                    continue
+                
+                values.append({
+                    'customer_id': row['customer_id'],
+                    'date': invoice_date,
+                    'total_amount': float(row['total_amount']),
+                    # Unknown statuses fall back to 'pending', as in create_invoice
+                    'status': row.get('status') if row.get('status') in ALLOWED_STATUSES else 'pending'
+                })
+            
+            errors.sort(key=lambda error: error['index'])
+            
+            if not values:
+                return {
+                    'success': False,
+                    'message': 'No valid invoices to create',
+                    'created_count': 0,
+                    'error_count': len(errors),
+                    'errors': errors
+                }
+            
+            for start in range(0, len(values), chunk_size):
+                db.session.execute(insert(Invoice), values[start:start + chunk_size])
+            
+            mark_tables_written(db.session, 'invoices')
+            db.session.commit()
+            
+            return {
+                'success': True,
+                'message': f'{len(values)} invoices created, {len(errors)} rejected',
+                'created_count': len(values),
+                'error_count': len(errors),
+                'errors': errors
+            }
+            
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f'Error creating invoices: {str(e)}',
+                'created_count': 0,
+                'error_count': 0,
+                'errors': []
+            }
+    
     @staticmethod
     def get_invoice_by_id(invoice_id: int) -> Optional[Invoice]:
         """Get invoice by ID"""
@@ -76,31 +205,37 @@ class InvoiceService:
             return None
     
     @staticmethod
-    def get_all_invoices(page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+    @read_only
+    def get_all_invoices(page: int = 1, per_page: int = 10, cursor: str = None, include_total: bool = True) -> Dict[str, Any]:
         """
         Get all invoices paginated
         
         Args:
             page: Page number
             per_page: Number of records per page
+            cursor: Keyset cursor; when given (empty for the first page) page is ignored
+            include_total: Whether to count the matching rows (total and pages)
             
         Returns:
             Dict: Invoices and pagination information
         """
         try:
-            invoices = Invoice.query.order_by(Invoice.date.desc()).paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
+            if cursor is not None:
+                return InvoiceService._keyset_result(invoice_rows.select(), cursor, per_page)
+            
+            rows, pagination = offset_page(
+                invoice_rows.select().order_by(Invoice.date.desc()),
+                page,
+                per_page,
+                include_total=include_total,
+                count=CountService.count_invoices,
+                session=db.session
             )
             
             return {
                 'success': True,
-                'invoices': [invoice.to_dict() for invoice in invoices.items],
-                'total': invoices.total,
-                'pages': invoices.pages,
-                'current_page': page,
-                'per_page': per_page
+                'invoices': invoice_rows.serialize_all(rows),
+                **pagination
             }
         except Exception as e:
             return {
@@ -110,7 +245,8 @@ class InvoiceService:
             }
     
     @staticmethod
-    def get_invoices_by_customer(customer_id: int, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+    @read_only
+    def get_invoices_by_customer(customer_id: int, page: int = 1, per_page: int = 10, include_total: bool = True) -> Dict[str, Any]:
         """
         Get invoices by customer
         
@@ -118,6 +254,7 @@ class InvoiceService:
             customer_id: Customer ID
             page: Page number
             per_page: Number of records per page
+            include_total: Whether to count the matching rows (total and pages)
             
         Returns:
             Dict: Customer's invoices
@@ -131,20 +268,20 @@ class InvoiceService:
                     'invoices': []
                 }
             
-            invoices = Invoice.query.filter_by(customer_id=customer_id).order_by(Invoice.date.desc()).paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
+            rows, pagination = offset_page(
+                invoice_rows.select().where(Invoice.customer_id == customer_id).order_by(Invoice.date.desc()),
+                page,
+                per_page,
+                include_total=include_total,
+                count=lambda: CountService.count_invoices(customer_id=customer_id),
+                session=db.session
             )
             
             return {
                 'success': True,
-                'invoices': [invoice.to_dict() for invoice in invoices.items],
+                'invoices': invoice_rows.serialize_all(rows),
                 'customer': customer.to_dict(),
-                'total': invoices.total,
-                'pages': invoices.pages,
-                'current_page': page,
-                'per_page': per_page
+                **pagination
             }
         except Exception as e:
             return {
@@ -154,7 +291,8 @@ class InvoiceService:
             }
     
     @staticmethod
-    def get_invoices_by_status(status: str, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+    @read_only
+    def get_invoices_by_status(status: str, page: int = 1, per_page: int = 10, cursor: str = None, include_total: bool = True) -> Dict[str, Any]:
         """
         Get invoices by status
         
@@ -162,6 +300,8 @@ class InvoiceService:
             status: Invoice status
             page: Page number
             per_page: Number of records per page
+            cursor: Keyset cursor; when given (empty for the first page) page is ignored
+            include_total: Whether to count the matching rows (total and pages)
             
         Returns:
             Dict: Invoices by status
@@ -175,20 +315,27 @@ class InvoiceService:
                     'invoices': []
                 }
             
-            invoices = Invoice.query.filter_by(status=status).order_by(Invoice.date.desc()).paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
+            if cursor is not None:
+                result = InvoiceService._keyset_result(
+                    invoice_rows.select().where(Invoice.status == status), cursor, per_page
+                )
+                result['status'] = status
+                return result
+            
+            rows, pagination = offset_page(
+                invoice_rows.select().where(Invoice.status == status).order_by(Invoice.date.desc()),
+                page,
+                per_page,
+                include_total=include_total,
+                count=lambda: CountService.count_invoices(status=status),
+                session=db.session
             )
             
             return {
                 'success': True,
-                'invoices': [invoice.to_dict() for invoice in invoices.items],
+                'invoices': invoice_rows.serialize_all(rows),
                 'status': status,
-                'total': invoices.total,
-                'pages': invoices.pages,
-                'current_page': page,
-                'per_page': per_page
+                **pagination
             }
         except Exception as e:
             return {
@@ -197,6 +344,63 @@ class InvoiceService:
                 'invoices': []
             }
     
+    @staticmethod
+    def _keyset_result(statement, cursor: str, per_page: int) -> Dict[str, Any]:
+        """Build a cursor-paginated invoices result from a select of invoice_rows"""
+        per_page = page_size(per_page)
+        try:
+            rows, next_cursor = keyset_page(statement, Invoice.date, Invoice.id, cursor, per_page, session=db.session)
+        except ValueError as e:
+            return {
+                'success': False,
+                'message': str(e),
+                'invoices': []
+            }
+        
+        return {
+            'success': True,
+            'invoices': invoice_rows.serialize_all(rows),
+            'per_page': per_page,
+            'next_cursor': next_cursor
+        }
+    
+    @staticmethod
+    @read_only
+    def iter_invoices(start_date: date = None, end_date: date = None, status: str = None, customer_id: int = None, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over invoices for export, oldest first
+        
+        Rows are fetched batch_size at a time from a streaming cursor, so
+        only one batch is held in memory.
+        
+        Args:
+            start_date: First day included (optional)
+            end_date: Last day included (optional)
+            status: Invoice status (optional)
+            customer_id: Customer ID (optional)
+            batch_size: Rows fetched per round trip
+            
+        Returns:
+            Iterator: Invoice dicts
+        """
+        statement = invoice_rows.select()
+        
+        if start_date:
+            statement = statement.where(Invoice.date >= start_date)
+        
+        if end_date:
+            statement = statement.where(Invoice.date <= end_date)
+        
+        if status:
+            statement = statement.where(Invoice.status == status)
+        
+        if customer_id:
+            statement = statement.where(Invoice.customer_id == customer_id)
+        
+        statement = statement.order_by(Invoice.date, Invoice.id).execution_options(yield_per=batch_size)
+        for row in db.session.execute(statement):
+            yield invoice_rows(row)
+    
     @staticmethod
     def update_invoice(invoice_id: int, **kwargs) -> Dict[str, Any]:
         """
@@ -346,6 +550,120 @@ class InvoiceService:
             }
     
     @staticmethod
+    def update_invoice_status_bulk(invoice_ids: List[int], status: str, chunk_size: int = 1000) -> Dict[str, Any]:
+        """
+        Set the status of many invoices in one database transaction
+        
+        Runs one UPDATE ... WHERE id IN (...) per chunk of chunk_size IDs.
+        
+        Args:
+            invoice_ids: Invoice IDs
+            status: New status
+            chunk_size: IDs per UPDATE statement
+            
+        Returns:
+            Dict: Operation result with requested, updated and missing counts
+        """
+        try:
+            if status not in ALLOWED_STATUSES:
+                return {
+                    'success': False,
+                    'message': f'Invalid status. Allowed values: {", ".join(ALLOWED_STATUSES)}',
+                    'updated_count': 0
+                }
+            
+            if any(isinstance(invoice_id, bool) or not isinstance(invoice_id, int) for invoice_id in invoice_ids):
+                return {
+                    'success': False,
+                    'message': 'Invoice IDs must be integers',
+                    'updated_count': 0
+                }
+            
+            unique_ids = sorted(set(invoice_ids))
+            chunk_size = min(chunk_size, IN_CLAUSE_SIZE)
+            updated_count = 0
+            
+            for start in range(0, len(unique_ids), chunk_size):
+                result = db.session.execute(
+                    update(Invoice)
+                    .where(Invoice.id.in_(unique_ids[start:start + chunk_size]))
+                    .values(status=status)
+                    .execution_options(synchronize_session=False)
+                )
+                updated_count += result.rowcount
+            
+            mark_tables_written(db.session, 'invoices')
+            db.session.commit()
+            
+            return {
+                'success': True,
+                'message': f'{updated_count} invoices updated to "{status}"',
+                'requested_count': len(unique_ids),
+                'updated_count': updated_count,
+                'missing_count': len(unique_ids) - updated_count
+            }
+            
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f'Error updating invoice statuses: {str(e)}',
+                'updated_count': 0
+            }
+    
+    @staticmethod
+    def mark_overdue_invoices(grace_days: int = 30, today: date = None) -> Dict[str, Any]:
+        """
+        Move pending invoices older than the grace period to overdue
+        
+        Runs a single UPDATE ... WHERE status = 'pending' AND date < cutoff,
+        which seeks through the (status, date) index.
+        
+        Args:
+            grace_days: Days an invoice may stay pending after its date
+            today: Reference date (default: today)
+            
+        Returns:
+            Dict: Operation result with the number of rows changed, the
+            cutoff date and the duration
+        """
+        started = time.perf_counter()
+        cutoff = (today or datetime.now().date()) - timedelta(days=grace_days)
+        
+        try:
+            result = db.session.execute(
+                update(Invoice)
+                .where(Invoice.status == 'pending', Invoice.date < cutoff)
+                .values(status='overdue')
+                .execution_options(synchronize_session=False)
+            )
+            updated_count = result.rowcount
+            
+            if updated_count:
+                mark_tables_written(db.session, 'invoices')
+            db.session.commit()
+            
+            duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            return {
+                'success': True,
+                'message': f'{updated_count} invoices marked overdue (cutoff {cutoff.isoformat()}, {duration_ms} ms)',
+                'updated_count': updated_count,
+                'cutoff': cutoff.isoformat(),
+                'duration_ms': duration_ms
+            }
+            
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f'Error marking overdue invoices: {str(e)}',
+                'updated_count': 0,
+                'cutoff': cutoff.isoformat(),
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2)
+            }
+    
+    @staticmethod
+    @read_only
     def get_invoice_statistics() -> Dict[str, Any]:
         """
         Get invoice statistics
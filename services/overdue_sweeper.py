@@ -0,0 +1,34 @@
+from services.invoice_service import InvoiceService
+from utils.scheduler import IntervalJob
+from typing import Optional
+
+
+def start_overdue_sweeper(app) -> Optional[IntervalJob]:
+    """
+    Start the in-process overdue invoice sweeper for an application
+    
+    Runs InvoiceService.mark_overdue_invoices every OVERDUE_SWEEP_INTERVAL
+    seconds with OVERDUE_GRACE_DAYS; an interval of 0 disables it.
+    
+    Args:
+        app: Flask application
+    
+    Returns:
+        IntervalJob: The running job, or None when disabled
+    """
+    interval = app.config.get('OVERDUE_SWEEP_INTERVAL', 0)
+    if not interval or interval <= 0:
+        return None
+    
+    def sweep():
+        with app.app_context():
+            result = InvoiceService.mark_overdue_invoices(app.config.get('OVERDUE_GRACE_DAYS', 30))
+            if result['success']:
+                app.logger.info('Overdue sweep: %s', result['message'])
+            else:
+                app.logger.error('Overdue sweep: %s', result['message'])
+            return result
+    
+    job = IntervalJob('overdue-sweeper', interval, sweep)
+    app.extensions['overdue_sweeper'] = job
+    return job.start()
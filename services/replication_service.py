@@ -0,0 +1,149 @@
+import time
+from datetime import datetime
+from flask import current_app
+from models.replication import ReplicationHeartbeat
+from models.user import db
+from utils.replica import EXTENSION_KEY, REPLICA_BIND
+from utils.scheduler import IntervalJob
+from typing import Any, Dict, List
+
+
+class ReplicationService:
+    
+    @staticmethod
+    def write_heartbeat(connection, now: datetime = None) -> datetime:
+        """
+        Record the current time in the primary's heartbeat row
+        
+        Args:
+            connection: Connection to the primary
+            now: Heartbeat time (default: current UTC time)
+        
+        Returns:
+            datetime: The recorded time
+        """
+        now = now or datetime.utcnow()
+        table = ReplicationHeartbeat.__table__
+        
+        result = connection.execute(table.update().where(table.c.id == 1).values(beat_at=now))
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(id=1, beat_at=now))
+        return now
+    
+    @staticmethod
+    def sync_sqlite_replica() -> Dict[str, Any]:
+        """
+        Copy the primary SQLite database over the replica file
+        
+        Writes a heartbeat first so the copy carries a fresh one. Uses the
+        SQLite online backup API, so both stay usable meanwhile.
+        
+        Returns:
+            Dict: Operation result
+        """
+        try:
+            primary_engine = db.engine
+            replica_engine = db.engines.get(REPLICA_BIND)
+            
+            if replica_engine is None:
+                return {
+                    'success': False,
+                    'message': 'No replica database is configured'
+                }
+            
+            if primary_engine.dialect.name != 'sqlite' or replica_engine.dialect.name != 'sqlite':
+                return {
+                    'success': False,
+                    'message': 'Replica sync is only available between SQLite databases'
+                }
+            
+            started = time.perf_counter()
+            with primary_engine.begin() as connection:
+                beat_at = ReplicationService.write_heartbeat(connection)
+            
+            source = primary_engine.raw_connection()
+            target = replica_engine.raw_connection()
+            try:
+                source.driver_connection.backup(target.driver_connection)
+            finally:
+                target.close()
+                source.close()
+            
+            return {
+                'success': True,
+                'message': 'Replica synchronized',
+                'heartbeat': beat_at.isoformat(),
+                'duration_ms': round((time.perf_counter() - started) * 1000, 1)
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error synchronizing replica: {str(e)}'
+            }
+    
+    @staticmethod
+    def get_replica_status() -> Dict[str, Any]:
+        """
+        Current replica lag measured from the heartbeat and routing counters
+        
+        Returns:
+            Dict: Replica status
+        """
+        router = current_app.extensions.get(EXTENSION_KEY)
+        if router is None:
+            return {
+                'success': True,
+                'configured': False
+            }
+        
+        lag = router.read_lag()
+        return {
+            'success': True,
+            'configured': True,
+            'lag': lag,
+            'within_tolerance': lag is not None and lag <= router.max_lag,
+            'routing': router.stats()
+        }
+
+
+def start_replica_jobs(app) -> List[IntervalJob]:
+    """
+    Start the replica heartbeat and SQLite sync jobs for an application
+    
+    The heartbeat runs every REPLICA_HEARTBEAT_INTERVAL seconds for
+    replicas kept up to date by external replication; the SQLite file
+    sync runs every REPLICA_SYNC_INTERVAL seconds. An interval of 0
+    disables a job, and neither runs without a replica bind.
+    
+    Args:
+        app: Flask application
+    
+    Returns:
+        List: The running jobs
+    """
+    if app.extensions.get(EXTENSION_KEY) is None:
+        return []
+    
+    def heartbeat():
+        with app.app_context():
+            with db.engine.begin() as connection:
+                return ReplicationService.write_heartbeat(connection)
+    
+    def sync():
+        with app.app_context():
+            result = ReplicationService.sync_sqlite_replica()
+            if not result['success']:
+                app.logger.error('Replica sync: %s', result['message'])
+            return result
+    
+    jobs = []
+    for name, interval, function in (
+        ('replica-heartbeat', app.config.get('REPLICA_HEARTBEAT_INTERVAL', 0), heartbeat),
+        ('replica-sync', app.config.get('REPLICA_SYNC_INTERVAL', 0), sync)
+    ):
+        if interval and interval > 0:
+            job = IntervalJob(name, interval, function)
+            app.extensions[name.replace('-', '_')] = job
+            jobs.append(job.start())
+    return jobs
@@ -0,0 +1,275 @@
+from models.daily_rollup import DailyRollup
+from models.transaction import Transaction, db
+from sqlalchemy import event, func, select, delete, insert, inspect, case, extract
+from sqlalchemy.orm import Session
+from utils.cache import mark_tables_written
+from collections import defaultdict
+from datetime import datetime, date
+from typing import Dict, Any, Tuple
+
+
+PERIOD_GROUPS = {
+    'date': lambda: [DailyRollup.date],
+    'month': lambda: [extract('month', DailyRollup.date)],
+    'year_month': lambda: [extract('year', DailyRollup.date), extract('month', DailyRollup.date)]
+}
+
+
+class RollupService:
+
+    @staticmethod
+    def rollup_key(transaction_date, transaction_type) -> Tuple[date, str]:
+        """
+        Normalize a transaction's date and type into a daily_rollups key
+        
+        Args:
+            transaction_date: Transaction date (date, datetime or None)
+            transaction_type: Transaction type
+        
+        Returns:
+            Tuple: (date, type) key
+        """
+        if transaction_date is None:
+            transaction_date = datetime.now().date()
+        elif isinstance(transaction_date, datetime):
+            transaction_date = transaction_date.date()
+        
+        return transaction_date, transaction_type or ''
+
+    @staticmethod
+    def apply_deltas(connection, deltas: Dict[Tuple[date, str], list]) -> None:
+        """
+        Add amount/count deltas to the daily rollups
+        
+        Runs on the given connection so that the rollups change in the
+        same database transaction as the rows they summarize.
+        
+        Args:
+            connection: SQLAlchemy connection
+            deltas: Mapping of (date, type) to [amount, count]
+        """
+        rows = [
+            {
+                'date': day,
+                'type': transaction_type,
+                'total_amount': float(amount),
+                'transaction_count': count
+            }
+            for (day, transaction_type), (amount, count) in deltas.items()
+            if amount or count
+        ]
+        
+        if not rows:
+            return
+        
+        table = DailyRollup.__table__
+        dialect_name = connection.dialect.name
+        
+        if dialect_name in ('sqlite', 'postgresql'):
+            if dialect_name == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            
+            statement = dialect_insert(table)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.date, table.c.type],
+                set_={
+                    'total_amount': table.c.total_amount + statement.excluded.total_amount,
+                    'transaction_count': table.c.transaction_count + statement.excluded.transaction_count
+                }
+            )
+            connection.execute(statement, rows)
+            return
+        
+        for row in rows:
+            result = connection.execute(
+                table.update().where(
+                    table.c.date == row['date'],
+                    table.c.type == row['type']
+                ).values(
+                    total_amount=table.c.total_amount + row['total_amount'],
+                    transaction_count=table.c.transaction_count + row['transaction_count']
+                )
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(**row))
+
+    @staticmethod
+    def empty_aggregate() -> Dict[str, Any]:
+        """Period aggregate for a period without transactions"""
+        return {
+            'total_income': 0.0,
+            'total_expense': 0.0,
+            'income_count': 0,
+            'expense_count': 0,
+            'total_amount': 0.0,
+            'transaction_count': 0
+        }
+    
+    @staticmethod
+    def get_period_aggregate(start_date: date = None, end_date: date = None, group_by: str = None):
+        """
+        Income/expense totals and counts for a period in one statement
+        
+        Uses conditional aggregation (SUM(CASE ...)) over the daily rollups,
+        so every total and count comes from the same scan.
+        
+        Args:
+            start_date: First day included (optional)
+            end_date: Last day included (optional)
+            group_by: None, 'date', 'month' or 'year_month'
+        
+        Returns:
+            Dict: Aggregate for the period, or a mapping of group key to
+            aggregate ordered by key when group_by is given
+        """
+        is_income = DailyRollup.type == 'income'
+        is_expense = DailyRollup.type == 'expense'
+        
+        columns = [
+            func.sum(case((is_income, DailyRollup.total_amount), else_=0.0)).label('total_income'),
+            func.sum(case((is_expense, DailyRollup.total_amount), else_=0.0)).label('total_expense'),
+            func.sum(case((is_income, DailyRollup.transaction_count), else_=0)).label('income_count'),
+            func.sum(case((is_expense, DailyRollup.transaction_count), else_=0)).label('expense_count'),
+            func.sum(DailyRollup.total_amount).label('total_amount'),
+            func.sum(DailyRollup.transaction_count).label('transaction_count')
+        ]
+        
+        group_columns = PERIOD_GROUPS[group_by]() if group_by else []
+        query = db.session.query(*group_columns, *columns)
+        
+        if start_date:
+            query = query.filter(DailyRollup.date >= start_date)
+        
+        if end_date:
+            query = query.filter(DailyRollup.date <= end_date)
+        
+        def to_aggregate(row):
+            return {
+                'total_income': float(row.total_income or 0.0),
+                'total_expense': float(row.total_expense or 0.0),
+                'income_count': int(row.income_count or 0),
+                'expense_count': int(row.expense_count or 0),
+                'total_amount': float(row.total_amount or 0.0),
+                'transaction_count': int(row.transaction_count or 0)
+            }
+        
+        if not group_by:
+            return to_aggregate(query.one())
+        
+        rows = query.group_by(*group_columns).order_by(*group_columns).all()
+        
+        aggregates = {}
+        for row in rows:
+            if group_by == 'year_month':
+                key = f'{int(row[0]):04d}-{int(row[1]):02d}'
+            elif group_by == 'month':
+                key = int(row[0])
+            else:
+                key = row[0]
+            aggregates[key] = to_aggregate(row)
+        
+        return aggregates
+
+    @staticmethod
+    def rebuild_daily_rollups() -> Dict[str, Any]:
+        """
+        Rebuild the daily rollups from the transactions table
+        
+        Returns:
+            Dict: Operation result
+        """
+        try:
+            db.session.execute(delete(DailyRollup))
+            
+            transaction_type = func.coalesce(Transaction.type, '')
+            db.session.execute(
+                insert(DailyRollup).from_select(
+                    ['date', 'type', 'total_amount', 'transaction_count'],
+                    select(
+                        Transaction.date,
+                        transaction_type,
+                        func.sum(Transaction.amount),
+                        func.count(Transaction.id)
+                    ).group_by(Transaction.date, transaction_type)
+                )
+            )
+            
+            rollup_count = db.session.query(func.count()).select_from(DailyRollup).scalar()
+            mark_tables_written(db.session, 'daily_rollups')
+            db.session.commit()
+            
+            return {
+                'success': True,
+                'message': f'Daily rollups rebuilt ({rollup_count} rows)',
+                'rollup_count': rollup_count
+            }
+        
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f'Error rebuilding daily rollups: {str(e)}',
+                'rollup_count': 0
+            }
+
+
+def _previous_transaction_state(session, transaction):
+    """Return (date, type, amount) as currently stored for a modified transaction"""
+    state = inspect(transaction)
+    values = []
+
+    for name in ('date', 'type', 'amount'):
+        history = state.attrs[name].history
+        if history.deleted:
+            values.append(history.deleted[0])
+        elif history.unchanged:
+            values.append(history.unchanged[0])
+        else:
+            row = session.connection().execute(
+                select(Transaction.date, Transaction.type, Transaction.amount).where(
+                    Transaction.id == state.identity[0]
+                )
+            ).first()
+            return tuple(row) if row else None
+
+    return tuple(values)
+
+
+@event.listens_for(Session, 'before_flush')
+def _update_daily_rollups(session, flush_context, instances):
+    deltas = defaultdict(lambda: [0.0, 0])
+
+    def add(transaction_date, transaction_type, amount, count):
+        delta = deltas[RollupService.rollup_key(transaction_date, transaction_type)]
+        delta[0] += float(amount or 0)
+        delta[1] += count
+
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            add(obj.date, obj.type, obj.amount, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            previous = _previous_transaction_state(session, obj)
+            if previous:
+                add(previous[0], previous[1], -float(previous[2] or 0), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Transaction) or not session.is_modified(obj):
+            continue
+        
+        previous = _previous_transaction_state(session, obj)
+        if previous is None:
+            continue
+        
+        current = (obj.date, obj.type, obj.amount)
+        if previous == current:
+            continue
+        
+        add(previous[0], previous[1], -float(previous[2] or 0), -1)
+        add(current[0], current[1], current[2], 1)
+
+    if deltas:
+        RollupService.apply_deltas(session.connection(), deltas)
@@ -1,12 +1,29 @@
 from models.transaction import Transaction, db
 from models.invoice import Invoice
+from models.daily_rollup import DailyRollup
+from models.search import transaction_search, search_index_supported, search_terms
+from models.serialization import transaction_rows
+from services.rollup_service import RollupService
+from services.count_service import CountService
+from utils.cache import mark_tables_written
+from utils.pagination import keyset_page, offset_page, page_size
+from utils.replica import read_only
+from sqlalchemy import false, insert, select
 from sqlalchemy.exc import IntegrityError
+from collections import defaultdict
 from datetime import datetime, date
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
+
+
+BULK_REQUIRED_FIELDS = ['invoice_id', 'amount', 'date', 'type']
+
+IN_CLAUSE_SIZE = 5000
 
 
 class TransactionService:
     
+    EXPORT_FIELDS = ['id', 'invoice_id', 'amount', 'date', 'type', 'created_at', 'updated_at']
+    
     @staticmethod
     def create_transaction(invoice_id: int, amount: float, date: str, type: str) -> Dict[str, Any]:
         """
@@ -63,6 +80,125 @@ class TransactionService:
                 'transaction': None
             }
     
+    @staticmethod
+    def create_transactions_bulk(rows: List[Dict[str, Any]], chunk_size: int = 1000) -> Dict[str, Any]:
+        """
+        Create many transactions in one database transaction
+        
+        Invoice IDs are checked with a single IN query (per IN_CLAUSE_SIZE
+        distinct IDs), each distinct date string is parsed once, and valid
+        rows are inserted with executemany in chunks of chunk_size. Invalid
+        rows are reported by index and skipped; the valid ones are committed
+        together.
+        
+        Args:
+            rows: Transaction dicts with invoice_id, amount, date and type
+            chunk_size: Rows per executemany call
+            
+        Returns:
+            Dict: Operation result with created/rejected counts and per-row errors
+        """
+        try:
+            errors = []
+            candidates = []
+            
+            for index, row in enumerate(rows):
+                if not isinstance(row, dict):
+                    errors.append({'index': index, 'message': 'Transaction must be an object'})
+                    continue
+                
+                missing = [field for field in BULK_REQUIRED_FIELDS if row.get(field) in (None, '')]
+                if missing:
+                    errors.append({'index': index, 'message': f'Required field is missing: {missing[0]}'})
+                    continue
+                
+                amount = row['amount']
+                if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+                    errors.append({'index': index, 'message': 'Amount must be a number'})
+                    continue
+                
+                if isinstance(row['invoice_id'], bool) or not isinstance(row['invoice_id'], int):
+                    errors.append({'index': index, 'message': 'Invoice ID must be an integer'})
+                    continue
+                
+                if not isinstance(row['date'], str):
+                    errors.append({'index': index, 'message': 'Invalid date format. Must be YYYY-MM-DD'})
+                    continue
+                
+                candidates.append((index, row))
+            
+            invoice_ids = sorted({row['invoice_id'] for _, row in candidates})
+            existing_ids = set()
+            for start in range(0, len(invoice_ids), IN_CLAUSE_SIZE):
+                existing_ids.update(db.session.execute(
+                    select(Invoice.id).where(Invoice.id.in_(invoice_ids[start:start + IN_CLAUSE_SIZE]))
+                ).scalars())
+            
+            parsed_dates = {}
+            for value in {row['date'] for _, row in candidates}:
+                try:
+                    parsed_dates[value] = datetime.strptime(value, '%Y-%m-%d').date()
+                except ValueError:
+                    parsed_dates[value] = None
+            
+            values = []
+            deltas = defaultdict(lambda: [0.0, 0])
+            for index, row in candidates:
+                if row['invoice_id'] not in existing_ids:
+                    errors.append({'index': index, 'message': 'Invoice not found'})
+                    continue
+                
+                transaction_date = parsed_dates[row['date']]
+                if transaction_date is None:
+                    errors.append({'index': index, 'message': 'Invalid date format. Must be YYYY-MM-DD'})
+                    continue
+                
+                values.append({
+                    'invoice_id': row['invoice_id'],
+                    'amount': float(row['amount']),
+                    'date': transaction_date,
+                    'type': row['type']
+                })
+                delta = deltas[RollupService.rollup_key(transaction_date, row['type'])]
+                delta[0] += float(row['amount'])
+                delta[1] += 1
+            
+            errors.sort(key=lambda error: error['index'])
+            
+            if not values:
+                return {
+                    'success': False,
+                    'message': 'No valid transactions to create',
+                    'created_count': 0,
+                    'error_count': len(errors),
+                    'errors': errors
+                }
+            
+            for start in range(0, len(values), chunk_size):
+                db.session.execute(insert(Transaction), values[start:start + chunk_size])
+            
+            RollupService.apply_deltas(db.session.connection(), deltas)
+            mark_tables_written(db.session, 'transactions', 'daily_rollups')
+            db.session.commit()
+            
+            return {
+                'success': True,
+                'message': f'{len(values)} transactions created, {len(errors)} rejected',
+                'created_count': len(values),
+                'error_count': len(errors),
+                'errors': errors
+            }
+            
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f'Error creating transactions: {str(e)}',
+                'created_count': 0,
+                'error_count': 0,
+                'errors': []
+            }
+    
     @staticmethod
     def get_transaction_by_id(transaction_id: int) -> Optional[Transaction]:
         """Get transaction by ID"""
@@ -72,31 +208,37 @@ class TransactionService:
             return None
     
     @staticmethod
-    def get_all_transactions(page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+    @read_only
+    def get_all_transactions(page: int = 1, per_page: int = 10, cursor: str = None, include_total: bool = True) -> Dict[str, Any]:
         """
         Get all transactions paginated
         
         Args:
             page: Page number
             per_page: Number of records per page
+            cursor: Keyset cursor; when given (empty for the first page) page is ignored
+            include_total: Whether to count the matching rows (total and pages)
             
         Returns:
             Dict: Transactions and pagination information
         """
         try:
-            transactions = Transaction.query.order_by(Transaction.date.desc()).paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
+            if cursor is not None:
+                return TransactionService._keyset_result(transaction_rows.select(), cursor, per_page)
+            
+            rows, pagination = offset_page(
+                transaction_rows.select().order_by(Transaction.date.desc()),
+                page,
+                per_page,
+                include_total=include_total,
+                count=CountService.count_transactions,
+                session=db.session
             )
             
             return {
                 'success': True,
-                'transactions': [transaction.to_dict() for transaction in transactions.items],
-                'total': transactions.total,
-                'pages': transactions.pages,
-                'current_page': page,
-                'per_page': per_page
+                'transactions': transaction_rows.serialize_all(rows),
+                **pagination
             }
         except Exception as e:
             return {
@@ -106,6 +248,7 @@ class TransactionService:
             }
     
     @staticmethod
+    @read_only
     def get_transactions_by_invoice(invoice_id: int, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
         """
         Get transactions by invoice
@@ -127,20 +270,18 @@ class TransactionService:
                     'transactions': []
                 }
             
-            transactions = Transaction.query.filter_by(invoice_id=invoice_id).order_by(Transaction.date.desc()).paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
+            rows, pagination = offset_page(
+                transaction_rows.select().where(Transaction.invoice_id == invoice_id).order_by(Transaction.date.desc()),
+                page,
+                per_page,
+                session=db.session
             )
             
             return {
                 'success': True,
-                'transactions': [transaction.to_dict() for transaction in transactions.items],
+                'transactions': transaction_rows.serialize_all(rows),
                 'invoice': invoice.to_dict(),
-                'total': transactions.total,
-                'pages': transactions.pages,
-                'current_page': page,
-                'per_page': per_page
+                **pagination
             }
         except Exception as e:
             return {
@@ -150,7 +291,8 @@ class TransactionService:
             }
     
     @staticmethod
-    def get_transactions_by_type(type: str, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+    @read_only
+    def get_transactions_by_type(type: str, page: int = 1, per_page: int = 10, cursor: str = None, include_total: bool = True) -> Dict[str, Any]:
         """
         Get transactions by type
         
@@ -158,25 +300,34 @@ class TransactionService:
             type: Transaction type
             page: Page number
             per_page: Number of records per page
+            cursor: Keyset cursor; when given (empty for the first page) page is ignored
+            include_total: Whether to count the matching rows (total and pages)
             
         Returns:
             Dict: Transactions by type
         """
         try:
-            transactions = Transaction.query.filter_by(type=type).order_by(Transaction.date.desc()).paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
+            if cursor is not None:
+                result = TransactionService._keyset_result(
+                    transaction_rows.select().where(Transaction.type == type), cursor, per_page
+                )
+                result['type'] = type
+                return result
+            
+            rows, pagination = offset_page(
+                transaction_rows.select().where(Transaction.type == type).order_by(Transaction.date.desc()),
+                page,
+                per_page,
+                include_total=include_total,
+                count=lambda: CountService.count_transactions(type=type),
+                session=db.session
             )
             
             return {
                 'success': True,
-                'transactions': [transaction.to_dict() for transaction in transactions.items],
+                'transactions': transaction_rows.serialize_all(rows),
                 'type': type,
-                'total': transactions.total,
-                'pages': transactions.pages,
-                'current_page': page,
-                'per_page': per_page
+                **pagination
             }
         except Exception as e:
             return {
@@ -185,6 +336,59 @@ class TransactionService:
                 'transactions': []
             }
     
+    @staticmethod
+    def _keyset_result(statement, cursor: str, per_page: int) -> Dict[str, Any]:
+        """Build a cursor-paginated transactions result from a select of transaction_rows"""
+        per_page = page_size(per_page)
+        try:
+            rows, next_cursor = keyset_page(statement, Transaction.date, Transaction.id, cursor, per_page, session=db.session)
+        except ValueError as e:
+            return {
+                'success': False,
+                'message': str(e),
+                'transactions': []
+            }
+        
+        return {
+            'success': True,
+            'transactions': transaction_rows.serialize_all(rows),
+            'per_page': per_page,
+            'next_cursor': next_cursor
+        }
+    
+    @staticmethod
+    @read_only
+    def iter_transactions(start_date: date = None, end_date: date = None, type: str = None, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over transactions for export, oldest first
+        
+        Rows are fetched batch_size at a time from a streaming cursor, so
+        only one batch is held in memory.
+        
+        Args:
+            start_date: First day included (optional)
+            end_date: Last day included (optional)
+            type: Transaction type (optional)
+            batch_size: Rows fetched per round trip
+            
+        Returns:
+            Iterator: Transaction dicts
+        """
+        statement = transaction_rows.select()
+        
+        if start_date:
+            statement = statement.where(Transaction.date >= start_date)
+        
+        if end_date:
+            statement = statement.where(Transaction.date <= end_date)
+        
+        if type:
+            statement = statement.where(Transaction.type == type)
+        
+        statement = statement.order_by(Transaction.date, Transaction.id).execution_options(yield_per=batch_size)
+        for row in db.session.execute(statement):
+            yield transaction_rows(row)
+    
     @staticmethod
     def update_transaction(transaction_id: int, **kwargs) -> Dict[str, Any]:
         """
@@ -284,6 +488,7 @@ class TransactionService:
             }
     
     @staticmethod
+    @read_only
     def get_transaction_statistics() -> Dict[str, Any]:
         """
         Get transaction statistics
@@ -292,15 +497,15 @@ class TransactionService:
             Dict: Statistics information
         """
         try:
-            total_transactions = Transaction.query.count()
-            
-            total_amount = db.session.query(db.func.sum(Transaction.amount)).scalar() or 0
+            totals = RollupService.get_period_aggregate()
+            total_transactions = totals['transaction_count']
+            total_amount = totals['total_amount']
             
             types_stats = db.session.query(
-                Transaction.type,
-                db.func.count(Transaction.id).label('count'),
-                db.func.sum(Transaction.amount).label('total_amount')
-            ).group_by(Transaction.type).all()
+                DailyRollup.type,
+                db.func.sum(DailyRollup.transaction_count).label('count'),
+                db.func.sum(DailyRollup.total_amount).label('total_amount')
+            ).group_by(DailyRollup.type).having(db.func.sum(DailyRollup.transaction_count) > 0).all()
             
             types_info = {}
             for type_stat in types_stats:
@@ -309,18 +514,18 @@ class TransactionService:
                     'total_amount': float(type_stat.total_amount or 0)
                 }
             
-            monthly_stats = db.session.query(
-                db.func.strftime('%Y-%m', Transaction.date).label('month'),
-                db.func.count(Transaction.id).label('count'),
-                db.func.sum(Transaction.amount).label('total_amount')
-            ).group_by(db.func.strftime('%Y-%m', Transaction.date)).order_by('month').limit(12).all()
+            monthly_stats = RollupService.get_period_aggregate(group_by='year_month')
             
             monthly_info = {}
-            for month_stat in monthly_stats:
-                monthly_info[month_stat.month] = {
-                    'count': month_stat.count,
-                    'total_amount': float(month_stat.total_amount or 0)
+            for month, month_stat in monthly_stats.items():
+                if not month_stat['transaction_count']:
+                    continue
+                monthly_info[month] = {
+                    'count': month_stat['transaction_count'],
+                    'total_amount': month_stat['total_amount']
                 }
+                if len(monthly_info) == 12:
+                    break
             
             return {
                 'success': True,
@@ -339,39 +544,73 @@ class TransactionService:
             }
     
     @staticmethod
-    def search_transactions(query: str, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+    @read_only
+    def search_transactions(query: str = None, page: int = 1, per_page: int = 10,
+                            amount_min: float = None, amount_max: float = None, amount: float = None,
+                            start_date: date = None, end_date: date = None, types: List[str] = None,
+                            invoice_id: int = None, include_total: bool = True) -> Dict[str, Any]:
         """
-        Search transactions by type or amount
+        Search transactions with typed filters and optional free text
+        
+        Every filter compiles to an indexable predicate (amount, date, type
+        and invoice_id are all indexed). Free text is matched by prefix
+        against the type and amount through the transactions_fts index.
         
         Args:
-            query: Search query
+            query: Free-text query (optional)
             page: Page number
             per_page: Number of records per page
+            amount_min: Smallest amount included (optional)
+            amount_max: Largest amount included (optional)
+            amount: Exact amount (optional)
+            start_date: First day included (optional)
+            end_date: Last day included (optional)
+            types: Transaction types to include (optional)
+            invoice_id: Invoice ID (optional)
+            include_total: Whether to count the matching rows (total and pages)
             
         Returns:
             Dict: Search results
         """
         try:
-            search_pattern = f"%{query.lower()}%"
+            search = transaction_rows.select()
             
-            transactions = Transaction.query.filter(
-                db.or_(
-                    Transaction.type.ilike(search_pattern),
-                    db.cast(Transaction.amount, db.String).like(search_pattern)
-                )
-            ).order_by(Transaction.date.desc()).paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
+            if amount is not None:
+                search = search.where(Transaction.amount == amount)
+            
+            if amount_min is not None:
+                search = search.where(Transaction.amount >= amount_min)
+            
+            if amount_max is not None:
+                search = search.where(Transaction.amount <= amount_max)
+            
+            if start_date:
+                search = search.where(Transaction.date >= start_date)
+            
+            if end_date:
+                search = search.where(Transaction.date <= end_date)
+            
+            if types:
+                search = search.where(Transaction.type.in_(types))
+            
+            if invoice_id is not None:
+                search = search.where(Transaction.invoice_id == invoice_id)
+            
+            if query:
+                search = search.where(TransactionService._text_match(query))
+            
+            rows, pagination = offset_page(
+                search.order_by(Transaction.date.desc(), Transaction.id.desc()),
+                page,
+                per_page,
+                include_total=include_total,
+                session=db.session
             )
             
             return {
                 'success': True,
-                'transactions': [transaction.to_dict() for transaction in transactions.items],
-                'total': transactions.total,
-                'pages': transactions.pages,
-                'current_page': page,
-                'per_page': per_page,
+                'transactions': transaction_rows.serialize_all(rows),
+                **pagination,
                 'query': query
             }
             
@@ -381,3 +620,15 @@ class TransactionService:
                 'message': f'Error searching transactions: {str(e)}',
                 'transactions': []
             }
+    
+    @staticmethod
+    def _text_match(query: str):
+        """Free-text predicate: FTS5 prefix match, or a type match without FTS5"""
+        terms = search_terms(query)
+        if not terms:
+            return false()
+        
+        if not search_index_supported(db.session.connection()):
+            return db.and_(*[Transaction.type.ilike(f'%{term}%') for term in terms])
+        
+        return Transaction.id.in_(transaction_search.matching_ids(terms))
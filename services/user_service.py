@@ -1,5 +1,11 @@
+import math
 from models.user import User, db
+from models.search import user_search
+from models.serialization import user_rows
 from sqlalchemy.exc import IntegrityError
+from utils.pagination import offset_page, page_size
+from utils.passwords import PasswordHashBusy
+from utils.replica import read_only
 from typing import List, Optional, Dict, Any
 
 
@@ -57,6 +63,14 @@ class UserService:
                 'message': 'This email address is already in use',
                 'user': None
             }
+        except PasswordHashBusy as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': str(e),
+                'user': None,
+                'busy': True
+            }
         except Exception as e:
             db.session.rollback()
             return {
@@ -108,6 +122,14 @@ class UserService:
                 'message': 'This email address is already in use',
                 'user': None
             }
+        except PasswordHashBusy as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': str(e),
+                'user': None,
+                'busy': True
+            }
         except Exception as e:
             db.session.rollback()
             return {
@@ -133,6 +155,7 @@ class UserService:
             return None
     
     @staticmethod
+    @read_only
     def get_all_users(page: int = 1, per_page: int = 10) -> Dict[str, Any]:
         """
         Get all users paginated
@@ -141,19 +164,12 @@ class UserService:
             page: Page
         """
         try:
-            users = User.query.paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
-            )
+            rows, pagination = offset_page(user_rows.select(), page, per_page, session=db.session)
             
             return {
                 'success': True,
-                'users': [user.to_dict() for user in users.items],
-                'total': users.total,
-                'pages': users.pages,
-                'current_page': page,
-                'per_page': per_page
+                'users': user_rows.serialize_all(rows),
+                **pagination
             }
         except Exception as e:
             return {
@@ -163,6 +179,7 @@ class UserService:
             }
     
     @staticmethod
+    @read_only
     def get_users_by_role(role: str) -> List[User]:
         """Get users by role"""
         try:
@@ -219,6 +236,14 @@ class UserService:
                 'user': user.to_dict()
             }
             
+        except PasswordHashBusy as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': str(e),
+                'user': None,
+                'busy': True
+            }
         except Exception as e:
             db.session.rollback()
             return {
@@ -266,6 +291,10 @@ class UserService:
         """
         User authentication
         
+        A stored hash made with other parameters than the configured
+        PASSWORD_HASH_METHOD is replaced by a fresh hash of the verified
+        password.
+        
         Args:
             email: Email address
             password: Password
@@ -290,12 +319,22 @@ class UserService:
                     'user': None
                 }
             
+            if user.password_needs_rehash():
+                UserService._upgrade_password_hash(user, password)
+            
             return {
                 'success': True,
                 'message': 'Login successful',
                 'user': user.to_dict()
             }
             
+        except PasswordHashBusy as e:
+            return {
+                'success': False,
+                'message': str(e),
+                'user': None,
+                'busy': True
+            }
         except Exception as e:
             return {
                 'success': False,
@@ -303,6 +342,15 @@ class UserService:
                 'user': None
             }
     
+    @staticmethod
+    def _upgrade_password_hash(user: User, password: str) -> None:
+        """Re-hash a verified password; on any failure the old hash is kept"""
+        try:
+            user.set_password(password)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+    
     @staticmethod
     def change_password(user_id: int, current_password: str, new_password: str) -> Dict[str, Any]:
         """
@@ -338,6 +386,13 @@ class UserService:
                 'message': 'Password changed successfully'
             }
             
+        except PasswordHashBusy as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': str(e),
+                'busy': True
+            }
         except Exception as e:
             db.session.rollback()
             return {
@@ -346,44 +401,96 @@ class UserService:
             }
     
     @staticmethod
-    def search_users(query: str, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+    @read_only
+    def search_users(query: str, page: int = 1, per_page: int = 10, mode: str = 'prefix') -> Dict[str, Any]:
         """
         Search users by name or email
         
+        Matches words of the name and email through the users_fts index,
+        best bm25 rank first; a name match weighs more than an email match.
+        
         Args:
             query: Search query
             page: Page number
             per_page: Users per page
+            mode: 'prefix' matches word prefixes, 'full' whole words only
             
         Returns:
             Dict: Search results
         """
         try:
-            search_pattern = f"%{query.lower()}%"
-            users = User.query.filter(
-                db.or_(
-                    User.fullname.ilike(search_pattern),
-                    User.email.ilike(search_pattern)
-                )
-            ).paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
+            page = max(page, 1)
+            size = page_size(per_page)
+            rows, total = user_search.search(
+                db.session,
+                User,
+                query,
+                mode=mode,
+                limit=size,
+                offset=(page - 1) * size,
+                columns=user_rows.columns
             )
             
             return {
                 'success': True,
-                'users': [user.to_dict() for user in users.items],
-                'total': users.total,
-                'pages': users.pages,
+                'users': user_rows.serialize_all(rows),
+                'total': total,
+                'pages': math.ceil(total / size),
                 'current_page': page,
-                'per_page': per_page,
-                'query': query
+                'per_page': size,
+                'query': query,
+                'mode': mode
             }
             
+        except ValueError as e:
+            return {
+                'success': False,
+                'message': str(e),
+                'users': []
+            }
         except Exception as e:
             return {
                 'success': False,
                 'message': f'Error searching users: {str(e)}',
                 'users': []
             }
+    
+    @staticmethod
+    @read_only
+    def autocomplete_users(query: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Suggest users whose name or email words start with the typed text
+        
+        Args:
+            query: Text typed so far
+            limit: Maximum number of suggestions
+            
+        Returns:
+            Dict: Suggestions with id, fullname and email
+        """
+        try:
+            rows, _ = user_search.search(
+                db.session,
+                User,
+                query,
+                mode='prefix',
+                limit=limit,
+                include_total=False,
+                columns=user_rows.columns
+            )
+            
+            return {
+                'success': True,
+                'suggestions': [
+                    {'id': row.id, 'fullname': row.fullname, 'email': row.email}
+                    for row in rows
+                ],
+                'query': query
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error searching users: {str(e)}',
+                'suggestions': []
+            }
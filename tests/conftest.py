@@ -11,7 +11,12 @@ from routes.user_routes import user_bp
 from routes.accounting_routes import accounting_bp
 from routes.invoice_routes import invoice_bp
 from routes.transaction_routes import transaction_bp
+from routes.customer_routes import customer_bp
 from services.user_service import UserService
+from utils.metrics import init_metrics
+from utils.profiling import init_profiling
+from utils.query_stats import init_query_stats
+from utils.slow_queries import init_slow_query_log
 from datetime import date
 
 
@@ -29,12 +34,17 @@ def app():
     })
     
     db.init_app(app)
+    init_query_stats(app)
+    init_metrics(app)
+    init_slow_query_log(app, db)
+    init_profiling(app)
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(user_bp)
     app.register_blueprint(accounting_bp)
     app.register_blueprint(invoice_bp)
     app.register_blueprint(transaction_bp)
+    app.register_blueprint(customer_bp)
     
     with app.app_context():
         db.create_all()
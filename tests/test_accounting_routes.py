@@ -122,6 +122,37 @@ class TestAccountingRoutes:
         assert data['cash_flow']['period']['days'] == 7
         assert len(data['cash_flow']['daily_flow']) == 7
     
+    def test_get_cash_flow_date_range(self, client, auth_headers):
+        """Test cash flow with explicit date range and opening balance"""
+        headers = auth_headers()
+        
+        response = client.get(
+            '/api/accounting/cash-flow?start_date=2024-01-15&end_date=2024-01-31&opening_balance=5000',
+            headers=headers
+        )
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        
+        assert data['success'] is True
+        assert data['cash_flow']['period']['days'] == 17
+        assert data['cash_flow']['opening_balance'] == 5000.0
+        assert data['cash_flow']['final_balance'] == 5200.0
+    
+    def test_get_cash_flow_invalid_date_range(self, client, auth_headers):
+        """Test cash flow with reversed or malformed date range"""
+        headers = auth_headers()
+        
+        response = client.get(
+            '/api/accounting/cash-flow?start_date=2024-02-01&end_date=2024-01-01',
+            headers=headers
+        )
+        assert response.status_code == 400
+        
+        response = client.get('/api/accounting/cash-flow?start_date=2024/01/01', headers=headers)
+        assert response.status_code == 400
+        assert 'YYYY-MM-DD' in response.get_json()['message']
+    
     def test_get_cash_flow_invalid_period(self, client, auth_headers):
         """Test cash flow with invalid period"""
         headers = auth_headers()
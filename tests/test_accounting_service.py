@@ -60,6 +60,38 @@ class TestAccountingService:
             assert result['report']['summary']['total_expense'] == 0.0
             assert result['report']['summary']['net_profit'] == 1500.0
     
+    def test_get_yearly_report_success(self, app):
+        """Test yearly report generation"""
+        with app.app_context():
+            result = AccountingService.get_yearly_report(2024)
+            
+            assert result['success'] is True
+            report = result['yearly_report']
+            assert report['year'] == 2024
+            assert report['financial_summary']['total_income'] == 2500.0
+            assert report['financial_summary']['total_expense'] == 800.0
+            assert report['profit_loss']['revenue']['total_revenue'] == 2500.0
+            assert report['profit_loss']['revenue']['invoice_count'] == 2
+            assert len(report['monthly_breakdown']) == 12
+            assert report['monthly_breakdown'][0]['month_name'] == 'January'
+            assert report['monthly_breakdown'][0]['summary']['transaction_count'] == 3
+            assert report['monthly_breakdown'][1]['summary']['net_profit'] == 1500.0
+    
+    def test_get_yearly_report_matches_period_reports(self, app):
+        """Test that the yearly report agrees with the per-period reports"""
+        with app.app_context():
+            report = AccountingService.get_yearly_report(2024)['yearly_report']
+            
+            summary = AccountingService.get_financial_summary('2024-01-01', '2024-12-31')['summary']
+            profit_loss = AccountingService.get_profit_loss_statement('2024-01-01', '2024-12-31')['profit_loss']
+            
+            assert report['financial_summary'] == summary
+            assert report['profit_loss'] == profit_loss
+            
+            for month in report['monthly_breakdown']:
+                monthly_report = AccountingService.get_monthly_report(2024, month['month'])['report']
+                assert month['summary'] == monthly_report['summary']
+    
     def test_get_cash_flow_success(self, app):
         """Test cash flow calculation"""
         with app.app_context():
@@ -71,6 +103,54 @@ class TestAccountingService:
             assert 'final_balance' in result['cash_flow']
             assert isinstance(result['cash_flow']['final_balance'], float)
     
+    def test_get_cash_flow_date_range(self, app):
+        """Test cash flow over an explicit date range"""
+        with app.app_context():
+            result = AccountingService.get_cash_flow(start_date='2024-01-15', end_date='2024-01-31')
+            
+            assert result['success'] is True
+            cash_flow = result['cash_flow']
+            assert cash_flow['period']['days'] == 17
+            assert len(cash_flow['daily_flow']) == 17
+            assert cash_flow['opening_balance'] == 0.0
+            assert cash_flow['final_balance'] == 200.0
+            
+            first_day = cash_flow['daily_flow'][0]
+            assert first_day['date'] == '2024-01-15'
+            assert first_day['income'] == 1000.0
+            assert first_day['running_balance'] == 1000.0
+            assert first_day['transaction_count'] == 1
+    
+    def test_get_cash_flow_derives_opening_balance(self, app):
+        """Test that the opening balance carries earlier transactions"""
+        with app.app_context():
+            result = AccountingService.get_cash_flow(start_date='2024-02-01', end_date='2024-02-29')
+            
+            assert result['success'] is True
+            assert result['cash_flow']['opening_balance'] == 200.0
+            assert result['cash_flow']['final_balance'] == 1700.0
+    
+    def test_get_cash_flow_explicit_opening_balance(self, app):
+        """Test cash flow with a caller supplied opening balance"""
+        with app.app_context():
+            result = AccountingService.get_cash_flow(
+                start_date='2024-02-01',
+                end_date='2024-02-29',
+                opening_balance=1000.0
+            )
+            
+            assert result['success'] is True
+            assert result['cash_flow']['opening_balance'] == 1000.0
+            assert result['cash_flow']['final_balance'] == 2500.0
+    
+    def test_get_cash_flow_reversed_range(self, app):
+        """Test cash flow with start date after end date"""
+        with app.app_context():
+            result = AccountingService.get_cash_flow(start_date='2024-02-01', end_date='2024-01-01')
+            
+            assert result['success'] is False
+            assert result['cash_flow'] is None
+    
     def test_get_customer_analysis_all_customers(self, app):
         """Test customer analysis for all customers"""
         with app.app_context():
@@ -0,0 +1,179 @@
+import pytest
+import threading
+import time
+from utils.cache import TTLCache, invalidate_on_write, mark_tables_written
+from services.accounting_service import AccountingService, dashboard_cache
+from services.transaction_service import TransactionService
+from services.invoice_service import InvoiceService
+from models.customer import Customer
+from models.user import db
+
+
+class TestTTLCache:
+    
+    def test_get_and_set(self):
+        cache = TTLCache('test')
+        
+        assert cache.get('key') is None
+        cache.set('key', 'value')
+        assert cache.get('key') == 'value'
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+    
+    def test_entry_expires(self):
+        cache = TTLCache('test')
+        
+        cache.set('key', 'value', ttl=0.01)
+        time.sleep(0.02)
+        
+        assert cache.get('key') is None
+        assert cache.stats()['size'] == 0
+    
+    def test_max_size_evicts_least_recently_used(self):
+        cache = TTLCache('test', max_size=2)
+        
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert cache.stats()['size'] == 2
+        assert cache.stats()['evictions'] == 1
+    
+    def test_zero_ttl_disables_caching(self):
+        cache = TTLCache('test', default_ttl=0)
+        calls = []
+        
+        cache.get_or_compute('key', lambda: calls.append(1))
+        cache.get_or_compute('key', lambda: calls.append(1))
+        
+        assert len(calls) == 2
+    
+    def test_get_or_compute_single_flight(self):
+        cache = TTLCache('test')
+        calls = []
+        
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'value'
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute('key', compute)))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert results == ['value'] * 10
+        assert len(calls) == 1
+    
+    def test_invalidation_during_compute_is_not_stored(self):
+        cache = TTLCache('test')
+        
+        def compute():
+            cache.invalidate()
+            return 'stale'
+        
+        assert cache.get_or_compute('key', compute) == 'stale'
+        assert cache.get('key') is None
+    
+    def test_invalidate_on_commit(self, app):
+        cache = invalidate_on_write(TTLCache('test'), 'customers')
+        
+        with app.app_context():
+            cache.set('key', 'value')
+            db.session.add(Customer(
+                name="Cache Customer",
+                address="Address",
+                phone="555-1000",
+                email="cache@test.com"
+            ))
+            db.session.commit()
+            
+            assert cache.get('key') is None
+    
+    def test_rollback_does_not_invalidate(self, app):
+        cache = invalidate_on_write(TTLCache('test'), 'customers')
+        
+        with app.app_context():
+            cache.set('key', 'value')
+            db.session.add(Customer(
+                name="Cache Customer",
+                address="Address",
+                phone="555-1000",
+                email="cache@test.com"
+            ))
+            db.session.flush()
+            db.session.rollback()
+            
+            assert cache.get('key') == 'value'
+    
+    def test_mark_tables_written(self, app):
+        cache = invalidate_on_write(TTLCache('test'), 'customers')
+        
+        with app.app_context():
+            cache.set('key', 'value')
+            mark_tables_written(db.session, 'customers')
+            db.session.commit()
+            
+            assert cache.get('key') is None
+
+
+class TestDashboardCache:
+    
+    def test_dashboard_is_cached(self, app):
+        with app.app_context():
+            dashboard_cache.invalidate()
+            
+            first = AccountingService.get_dashboard()
+            hits = dashboard_cache.stats()['hits']
+            second = AccountingService.get_dashboard()
+            
+            assert first['success'] is True
+            assert second['dashboard'] is first['dashboard']
+            assert dashboard_cache.stats()['hits'] == hits + 1
+    
+    def test_transaction_write_invalidates_dashboard(self, app):
+        with app.app_context():
+            dashboard_cache.invalidate()
+            
+            first = AccountingService.get_dashboard()
+            TransactionService.create_transaction(
+                invoice_id=1,
+                amount=100.0,
+                date='2024-01-15',
+                type='income'
+            )
+            second = AccountingService.get_dashboard()
+            
+            assert second['dashboard'] is not first['dashboard']
+            assert second['dashboard']['transaction_summary']['income']['count'] == 3
+    
+    def test_invoice_write_invalidates_dashboard(self, app):
+        with app.app_context():
+            dashboard_cache.invalidate()
+            
+            first = AccountingService.get_dashboard()
+            InvoiceService.update_invoice_status(2, 'paid')
+            second = AccountingService.get_dashboard()
+            
+            assert second['dashboard'] is not first['dashboard']
+            assert second['dashboard']['invoice_summary']['by_status']['paid']['count'] == 3
+    
+    def test_dashboard_ttl_zero_disables_cache(self, app):
+        app.config['DASHBOARD_CACHE_TTL'] = 0
+        
+        with app.app_context():
+            dashboard_cache.invalidate()
+            
+            first = AccountingService.get_dashboard()
+            second = AccountingService.get_dashboard()
+            
+            assert second['dashboard'] is not first['dashboard']
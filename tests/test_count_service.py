@@ -0,0 +1,98 @@
+import pytest
+from datetime import date
+from services.count_service import CountService, count_cache
+from services.transaction_service import TransactionService
+from services.invoice_service import InvoiceService
+from models.user import db
+from sqlalchemy import event
+
+
+def record_statements(statements):
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    return record
+
+
+class TestCountService:
+
+    def test_count_transactions(self, app):
+        """Test transaction counts overall and by type"""
+        with app.app_context():
+            assert CountService.count_transactions() == 4
+            assert CountService.count_transactions(type='income') == 2
+            assert CountService.count_transactions(type='expense') == 2
+            assert CountService.count_transactions(type='refund') == 0
+
+    def test_count_invoices(self, app):
+        """Test invoice counts overall, by status and by customer"""
+        with app.app_context():
+            assert CountService.count_invoices() == 3
+            assert CountService.count_invoices(status='paid') == 2
+            assert CountService.count_invoices(customer_id=2) == 1
+
+    def test_counts_are_cached(self, app):
+        """Test that a repeated count does not hit the database"""
+        with app.app_context():
+            CountService.count_invoices(status='pending')
+            
+            statements = []
+            record = record_statements(statements)
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                count = CountService.count_invoices(status='pending')
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+            
+            assert count == 1
+            assert statements == []
+
+    def test_writes_refresh_counts(self, app):
+        """Test that committed writes are reflected in cached counts"""
+        with app.app_context():
+            assert CountService.count_transactions(type='income') == 2
+            assert CountService.count_invoices(status='pending') == 1
+            
+            TransactionService.create_transaction(
+                invoice_id=1,
+                amount=100.0,
+                date='2024-03-01',
+                type='income'
+            )
+            InvoiceService.update_invoice_status(2, 'paid')
+            
+            assert CountService.count_transactions(type='income') == 3
+            assert CountService.count_invoices(status='pending') == 0
+            assert CountService.count_invoices(status='paid') == 3
+
+    def test_listing_without_total(self, app):
+        """Test that include_total=False skips counting and reports has_next"""
+        with app.app_context():
+            count_cache.invalidate()
+            
+            statements = []
+            record = record_statements(statements)
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                result = TransactionService.get_all_transactions(page=1, per_page=3, include_total=False)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+            
+            assert result['success'] is True
+            assert len(result['transactions']) == 3
+            assert result['has_next'] is True
+            assert 'total' not in result
+            assert len(statements) == 1
+            assert 'count(' not in statements[0].lower()
+            
+            last_page = TransactionService.get_all_transactions(page=2, per_page=3, include_total=False)
+            assert len(last_page['transactions']) == 1
+            assert last_page['has_next'] is False
+
+    def test_listing_total_from_count_cache(self, app):
+        """Test that listing totals come from the count cache"""
+        with app.app_context():
+            result = InvoiceService.get_invoices_by_status('paid', page=1, per_page=1)
+            
+            assert result['total'] == 2
+            assert result['pages'] == 2
+            assert len(result['invoices']) == 1
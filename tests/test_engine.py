@@ -0,0 +1,102 @@
+import os
+import pytest
+import tempfile
+from flask import Flask
+from models.user import db
+from utils.engine import engine_settings, init_engine
+
+
+@pytest.fixture
+def profiled_app():
+    db_fd, db_path = tempfile.mkstemp(suffix='.db')
+    
+    def make(**config):
+        app = Flask(__name__)
+        app.config.update({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        app.config.update(config)
+        init_engine(app, db)
+        return app
+    
+    yield make
+    
+    os.close(db_fd)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+
+class TestEngineProfile:
+    
+    def test_engine_settings(self):
+        assert engine_settings({}) == ('default', {}, {})
+        
+        name, pool, pragmas = engine_settings({
+            'DB_ENGINE_PROFILE': 'production',
+            'DB_POOL_SIZE': '3',
+            'DB_POOL_PRE_PING': 'false',
+            'SQLITE_SYNCHRONOUS': 'full'
+        })
+        
+        assert name == 'production'
+        assert pool['pool_size'] == 3
+        assert pool['pool_pre_ping'] is False
+        assert pragmas['synchronous'] == 'FULL'
+        assert pragmas['journal_mode'] == 'WAL'
+    
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError, match='DB_ENGINE_PROFILE'):
+            engine_settings({'DB_ENGINE_PROFILE': 'turbo'})
+        
+        with pytest.raises(ValueError, match='SQLITE_JOURNAL_MODE'):
+            engine_settings({'SQLITE_JOURNAL_MODE': 'WAL; DROP TABLE users'})
+    
+    def test_production_profile_applies_pragmas(self, profiled_app):
+        app = profiled_app(DB_ENGINE_PROFILE='production', SQLITE_BUSY_TIMEOUT='1500')
+        
+        with app.app_context():
+            with db.engine.connect() as connection:
+                assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+                assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == 1
+                assert connection.exec_driver_sql('PRAGMA temp_store').scalar() == 2
+                assert connection.exec_driver_sql('PRAGMA busy_timeout').scalar() == 1500
+            
+            assert db.engine.pool.size() == 10
+            assert db.engine.pool._pre_ping is True
+    
+    def test_default_profile_keeps_rollback_journal(self, profiled_app):
+        app = profiled_app()
+        
+        with app.app_context():
+            with db.engine.connect() as connection:
+                assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'delete'
+    
+    def test_memory_database_skips_queue_pool_options(self):
+        app = Flask(__name__)
+        app.config.update({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+            'DB_ENGINE_PROFILE': 'production'
+        })
+        
+        profile = init_engine(app, db)
+        
+        assert 'pool_size' not in profile['pool']
+        assert profile['pool']['pool_pre_ping'] is True
+        with app.app_context():
+            with db.engine.connect() as connection:
+                assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == 1
+    
+    def test_diagnostics_endpoint(self, client, admin_headers, auth_headers):
+        response = client.get('/api/accounting/diagnostics/database', headers=auth_headers())
+        assert response.status_code == 403
+        
+        response = client.get('/api/accounting/diagnostics/database', headers=admin_headers())
+        
+        assert response.status_code == 200
+        database = response.get_json()['database']
+        assert database['profile'] == 'default'
+        assert database['dialect'] == 'sqlite'
+        assert database['pragmas']['journal_mode'] == 'DELETE'
+        assert 'checkedout' in database['pool']
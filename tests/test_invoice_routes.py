@@ -341,6 +341,47 @@ class TestInvoiceRoutes:
         assert 'paid' in data['message']
         assert data['invoice']['status'] == 'paid'
     
+    def test_create_invoices_bulk(self, client, auth_headers):
+        """Test bulk invoice creation"""
+        headers = auth_headers()
+        
+        response = client.post('/api/invoices/bulk', headers=headers, json={
+            'invoices': [
+                {'customer_id': 1, 'date': '2024-03-31', 'total_amount': 100.0},
+                {'customer_id': 1, 'date': '31-03-2024', 'total_amount': 100.0}
+            ]
+        })
+        
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data['created_count'] == 1
+        assert data['errors'] == [{'index': 1, 'message': 'Invalid date format. Must be YYYY-MM-DD'}]
+    
+    def test_update_invoice_status_bulk(self, client, auth_headers, app):
+        """Test bulk invoice status transitions"""
+        headers = auth_headers()
+        
+        with app.app_context():
+            previous_updated_at = db.session.get(Invoice, 2).updated_at
+        
+        response = client.patch('/api/invoices/bulk/status', headers=headers, json={
+            'invoice_ids': [1, 2],
+            'status': 'cancelled'
+        })
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['updated_count'] == 2
+        assert data['missing_count'] == 0
+        
+        with app.app_context():
+            invoice = db.session.get(Invoice, 2)
+            assert invoice.status == 'cancelled'
+            assert invoice.updated_at > previous_updated_at
+        
+        missing_ids = client.patch('/api/invoices/bulk/status', headers=headers, json={'status': 'paid'})
+        assert missing_ids.status_code == 400
+    
     def test_update_invoice_status_missing_field(self, client, auth_headers, app):
         """Test status update with missing status field"""
         headers = auth_headers()
@@ -455,6 +496,38 @@ class TestInvoiceRoutes:
         for invoice in data['invoices']:
             assert invoice['status'] == 'pending'
     
+    def test_get_invoices_by_status_cursor_pagination(self, client, auth_headers, app):
+        """Test walking invoices of one status with keyset cursors"""
+        headers = auth_headers()
+        
+        with app.app_context():
+            for day in (3, 4, 5):
+                invoice = Invoice(
+                    customer_id=1,
+                    date=date(2024, 3, day),
+                    total_amount=100.0,
+                    status='pending'
+                )
+                db.session.add(invoice)
+            db.session.commit()
+            
+            expected_ids = [
+                i.id for i in Invoice.query.filter_by(status='pending')
+                .order_by(Invoice.date.desc(), Invoice.id.desc()).all()
+            ]
+        
+        first = client.get('/api/invoices/status/pending?per_page=2&cursor=', headers=headers).get_json()
+        second = client.get(
+            f"/api/invoices/status/pending?per_page=2&cursor={first['next_cursor']}",
+            headers=headers
+        ).get_json()
+        
+        assert first['success'] is True
+        assert first['status'] == 'pending'
+        assert first['next_cursor'] is not None
+        assert second['next_cursor'] is None
+        assert [i['id'] for i in first['invoices'] + second['invoices']] == expected_ids
+
     def test_get_invoices_by_status_invalid(self, client, auth_headers):
         """Test getting invoices by invalid status"""
         headers = auth_headers()
@@ -601,6 +674,22 @@ class TestInvoiceRoutes:
         for invoice in data['invoices']:
             assert invoice['status'] == 'overdue'
     
+    def test_export_invoices(self, client, auth_headers):
+        """Test streaming invoices filtered by status and customer"""
+        headers = auth_headers()
+        
+        response = client.get('/api/invoices/export?status=paid&customer_id=1', headers=headers)
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [record['date'] for record in records] == ['2024-01-15', '2024-02-10']
+        
+        csv_response = client.get('/api/invoices/export?format=csv&end_date=2024-01-31', headers=headers)
+        lines = csv_response.get_data(as_text=True).splitlines()
+        assert lines[0] == 'id,customer_id,date,total_amount,status,created_at,updated_at'
+        assert len(lines) == 3
+    
     def test_all_endpoints_require_authentication(self, client):
         """Test that all endpoints require authentication"""
         endpoints = [
@@ -0,0 +1,156 @@
+import pytest
+import threading
+from utils.metrics import EXTENSION_KEY, MetricsRegistry
+
+
+def metric_lines(response):
+    return response.get_data(as_text=True).splitlines()
+
+
+class TestMetricsRegistry:
+
+    def test_render_counter_and_gauge(self):
+        """Test the text format of counters and gauges"""
+        registry = MetricsRegistry()
+        counter = registry.counter('jobs', 'Jobs run', ['queue'])
+        gauge = registry.gauge('workers', 'Busy workers')
+
+        counter.inc(queue='default')
+        counter.inc(2, queue='say "hi"\n')
+        gauge.set(3)
+        gauge.dec()
+
+        lines = registry.render().splitlines()
+        assert '# HELP jobs_total Jobs run' in lines
+        assert '# TYPE jobs_total counter' in lines
+        assert 'jobs_total{queue="default"} 1' in lines
+        assert 'jobs_total{queue="say \\"hi\\"\\n"} 2' in lines
+        assert '# TYPE workers gauge' in lines
+        assert 'workers 2' in lines
+
+    def test_render_histogram(self):
+        """Test that histogram buckets are cumulative and end with +Inf"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency_seconds', 'Latency', ['route'], buckets=[0.1, 1])
+
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, route='a')
+
+        lines = registry.render().splitlines()
+        assert 'latency_seconds_bucket{route="a",le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{route="a",le="1"} 3' in lines
+        assert 'latency_seconds_bucket{route="a",le="+Inf"} 4' in lines
+        assert 'latency_seconds_sum{route="a"} 3.65' in lines
+        assert 'latency_seconds_count{route="a"} 4' in lines
+
+    def test_invalid_usage(self):
+        """Test that wrong labels and duplicate names are rejected"""
+        registry = MetricsRegistry()
+        counter = registry.counter('jobs', 'Jobs run', ['queue'])
+
+        with pytest.raises(ValueError, match='expects labels: queue'):
+            counter.inc()
+
+        with pytest.raises(ValueError, match='already registered'):
+            registry.gauge('jobs', 'Again')
+
+    def test_concurrent_updates(self):
+        """Test that updates from many threads are all counted"""
+        registry = MetricsRegistry()
+        counter = registry.counter('hits', 'Hits', ['route'])
+        histogram = registry.histogram('latency_seconds', 'Latency', ['route'])
+
+        def work():
+            for _ in range(2000):
+                counter.inc(route='a')
+                histogram.observe(0.01, route='a')
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counter.value(route='a') == 16000
+        assert histogram.count(route='a') == 16000
+
+
+class TestMetricsEndpoint:
+
+    def test_request_metrics(self, app, client, auth_headers):
+        """Test latency, database and status metrics per blueprint and endpoint"""
+        headers = auth_headers()
+        client.get('/api/transactions/', headers=headers)
+        client.get('/api/transactions/', headers=headers)
+        client.get('/api/transactions/999', headers=headers)
+
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response.content_type == 'text/plain; version=0.0.4; charset=utf-8'
+        lines = metric_lines(response)
+        labels = 'blueprint="transactions",endpoint="transactions.get_transactions"'
+        assert f'http_request_duration_seconds_count{{{labels},method="GET"}} 2' in lines
+        assert f'http_requests_total{{{labels},method="GET",status="200"}} 2' in lines
+        assert '# TYPE http_requests_total counter' in lines
+        assert f'http_request_db_queries_count{{{labels}}} 2' in lines
+        assert f'http_requests_in_flight{{{labels}}} 0' in lines
+        assert any(line.startswith(f'http_request_db_seconds_sum{{{labels}}}') for line in lines)
+        assert (
+            'http_requests_total{blueprint="transactions",endpoint="transactions.get_transaction",'
+            'method="GET",status="404"} 1'
+        ) in lines
+
+    def test_unmatched_paths_share_one_series(self, client):
+        """Test that unknown paths do not create a series per path"""
+        client.get('/no/such/path')
+        client.get('/another/missing/path')
+
+        lines = metric_lines(client.get('/metrics'))
+
+        assert 'http_requests_total{blueprint="app",endpoint="<unmatched>",method="GET",status="404"} 2' in lines
+
+    def test_errors_and_exceptions(self, app, client):
+        """Test that 5xx responses and unhandled exceptions are counted"""
+        app.config['PROPAGATE_EXCEPTIONS'] = False
+
+        @app.route('/boom')
+        def boom():
+            raise RuntimeError('boom')
+
+        assert client.get('/boom').status_code == 500
+
+        lines = metric_lines(client.get('/metrics'))
+        assert 'http_request_errors_total{blueprint="app",endpoint="boom",status="500"} 1' in lines
+        assert 'http_request_exceptions_total{blueprint="app",endpoint="boom",exception="RuntimeError"} 1' in lines
+        assert 'http_requests_in_flight{blueprint="app",endpoint="boom"} 0' in lines
+
+    def test_cache_and_database_metrics(self, client, auth_headers):
+        """Test that cache hit ratios and pool usage are reported"""
+        headers = auth_headers()
+        client.get('/api/transactions/', headers=headers)
+        client.get('/api/transactions/', headers=headers)
+
+        lines = metric_lines(client.get('/metrics'))
+
+        assert '# TYPE cache_hit_ratio gauge' in lines
+        assert any(line.startswith('cache_hit_ratio{cache="counts"} ') for line in lines)
+        assert '# TYPE cache_hits_total counter' in lines
+        assert any(line.startswith('cache_hits_total{cache="tokens"} ') for line in lines)
+        assert '# TYPE db_pool_connections_in_use gauge' in lines
+        assert '# TYPE password_hash_operations_total counter' in lines
+        assert any(line.startswith('password_hash_operations_total ') for line in lines)
+
+    def test_metrics_token(self, app, client):
+        """Test that METRICS_TOKEN protects the endpoint"""
+        app.config['METRICS_TOKEN'] = 'scrape-secret'
+
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+
+    def test_registry_is_exposed(self, app):
+        """Test that the registry is available to other components"""
+        registry = app.extensions[EXTENSION_KEY]
+
+        assert registry.get('http_request_duration_seconds') is not None
@@ -0,0 +1,101 @@
+import pytest
+import time
+from datetime import date
+from services.invoice_service import InvoiceService
+from services.overdue_sweeper import start_overdue_sweeper
+from models.invoice import Invoice
+from models.user import db
+from utils.scheduler import IntervalJob
+from sqlalchemy import event
+
+
+class TestOverdueSweeper:
+
+    def test_mark_overdue_invoices(self, app):
+        """Test that pending invoices past the grace period become overdue"""
+        with app.app_context():
+            assert InvoiceService.get_invoices_by_status('overdue')['total'] == 0
+            
+            result = InvoiceService.mark_overdue_invoices(grace_days=30, today=date(2024, 3, 1))
+            
+            assert result['success'] is True
+            assert result['updated_count'] == 1
+            assert result['cutoff'] == '2024-01-31'
+            assert result['duration_ms'] >= 0
+            assert db.session.get(Invoice, 2).status == 'overdue'
+            assert db.session.get(Invoice, 1).status == 'paid'
+            assert InvoiceService.get_invoices_by_status('overdue')['total'] == 1
+
+    def test_mark_overdue_respects_grace_period(self, app):
+        """Test that invoices inside the grace period stay pending"""
+        with app.app_context():
+            result = InvoiceService.mark_overdue_invoices(grace_days=60, today=date(2024, 3, 1))
+            
+            assert result['updated_count'] == 0
+            assert db.session.get(Invoice, 2).status == 'pending'
+
+    def test_mark_overdue_uses_status_date_index(self, app):
+        """Test that the sweep is one UPDATE seeking through (status, date)"""
+        with app.app_context():
+            statements = []
+            
+            def record(conn, cursor, statement, parameters, context, executemany):
+                statements.append((statement, parameters))
+            
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                InvoiceService.mark_overdue_invoices(grace_days=30, today=date(2024, 3, 1))
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+            
+            assert len(statements) == 1
+            statement, parameters = statements[0]
+            with db.engine.connect() as connection:
+                plan = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+            assert 'USING INDEX ix_invoices_status_date' in plan[0][3]
+
+    def test_mark_overdue_command(self, app, runner):
+        """Test the mark-overdue CLI command"""
+        result = runner.invoke(args=['invoices', 'mark-overdue', '--grace-days', '0'])
+        
+        assert result.exit_code == 0
+        assert '1 invoices marked overdue' in result.output
+
+    def test_interval_sweeper(self, app):
+        """Test that the in-process sweeper runs on its interval"""
+        assert start_overdue_sweeper(app) is None
+        
+        app.config['OVERDUE_SWEEP_INTERVAL'] = 0.05
+        app.config['OVERDUE_GRACE_DAYS'] = 0
+        job = start_overdue_sweeper(app)
+        try:
+            deadline = time.time() + 5
+            while job.runs == 0 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            job.stop(timeout=5)
+        
+        assert job.runs >= 1
+        assert job.last_error is None
+        assert job.last_result['success'] is True
+        
+        with app.app_context():
+            assert db.session.get(Invoice, 2).status == 'overdue'
+
+    def test_interval_job_keeps_running_after_error(self):
+        """Test that a failing run is recorded without stopping the job"""
+        calls = []
+        
+        def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError('boom')
+            return len(calls)
+        
+        job = IntervalJob('flaky', 60, flaky)
+        job.run_once()
+        assert isinstance(job.last_error, RuntimeError)
+        
+        assert job.run_once() == 2
+        assert job.last_error is None
+        assert job.runs == 2
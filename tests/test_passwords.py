@@ -0,0 +1,110 @@
+import pytest
+import threading
+from models.user import User, db
+from services.user_service import UserService
+from utils.passwords import PasswordHashBusy, PasswordHasher, init_password_hasher, normalize_method
+
+
+def occupy(hasher):
+    """Hold the hasher's only worker until the returned event is set"""
+    release = threading.Event()
+    started = threading.Event()
+    
+    def block():
+        started.set()
+        release.wait(5)
+    
+    threading.Thread(target=hasher._run, args=(block,), daemon=True).start()
+    started.wait(5)
+    return release
+
+
+class TestPasswordHasher:
+    
+    def test_normalize_method(self):
+        assert normalize_method('pbkdf2') == 'pbkdf2:sha256:600000'
+        assert normalize_method('pbkdf2:sha512:1000') == 'pbkdf2:sha512:1000'
+        assert normalize_method('scrypt') == 'scrypt:32768:8:1'
+        
+        with pytest.raises(ValueError, match='Unsupported'):
+            normalize_method('md5')
+    
+    def test_hash_and_verify_on_pool(self):
+        hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=2)
+        try:
+            pwhash = hasher.hash('secret')
+            
+            assert pwhash.startswith('pbkdf2:sha256:1000$')
+            assert hasher.verify(pwhash, 'secret') is True
+            assert hasher.verify(pwhash, 'wrong') is False
+            assert hasher.stats()['completed'] == 3
+        finally:
+            hasher.shutdown()
+    
+    def test_inline_without_workers(self):
+        hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=0)
+        
+        assert hasher.verify(hasher.hash('secret'), 'secret') is True
+    
+    def test_queue_limit_rejects(self):
+        hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=1, queue_limit=0)
+        release = occupy(hasher)
+        try:
+            with pytest.raises(PasswordHashBusy):
+                hasher.hash('secret')
+            assert hasher.stats()['rejected'] == 1
+        finally:
+            release.set()
+            hasher.shutdown()
+    
+    def test_needs_rehash(self):
+        hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=0)
+        
+        assert hasher.needs_rehash(hasher.hash('secret')) is False
+        assert hasher.needs_rehash('pbkdf2:sha256:260000$salt$hash') is True
+        assert hasher.needs_rehash('scrypt:32768:8:1$salt$hash') is True
+    
+    def test_login_upgrades_outdated_hash(self, app):
+        with app.app_context():
+            app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+            init_password_hasher(app)
+            assert User.query.filter_by(email='user@test.com').first().password.startswith('pbkdf2:sha256:600000$')
+            
+            result = UserService.authenticate_user('user@test.com', 'user123')
+            
+            assert result['success'] is True
+            user = User.query.filter_by(email='user@test.com').first()
+            assert user.password.startswith('pbkdf2:sha256:1000$')
+            assert UserService.authenticate_user('user@test.com', 'user123')['success'] is True
+    
+    def test_failed_login_keeps_hash(self, app):
+        with app.app_context():
+            app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+            init_password_hasher(app)
+            
+            result = UserService.authenticate_user('user@test.com', 'wrong')
+            
+            assert result['success'] is False
+            assert User.query.filter_by(email='user@test.com').first().password.startswith('pbkdf2:sha256:600000$')
+    
+    def test_login_returns_503_when_busy(self, app, client):
+        with app.app_context():
+            app.config.update({'PASSWORD_HASH_WORKERS': 1, 'PASSWORD_HASH_QUEUE_LIMIT': 0})
+            hasher = init_password_hasher(app)
+        
+        release = occupy(hasher)
+        try:
+            response = client.post('/api/auth/login', json={'email': 'user@test.com', 'password': 'user123'})
+            
+            assert response.status_code == 503
+            assert response.headers['Retry-After'] == '1'
+            assert response.get_json()['success'] is False
+        finally:
+            release.set()
+        
+        with app.app_context():
+            app.config['PASSWORD_HASH_QUEUE_LIMIT'] = 4
+            init_password_hasher(app)
+        
+        response = client.post('/api/auth/login', json={'email': 'user@test.com', 'password': 'user123'})
+        assert response.status_code == 200
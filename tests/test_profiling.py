@@ -0,0 +1,118 @@
+import cProfile
+import marshal
+import pstats
+from utils.profiling import EXTENSION_KEY, RequestProfile, RequestProfiler, init_profiling
+
+
+REPORT = '/api/accounting/monthly-report/2024/1'
+
+
+class TestRequestProfiling:
+
+    def test_admin_request_is_profiled(self, app, client, admin_headers):
+        """Test that the header profiles the request and reports its top functions"""
+        headers = admin_headers()
+        headers['X-Profile'] = '1'
+
+        response = client.get(REPORT, headers=headers)
+
+        assert response.status_code == 200
+        profile_id = response.headers['X-Profile-Id']
+
+        response = client.get(f'/api/accounting/diagnostics/profiles/{profile_id}?limit=5', headers=admin_headers())
+        assert response.status_code == 200
+        profile = response.get_json()['profile']
+        assert profile['request'] == f'GET {REPORT}'
+        assert profile['status'] == 200
+        assert profile['user'] == 'admin@test.com'
+        assert profile['queries']['queries'] > 0
+        assert len(profile['top']) == 5
+        assert any('get_monthly_report' in row['function'] for row in profile['top'])
+        cumulative = [row['cumulative_ms'] for row in profile['top']]
+        assert cumulative == sorted(cumulative, reverse=True)
+
+    def test_query_parameter(self, app, client, admin_headers):
+        """Test that ?profile=1 works like the header"""
+        response = client.get(f'{REPORT}?profile=1', headers=admin_headers())
+
+        assert 'X-Profile-Id' in response.headers
+
+    def test_flag_is_ignored_for_non_admins(self, app, client, auth_headers):
+        """Test that regular users and anonymous clients are never profiled"""
+        headers = auth_headers()
+        headers['X-Profile'] = '1'
+
+        assert 'X-Profile-Id' not in client.get(REPORT, headers=headers).headers
+        assert 'X-Profile-Id' not in client.get('/api/accounting/health', headers={'X-Profile': '1'}).headers
+        assert app.extensions[EXTENSION_KEY].profiles() == []
+
+    def test_requests_without_flag_are_not_profiled(self, app, client, admin_headers):
+        """Test that no profile is taken without the flag or with a false one"""
+        headers = admin_headers()
+
+        assert 'X-Profile-Id' not in client.get(REPORT, headers=headers).headers
+        assert 'X-Profile-Id' not in client.get(REPORT, headers={**headers, 'X-Profile': '0'}).headers
+        assert app.extensions[EXTENSION_KEY].profiles() == []
+
+    def test_download_pstats(self, app, client, admin_headers, tmp_path):
+        """Test that the raw profile loads with pstats"""
+        headers = admin_headers()
+        profile_id = client.get(REPORT, headers={**headers, 'X-Profile': '1'}).headers['X-Profile-Id']
+
+        response = client.get(f'/api/accounting/diagnostics/profiles/{profile_id}?format=pstats', headers=headers)
+
+        assert response.status_code == 200
+        assert response.headers['Content-Disposition'] == f'attachment; filename=profile-{profile_id}.prof'
+        path = tmp_path / 'request.prof'
+        path.write_bytes(response.data)
+        assert pstats.Stats(str(path)).total_calls > 0
+
+    def test_list_sort_and_clear(self, app, client, admin_headers):
+        """Test listing, sort orders and clearing the kept profiles"""
+        headers = admin_headers()
+        first = client.get(REPORT, headers={**headers, 'X-Profile': '1'}).headers['X-Profile-Id']
+        second = client.get('/api/accounting/summary', headers={**headers, 'X-Profile': '1'}).headers['X-Profile-Id']
+
+        profiles = client.get('/api/accounting/diagnostics/profiles', headers=headers).get_json()['profiles']
+        assert [p['id'] for p in profiles] == [second, first]
+
+        response = client.get(f'/api/accounting/diagnostics/profiles/{first}?sort=calls', headers=headers)
+        calls = [row['calls'] for row in response.get_json()['profile']['top']]
+        assert calls == sorted(calls, reverse=True)
+        assert client.get(f'/api/accounting/diagnostics/profiles/{first}?sort=name', headers=headers).status_code == 400
+
+        assert client.delete('/api/accounting/diagnostics/profiles', headers=headers).status_code == 200
+        assert client.get(f'/api/accounting/diagnostics/profiles/{first}', headers=headers).status_code == 404
+
+    def test_endpoints_require_admin(self, client, auth_headers):
+        """Test that regular users cannot read profiles"""
+        response = client.get('/api/accounting/diagnostics/profiles', headers=auth_headers())
+
+        assert response.status_code == 403
+
+    def test_disabled_by_history_size(self, app):
+        """Test that a history size of 0 turns profiling off"""
+        app.config['PROFILE_HISTORY_SIZE'] = 0
+
+        assert init_profiling(app) is None
+        assert EXTENSION_KEY not in app.extensions
+
+
+class TestRequestProfiler:
+
+    def test_history_is_bounded(self):
+        """Test that only the newest profiles are kept"""
+        profiler = RequestProfiler(history=2)
+        profile = cProfile.Profile()
+        profile.enable()
+        sum(range(10))
+        profile.disable()
+        profile.create_stats()
+
+        added = [RequestProfile(profile.stats, 'GET', f'/{i}', 200, 0.01) for i in range(3)]
+        for item in added:
+            profiler.add(item)
+
+        assert [p.path for p in profiler.profiles()] == ['/2', '/1']
+        assert profiler.get(added[0].id) is None
+        assert marshal.loads(added[2].dump()) == profile.stats
@@ -0,0 +1,135 @@
+import pytest
+from datetime import date
+from models.invoice import Invoice
+from models.user import db
+from utils.query_stats import assert_max_queries
+
+# Statements each route may run for the seeded test data, authentication
+# included. Lower a budget when a route gets cheaper; raising one needs a
+# reason.
+ROUTE_BUDGETS = [
+    ('GET', '/api/accounting/summary', None, 1),
+    ('GET', '/api/accounting/monthly-report/2024/1', None, 2),
+    ('GET', '/api/accounting/cash-flow', None, 2),
+    ('GET', '/api/accounting/customer-analysis', None, 1),
+    ('GET', '/api/accounting/customer-analysis/1', None, 2),
+    ('GET', '/api/accounting/invoice-summary', None, 1),
+    ('GET', '/api/accounting/profit-loss', None, 1),
+    ('GET', '/api/accounting/transaction-summary', None, 1),
+    ('GET', '/api/accounting/dashboard', None, 5),
+    ('GET', '/api/accounting/reports/yearly/2024', None, 2),
+    ('GET', '/api/accounting/health', None, 0),
+    ('GET', '/api/accounting/diagnostics/database', None, 7),
+    ('GET', '/api/accounting/diagnostics/replica', None, 0),
+    ('GET', '/api/accounting/diagnostics/slow-queries', None, 0),
+    ('DELETE', '/api/accounting/diagnostics/slow-queries', None, 0),
+    ('GET', '/api/accounting/diagnostics/profiles', None, 0),
+    ('DELETE', '/api/accounting/diagnostics/profiles', None, 0),
+    ('POST', '/api/auth/register', {'fullname': 'New User', 'email': 'new@test.com', 'password': 'password123'}, 3),
+    ('POST', '/api/auth/login', {'email': 'admin@test.com', 'password': 'admin123'}, 1),
+    ('GET', '/api/auth/profile', None, 1),
+    ('POST', '/api/auth/verify', None, 0),
+    ('POST', '/api/auth/refresh', None, 0),
+    ('PUT', '/api/auth/change-password', {'current_password': 'admin123', 'new_password': 'admin456'}, 2),
+    ('GET', '/api/customers/search?q=test', None, 3),
+    ('GET', '/api/customers/autocomplete?q=te', None, 2),
+    ('GET', '/api/invoices/', None, 2),
+    ('GET', '/api/invoices/1', None, 1),
+    ('POST', '/api/invoices/', {'customer_id': 1, 'date': '2024-03-01', 'total_amount': 10.0}, 3),
+    ('POST', '/api/invoices/bulk', {'invoices': [{'customer_id': 1, 'date': '2024-03-01', 'total_amount': 10.0}]}, 2),
+    ('PATCH', '/api/invoices/bulk/status', {'invoice_ids': [1, 2], 'status': 'paid'}, 1),
+    ('PUT', '/api/invoices/1', {'total_amount': 1100.0}, 3),
+    ('PATCH', '/api/invoices/2/status', {'status': 'paid'}, 3),
+    ('GET', '/api/invoices/customer/1', None, 3),
+    ('GET', '/api/invoices/status/paid', None, 2),
+    ('GET', '/api/invoices/statistics', None, 8),
+    ('GET', '/api/invoices/pending', None, 2),
+    ('GET', '/api/invoices/paid', None, 2),
+    ('GET', '/api/invoices/overdue', None, 2),
+    ('GET', '/api/invoices/export', None, 1),
+    ('GET', '/api/transactions/', None, 2),
+    ('GET', '/api/transactions/1', None, 1),
+    ('POST', '/api/transactions/', {'invoice_id': 1, 'amount': 5.0, 'date': '2024-03-01', 'type': 'income'}, 4),
+    ('POST', '/api/transactions/bulk', {'transactions': [{'invoice_id': 1, 'amount': 5.0, 'date': '2024-03-01', 'type': 'income'}]}, 3),
+    ('PUT', '/api/transactions/1', {'amount': 1200.0}, 4),
+    ('DELETE', '/api/transactions/4', None, 3),
+    ('GET', '/api/transactions/by-invoice/1', None, 3),
+    ('GET', '/api/transactions/by-type/income', None, 2),
+    ('GET', '/api/transactions/search?q=inc&amount_min=100', None, 2),
+    ('GET', '/api/transactions/stats', None, 3),
+    ('GET', '/api/transactions/export', None, 1),
+    ('GET', '/api/users/', None, 2),
+    ('GET', '/api/users/1', None, 1),
+    ('PUT', '/api/users/2', {'fullname': 'Renamed User'}, 3),
+    ('DELETE', '/api/users/2', None, 2),
+    ('GET', '/api/users/search?q=test', None, 3),
+    ('GET', '/api/users/autocomplete?q=te', None, 2),
+    ('GET', '/api/users/by-role/admin', None, 1),
+    ('GET', '/api/users/by-email/user@test.com', None, 1),
+    ('GET', '/api/users/stats', None, 4),
+    ('GET', '/api/users/me', None, 1),
+    ('PUT', '/api/users/me', {'fullname': 'Admin Renamed'}, 3),
+    ('GET', '/metrics', None, 0),
+]
+
+# Routes whose budget needs a row or profile created first; each has its own test below
+SETUP_ROUTES = {
+    ('DELETE', '/api/invoices/<int:invoice_id>'),
+    ('GET', '/api/accounting/diagnostics/profiles/<profile_id>'),
+}
+
+
+class TestQueryBudgets:
+
+    @pytest.mark.parametrize('method, url, body, budget', ROUTE_BUDGETS, ids=[f'{m} {u}' for m, u, _, _ in ROUTE_BUDGETS])
+    def test_route_query_budget(self, client, admin_headers, method, url, body, budget):
+        """Test that a route stays within its statement budget"""
+        headers = admin_headers()
+
+        with assert_max_queries(budget):
+            response = client.open(url, method=method, headers=headers, json=body)
+            if url.endswith('/export'):
+                response.get_data()
+
+        assert response.status_code < 400
+
+    def test_delete_invoice_query_budget(self, app, client, admin_headers):
+        """Test that deleting an invoice without transactions stays within its budget"""
+        headers = admin_headers()
+        with app.app_context():
+            invoice = Invoice(customer_id=1, date=date(2024, 3, 1), total_amount=10.0, status='pending')
+            db.session.add(invoice)
+            db.session.commit()
+            invoice_id = invoice.id
+
+        with assert_max_queries(3):
+            response = client.delete(f'/api/invoices/{invoice_id}', headers=headers)
+
+        assert response.status_code == 200
+
+    def test_profile_query_budget(self, client, admin_headers):
+        """Test that reading a kept profile runs no statements"""
+        headers = admin_headers()
+        profile_id = client.get('/api/accounting/health', headers={**headers, 'X-Profile': '1'}).headers['X-Profile-Id']
+
+        with assert_max_queries(0):
+            response = client.get(f'/api/accounting/diagnostics/profiles/{profile_id}', headers=headers)
+
+        assert response.status_code == 200
+
+    def test_every_route_has_a_budget(self, app):
+        """Test that no route is left without a statement budget"""
+        adapter = app.url_map.bind('localhost')
+        budgeted = set(SETUP_ROUTES)
+        for method, url, _, _ in ROUTE_BUDGETS:
+            rule, _ = adapter.match(url.split('?')[0], method=method, return_rule=True)
+            budgeted.add((method, rule.rule))
+
+        missing = sorted(
+            (method, rule.rule)
+            for rule in app.url_map.iter_rules() if rule.endpoint != 'static'
+            for method in rule.methods - {'HEAD', 'OPTIONS'}
+            if (method, rule.rule) not in budgeted
+        )
+
+        assert missing == []
@@ -0,0 +1,123 @@
+import pytest
+import re
+from datetime import date
+from services.transaction_service import TransactionService
+from services.invoice_service import InvoiceService
+from services.accounting_service import AccountingService
+from services.count_service import CountService, count_cache
+from services.customer_service import CustomerService
+from services.user_service import UserService
+from models.user import db
+from utils.pagination import encode_cursor
+from utils.schema import ensure_indexes
+from sqlalchemy import event, text
+
+
+CURSOR = encode_cursor(date(2024, 2, 1), 3)
+
+# Service calls covering every filtered query shape. Unfiltered whole-table
+# aggregates (e.g. overall statistics) read every row by definition and are
+# not listed here.
+SERVICE_CALLS = {
+    'transactions_page': lambda: TransactionService.get_all_transactions(include_total=False),
+    'transactions_keyset': lambda: TransactionService.get_all_transactions(cursor=CURSOR),
+    'transactions_by_type': lambda: TransactionService.get_transactions_by_type('income'),
+    'transactions_by_type_keyset': lambda: TransactionService.get_transactions_by_type('income', cursor=CURSOR),
+    'transactions_by_invoice': lambda: TransactionService.get_transactions_by_invoice(1),
+    'invoices_page': lambda: InvoiceService.get_all_invoices(include_total=False),
+    'invoices_keyset': lambda: InvoiceService.get_all_invoices(cursor=CURSOR),
+    'invoices_by_status': lambda: InvoiceService.get_invoices_by_status('paid'),
+    'invoices_by_status_keyset': lambda: InvoiceService.get_invoices_by_status('paid', cursor=CURSOR),
+    'invoices_by_customer': lambda: InvoiceService.get_invoices_by_customer(1),
+    'financial_summary': lambda: AccountingService.get_financial_summary('2024-01-01', '2024-01-31'),
+    'monthly_report': lambda: AccountingService.get_monthly_report(2024, 1),
+    'cash_flow': lambda: AccountingService.get_cash_flow(start_date='2024-01-01', end_date='2024-01-31'),
+    'profit_loss': lambda: AccountingService.get_profit_loss_statement('2024-01-01', '2024-01-31'),
+    'customer_analysis': lambda: AccountingService.get_customer_analysis(1),
+    'search_text': lambda: TransactionService.search_transactions('income'),
+    'search_amount_range': lambda: TransactionService.search_transactions(amount_min=100.0, amount_max=900.0),
+    'search_types': lambda: TransactionService.search_transactions(types=['income', 'refund']),
+    'search_users': lambda: UserService.search_users('test'),
+    'search_customers': lambda: CustomerService.search_customers('customer')
+}
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+def capture_selects(call):
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+    
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = call()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    
+    return result, statements
+
+
+def full_table_scans(statement, parameters):
+    with db.engine.connect() as connection:
+        plan = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    
+    tables = set(db.metadata.tables)
+    scans = []
+    for row in plan:
+        match = FULL_SCAN.match(row[3])
+        if match and match.group(1) in tables:
+            scans.append(row[3])
+    return scans
+
+
+class TestQueryPlans:
+
+    @pytest.mark.parametrize('name', sorted(SERVICE_CALLS))
+    def test_service_query_uses_index(self, app, name):
+        """Test that no service query falls back to a full table scan"""
+        with app.app_context():
+            count_cache.invalidate()
+            
+            result, statements = capture_selects(SERVICE_CALLS[name])
+            
+            assert result['success'] is True
+            assert statements
+            for statement, parameters in statements:
+                assert full_table_scans(statement, parameters) == [], statement
+
+    def test_count_queries_use_index(self, app):
+        """Test that filtered counts are answered from an index"""
+        with app.app_context():
+            count_cache.invalidate()
+            
+            for call in (
+                lambda: CountService.count_transactions(type='expense'),
+                lambda: CountService.count_invoices(status='pending'),
+                lambda: CountService.count_invoices(customer_id=2)
+            ):
+                _, statements = capture_selects(call)
+                
+                assert len(statements) == 1
+                assert full_table_scans(*statements[0]) == []
+
+    def test_ensure_indexes_restores_missing(self, app):
+        """Test that ensure_indexes creates indexes missing from an existing database"""
+        with app.app_context():
+            with db.engine.begin() as connection:
+                connection.execute(text('DROP INDEX ix_invoices_status_date'))
+                connection.execute(text('DROP INDEX ix_transactions_type_date'))
+            
+            created = ensure_indexes(db.engine, db.metadata)
+            
+            assert created == ['ix_invoices_status_date', 'ix_transactions_type_date']
+            assert ensure_indexes(db.engine, db.metadata) == []
+
+    def test_ensure_indexes_command(self, app, runner):
+        """Test the ensure-indexes CLI command"""
+        result = runner.invoke(args=['accounting', 'ensure-indexes'])
+        
+        assert result.exit_code == 0
+        assert 'All indexes are present' in result.output
@@ -0,0 +1,111 @@
+import json
+import logging
+import pytest
+from models.customer import Customer
+from models.user import db
+from services.invoice_service import InvoiceService
+from utils.query_stats import LOGGER_NAME, QueryStats, assert_max_queries, server_timing, track_queries
+
+
+class TestQueryStats:
+
+    def test_track_queries(self, app):
+        """Test that statements, time and the slowest statement are recorded"""
+        with app.app_context():
+            with track_queries() as stats:
+                InvoiceService.get_invoice_statistics()
+
+            assert stats.count == 8
+            assert len(stats.statements) == 8
+            assert stats.total_time >= stats.slowest_time > 0
+            assert stats.slowest_statement in stats.statements
+
+    def test_nested_tracking(self, app):
+        """Test that an outer block also sees the statements of an inner one"""
+        with app.app_context():
+            with track_queries() as outer:
+                db.session.get(Customer, 1)
+                with track_queries() as inner:
+                    db.session.get(Customer, 2)
+
+            assert outer.count == 2
+            assert inner.count == 1
+
+    def test_repeated_statements(self, app):
+        """Test that a statement issued once per row is reported as repeated"""
+        with app.app_context():
+            with track_queries() as stats:
+                for customer_id in (1, 2, 1, 2, 1):
+                    db.session.expire_all()
+                    db.session.get(Customer, customer_id)
+
+            repeated = stats.repeated(5)
+            assert len(repeated) == 1
+            assert repeated[0]['count'] == 5
+            assert repeated[0]['statement'].startswith('SELECT customers.id')
+            assert stats.repeated(6) == []
+
+    def test_assert_max_queries(self, app):
+        """Test that exceeding a budget fails and lists the statements"""
+        with app.app_context():
+            with assert_max_queries(8):
+                InvoiceService.get_invoice_statistics()
+
+            with pytest.raises(AssertionError, match='Expected at most 2 queries, 8 were run') as error:
+                with assert_max_queries(2):
+                    InvoiceService.get_invoice_statistics()
+            assert '8. SELECT' in str(error.value)
+
+    def test_server_timing_value(self):
+        """Test the Server-Timing header format"""
+        stats = QueryStats()
+        assert server_timing(stats) == 'db;dur=0.00;desc="0 queries"'
+
+        stats.record('SELECT 1', 0.0015)
+        assert server_timing(stats, total_time=0.01) == (
+            'db;dur=1.50;desc="1 query", db-slowest;dur=1.50, total;dur=10.00'
+        )
+
+
+class TestRequestQueryStats:
+
+    def test_server_timing_header(self, client, auth_headers):
+        """Test that responses carry the statement count and database time"""
+        headers = auth_headers()
+
+        response = client.get('/api/invoices/statistics', headers=headers)
+
+        assert response.status_code == 200
+        timing = response.headers['Server-Timing']
+        assert timing.startswith('db;dur=')
+        assert 'desc="8 queries"' in timing
+        assert 'total;dur=' in timing
+
+    def test_request_log_record(self, client, auth_headers, caplog):
+        """Test that each request writes one JSON log line"""
+        headers = auth_headers()
+
+        with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+            client.get('/api/transactions/stats', headers=headers)
+
+        records = [json.loads(record.getMessage()) for record in caplog.records if record.name == LOGGER_NAME]
+        assert len(records) == 1
+        assert records[0]['method'] == 'GET'
+        assert records[0]['path'] == '/api/transactions/stats'
+        assert records[0]['status'] == 200
+        assert records[0]['queries'] == 3
+        assert records[0]['slowest'].startswith('SELECT')
+        assert records[0]['repeated'] == []
+        assert caplog.records[-1].levelno == logging.INFO
+
+    def test_repeated_statements_log_warning(self, app, client, auth_headers, caplog):
+        """Test that a request repeating a statement is logged as a warning"""
+        headers = auth_headers()
+        app.config['QUERY_REPEAT_THRESHOLD'] = 1
+
+        with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+            client.get('/api/transactions/1', headers=headers)
+
+        record = [record for record in caplog.records if record.name == LOGGER_NAME][-1]
+        assert record.levelno == logging.WARNING
+        assert json.loads(record.getMessage())['repeated'][0]['count'] == 1
@@ -0,0 +1,216 @@
+import os
+import pytest
+import tempfile
+from datetime import date, datetime, timedelta
+from flask import Flask
+from models.customer import Customer
+from models.invoice import Invoice
+from models.replication import ReplicationHeartbeat
+from models.transaction import Transaction
+from models.user import db
+from routes.accounting_routes import accounting_bp
+from services.accounting_service import AccountingService, dashboard_cache
+from services.count_service import CountService
+from services.replication_service import ReplicationService
+from services.transaction_service import TransactionService
+from sqlalchemy import text
+from utils.engine import init_engine
+from utils.replica import EXTENSION_KEY, HEARTBEAT_TABLE, current_target, init_replica, primary, read_only
+
+
+@pytest.fixture
+def replica_app():
+    primary_fd, primary_path = tempfile.mkstemp(suffix='.db')
+    replica_fd, replica_path = tempfile.mkstemp(suffix='.db')
+
+    app = Flask(__name__)
+    app.config.update({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{primary_path}',
+        'SQLALCHEMY_BINDS': {'replica': f'sqlite:///{replica_path}'},
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'SECRET_KEY': 'test-secret-key',
+        'REPLICA_MAX_LAG': 30,
+        'REPLICA_LAG_CHECK_INTERVAL': 0
+    })
+
+    init_engine(app, db)
+    init_replica(app, db)
+    app.register_blueprint(accounting_bp)
+
+    with app.app_context():
+        db.create_all()
+
+        customer = Customer(name='Replica Customer', address='1 Replica Road', phone='555-0100', email='replica@test.com')
+        db.session.add(customer)
+        db.session.commit()
+
+        invoice = Invoice(customer_id=customer.id, date=date(2024, 1, 15), total_amount=500.0, status='pending')
+        db.session.add(invoice)
+        db.session.commit()
+
+        db.session.add(Transaction(invoice_id=invoice.id, amount=100.0, date=date(2024, 1, 20), type='payment'))
+        db.session.commit()
+
+        assert ReplicationService.sync_sqlite_replica()['success'] is True
+
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+    for fd, path in ((primary_fd, primary_path), (replica_fd, replica_path)):
+        os.close(fd)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+
+def add_payment(amount: float) -> int:
+    result = TransactionService.create_transaction(1, amount, '2024-02-01', 'payment')
+    assert result['success'] is True
+    return result['transaction']['id']
+
+
+def listed_ids() -> set:
+    result = TransactionService.get_all_transactions(per_page=50, include_total=False)
+    assert result['success'] is True
+    return {transaction['id'] for transaction in result['transactions']}
+
+
+class TestReplicaRouting:
+
+    def test_read_only_calls_use_replica(self, replica_app):
+        """Test that reads see the replica's copy until it is synchronized"""
+        with replica_app.app_context():
+            new_id = add_payment(75.0)
+
+            assert new_id not in listed_ids()
+            assert TransactionService.get_transaction_by_id(new_id) is not None
+
+            assert ReplicationService.sync_sqlite_replica()['success'] is True
+            db.session.remove()
+
+            assert new_id in listed_ids()
+            assert replica_app.extensions[EXTENSION_KEY].stats()['replica_reads'] > 0
+
+    def test_writes_go_to_primary(self, replica_app):
+        """Test that writes never reach the replica file directly"""
+        with replica_app.app_context():
+            new_id = add_payment(80.0)
+
+            with db.engines['replica'].connect() as connection:
+                assert connection.execute(
+                    text('SELECT count(*) FROM transactions WHERE id = :id'), {'id': new_id}
+                ).scalar() == 0
+            with db.engine.connect() as connection:
+                assert connection.execute(
+                    text('SELECT count(*) FROM transactions WHERE id = :id'), {'id': new_id}
+                ).scalar() == 1
+
+    def test_lagging_replica_falls_back_to_primary(self, replica_app):
+        """Test that a replica behind the lag tolerance is skipped"""
+        with replica_app.app_context():
+            new_id = add_payment(90.0)
+
+            stale = datetime.utcnow() - timedelta(seconds=120)
+            with db.engines['replica'].begin() as connection:
+                connection.execute(text(f'UPDATE {HEARTBEAT_TABLE} SET beat_at = :beat_at'), {'beat_at': stale})
+
+            assert new_id in listed_ids()
+
+            status = ReplicationService.get_replica_status()
+            assert status['within_tolerance'] is False
+            assert status['lag'] >= 120
+            assert status['routing']['primary_fallbacks'] > 0
+
+    def test_replica_without_heartbeat_is_not_used(self, replica_app):
+        """Test that a replica that was never synchronized is not read"""
+        with replica_app.app_context():
+            with db.engines['replica'].begin() as connection:
+                connection.execute(text(f'DELETE FROM {HEARTBEAT_TABLE}'))
+
+            new_id = add_payment(95.0)
+
+            assert new_id in listed_ids()
+            assert ReplicationService.get_replica_status()['lag'] is None
+
+    def test_reads_own_uncommitted_writes(self, replica_app):
+        """Test that reads after a write in the same transaction use the primary"""
+        with replica_app.app_context():
+            transaction = Transaction(invoice_id=1, amount=60.0, date=date(2024, 2, 2), type='payment')
+            db.session.add(transaction)
+            db.session.flush()
+
+            assert transaction.id in listed_ids()
+
+            db.session.rollback()
+
+    def test_generator_routes_each_step(self, replica_app):
+        """Test that a read_only generator does not leak its target to the caller"""
+        with replica_app.app_context():
+            rows = TransactionService.iter_transactions(batch_size=1)
+
+            assert next(rows)['id'] == 1
+            assert current_target() == 'primary'
+            assert list(rows) == []
+
+    def test_primary_pins_read_only_calls(self):
+        """Test that primary overrides read_only in the calls it makes"""
+        @read_only
+        def target():
+            return current_target()
+
+        assert current_target() == 'primary'
+        assert target() == 'replica'
+        assert primary(target)() == 'primary'
+
+    def test_counts_come_from_primary(self, replica_app):
+        """Test that cached counts are never computed on the replica"""
+        with replica_app.app_context():
+            add_payment(70.0)
+
+            assert CountService.count_transactions() == 2
+            assert read_only(CountService.count_transactions)() == 2
+
+    def test_dashboard_comes_from_primary(self, replica_app):
+        """Test that the cached dashboard is never computed on the replica"""
+        with replica_app.app_context():
+            dashboard_cache.invalidate()
+            add_payment(70.0)
+
+            result = AccountingService.get_dashboard()
+
+            assert result['success'] is True
+            assert result['dashboard']['transaction_summary']['payment']['count'] == 2
+
+    def test_heartbeat_is_written_on_primary(self, replica_app):
+        """Test that the heartbeat row is created and then updated"""
+        with replica_app.app_context():
+            beat_at = datetime(2024, 5, 1, 12, 0, 0)
+            with db.engine.begin() as connection:
+                ReplicationService.write_heartbeat(connection, now=beat_at)
+
+            assert db.session.get(ReplicationHeartbeat, 1).beat_at == beat_at
+
+    def test_sync_replica_command(self, replica_app):
+        """Test the sync-replica CLI command"""
+        with replica_app.app_context():
+            new_id = add_payment(65.0)
+
+        result = replica_app.test_cli_runner().invoke(args=['accounting', 'sync-replica'])
+
+        assert result.exit_code == 0
+        assert 'Replica synchronized' in result.output
+        with replica_app.app_context():
+            assert new_id in listed_ids()
+
+    def test_no_replica_configured(self, app):
+        """Test that without a replica bind everything reads the primary"""
+        with app.app_context():
+            assert init_replica(app, db) is None
+            assert ReplicationService.get_replica_status() == {'success': True, 'configured': False}
+            assert ReplicationService.sync_sqlite_replica()['success'] is False
+            assert TransactionService.get_all_transactions()['total'] == 4
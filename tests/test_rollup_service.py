@@ -0,0 +1,214 @@
+import pytest
+from datetime import date
+from services.rollup_service import RollupService
+from services.transaction_service import TransactionService
+from services.accounting_service import AccountingService
+from models.daily_rollup import DailyRollup
+from models.transaction import Transaction
+from models.user import db
+from sqlalchemy import event
+
+
+def rollup_for(day, transaction_type):
+    return db.session.get(DailyRollup, (day, transaction_type))
+
+
+class TestRollupService:
+
+    def test_seed_data_is_rolled_up(self, app):
+        """Test that transactions added through the session are rolled up"""
+        with app.app_context():
+            rollup = rollup_for(date(2024, 1, 15), 'income')
+            
+            assert rollup is not None
+            assert rollup.total_amount == 1000.0
+            assert rollup.transaction_count == 1
+
+    def test_create_transaction_updates_rollup(self, app):
+        """Test that creating a transaction adds to the day's rollup"""
+        with app.app_context():
+            result = TransactionService.create_transaction(
+                invoice_id=1,
+                amount=250.0,
+                date='2024-01-15',
+                type='income'
+            )
+            
+            assert result['success'] is True
+            rollup = rollup_for(date(2024, 1, 15), 'income')
+            assert rollup.total_amount == 1250.0
+            assert rollup.transaction_count == 2
+
+    def test_update_transaction_moves_rollup(self, app):
+        """Test that changing date, type and amount moves the totals"""
+        with app.app_context():
+            transaction = Transaction.query.filter_by(date=date(2024, 1, 16)).first()
+            
+            result = TransactionService.update_transaction(
+                transaction.id,
+                amount=700.0,
+                date='2024-01-17',
+                type='income'
+            )
+            
+            assert result['success'] is True
+            old_rollup = rollup_for(date(2024, 1, 16), 'expense')
+            new_rollup = rollup_for(date(2024, 1, 17), 'income')
+            assert old_rollup.total_amount == 0.0
+            assert old_rollup.transaction_count == 0
+            assert new_rollup.total_amount == 700.0
+            assert new_rollup.transaction_count == 1
+
+    def test_update_transaction_amount_only(self, app):
+        """Test that changing only the amount adjusts the rollup by the difference"""
+        with app.app_context():
+            transaction = Transaction.query.filter_by(date=date(2024, 1, 16)).first()
+            
+            TransactionService.update_transaction(transaction.id, amount=650.0)
+            
+            rollup = rollup_for(date(2024, 1, 16), 'expense')
+            assert rollup.total_amount == 650.0
+            assert rollup.transaction_count == 1
+
+    def test_delete_transaction_updates_rollup(self, app):
+        """Test that deleting a transaction subtracts it from the rollup"""
+        with app.app_context():
+            transaction = Transaction.query.filter_by(date=date(2024, 1, 25)).first()
+            
+            result = TransactionService.delete_transaction(transaction.id)
+            
+            assert result['success'] is True
+            rollup = rollup_for(date(2024, 1, 25), 'expense')
+            assert rollup.total_amount == 0.0
+            assert rollup.transaction_count == 0
+            
+            summary = AccountingService.get_financial_summary('2024-01-01', '2024-01-31')
+            assert summary['summary']['total_expense'] == 500.0
+            assert summary['summary']['expense_transactions'] == 1
+
+    def test_failed_write_leaves_rollup_untouched(self, app):
+        """Test that rolled back writes do not change the rollups"""
+        with app.app_context():
+            result = TransactionService.create_transaction(
+                invoice_id=999,
+                amount=250.0,
+                date='2024-01-15',
+                type='income'
+            )
+            
+            assert result['success'] is False
+            
+            db.session.add(Transaction(
+                invoice_id=1,
+                amount=100.0,
+                date=date(2024, 1, 15),
+                type='income'
+            ))
+            db.session.flush()
+            db.session.rollback()
+            
+            rollup = rollup_for(date(2024, 1, 15), 'income')
+            assert rollup.total_amount == 1000.0
+            assert rollup.transaction_count == 1
+
+    def test_get_period_aggregate(self, app):
+        """Test the ungrouped period aggregate"""
+        with app.app_context():
+            aggregate = RollupService.get_period_aggregate(date(2024, 1, 1), date(2024, 1, 31))
+            
+            assert aggregate == {
+                'total_income': 1000.0,
+                'total_expense': 800.0,
+                'income_count': 1,
+                'expense_count': 2,
+                'total_amount': 1800.0,
+                'transaction_count': 3
+            }
+
+    def test_get_period_aggregate_empty_period(self, app):
+        """Test the period aggregate for a period without transactions"""
+        with app.app_context():
+            aggregate = RollupService.get_period_aggregate(date(2025, 1, 1), date(2025, 1, 31))
+            
+            assert aggregate == RollupService.empty_aggregate()
+
+    def test_get_period_aggregate_grouped(self, app):
+        """Test the period aggregate grouped by date, month and year_month"""
+        with app.app_context():
+            by_month = RollupService.get_period_aggregate(group_by='month')
+            by_year_month = RollupService.get_period_aggregate(group_by='year_month')
+            by_date = RollupService.get_period_aggregate(date(2024, 1, 1), date(2024, 1, 31), group_by='date')
+            
+            assert list(by_month.keys()) == [1, 2]
+            assert by_month[2]['total_income'] == 1500.0
+            assert list(by_year_month.keys()) == ['2024-01', '2024-02']
+            assert by_year_month['2024-01']['expense_count'] == 2
+            assert list(by_date.keys()) == [date(2024, 1, 15), date(2024, 1, 16), date(2024, 1, 25)]
+            assert by_date[date(2024, 1, 16)]['total_expense'] == 500.0
+
+    def test_financial_summary_single_statement(self, app):
+        """Test that the financial summary is answered in one round trip"""
+        with app.app_context():
+            statements = []
+            
+            def record(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+            
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                result = AccountingService.get_financial_summary('2024-01-01', '2024-12-31')
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+            
+            assert result['success'] is True
+            assert len(statements) == 1
+
+    def test_profit_loss_single_statement(self, app):
+        """Test that the profit and loss statement is answered in one round trip"""
+        with app.app_context():
+            statements = []
+            
+            def record(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+            
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                result = AccountingService.get_profit_loss_statement('2024-01-01', '2024-12-31')
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+            
+            assert result['success'] is True
+            assert result['profit_loss']['revenue']['invoice_count'] == 2
+            assert result['profit_loss']['expenses']['expense_count'] == 2
+            assert len(statements) == 1
+    
+    def test_rebuild_daily_rollups(self, app):
+        """Test rebuilding the rollups from the transactions table"""
+        with app.app_context():
+            db.session.query(DailyRollup).delete()
+            db.session.commit()
+            
+            result = RollupService.rebuild_daily_rollups()
+            
+            assert result['success'] is True
+            assert result['rollup_count'] == 4
+            
+            summary = AccountingService.get_financial_summary()
+            assert summary['summary']['total_income'] == 2500.0
+            assert summary['summary']['total_expense'] == 800.0
+            assert summary['summary']['income_transactions'] == 2
+            assert summary['summary']['expense_transactions'] == 2
+
+    def test_rebuild_rollups_command(self, app, runner):
+        """Test the rebuild-rollups CLI command"""
+        with app.app_context():
+            db.session.query(DailyRollup).delete()
+            db.session.commit()
+        
+        result = runner.invoke(args=['accounting', 'rebuild-rollups'])
+        
+        assert result.exit_code == 0
+        assert 'Daily rollups rebuilt (4 rows)' in result.output
+        
+        with app.app_context():
+            assert rollup_for(date(2024, 2, 10), 'income').total_amount == 1500.0
@@ -0,0 +1,184 @@
+import pytest
+from models.customer import Customer
+from models.search import customer_search, user_search
+from models.user import User, db
+from services.customer_service import CustomerService
+from services.user_service import UserService
+from sqlalchemy import insert, text
+
+
+def add_customer(name, email, phone='555-1000', address='1 Main Street'):
+    customer = Customer(name=name, address=address, phone=phone, email=email)
+    db.session.add(customer)
+    db.session.commit()
+    return customer
+
+
+def customer_names(query, **kwargs):
+    result = CustomerService.search_customers(query, **kwargs)
+    assert result['success'] is True
+    return [customer['name'] for customer in result['customers']]
+
+
+class TestSearchIndex:
+
+    def test_customer_search_follows_writes(self, app):
+        """Test that inserts, updates, deletes and bulk inserts reach the index"""
+        with app.app_context():
+            customer = add_customer('Acme Widgets', 'sales@acme.com')
+            assert customer_names('acme') == ['Acme Widgets']
+            
+            customer.name = 'Globex Corporation'
+            db.session.commit()
+            assert customer_names('globex') == ['Globex Corporation']
+            assert customer_names('widgets') == []
+            
+            db.session.delete(customer)
+            db.session.commit()
+            assert customer_names('globex') == []
+            
+            db.session.execute(insert(Customer), [
+                {'name': 'Initech', 'address': 'Austin', 'phone': '555-2000', 'email': 'info@initech.com'}
+            ])
+            db.session.commit()
+            assert customer_names('initech') == ['Initech']
+
+    def test_prefix_and_full_modes(self, app):
+        """Test that prefix mode completes words and full mode does not"""
+        with app.app_context():
+            add_customer('Northwind Traders', 'orders@northwind.com')
+            
+            assert customer_names('north trad') == ['Northwind Traders']
+            assert customer_names('north', mode='full') == []
+            assert customer_names('northwind traders', mode='full') == ['Northwind Traders']
+            
+            result = CustomerService.search_customers('north', mode='fuzzy')
+            assert result['success'] is False
+            assert 'prefix, full' in result['message']
+
+    def test_ranking_prefers_name_matches(self, app):
+        """Test that bm25 weights rank name matches above address matches"""
+        with app.app_context():
+            add_customer('Harbor Supplies', 'hello@supplies.com', address='9 Harbor Road')
+            add_customer('Quay Traders', 'quay@traders.com', address='1 Harbor Road')
+            add_customer('Harbor Harbor Fish', 'fish@harbor.com')
+            
+            names = customer_names('harbor')
+            
+            assert names[-1] == 'Quay Traders'
+            assert set(names[:2]) == {'Harbor Supplies', 'Harbor Harbor Fish'}
+
+    def test_customer_search_pagination(self, app):
+        """Test totals and pages of customer search"""
+        with app.app_context():
+            result = CustomerService.search_customers('test', page=2, per_page=1)
+            
+            assert result['total'] == 2
+            assert result['pages'] == 2
+            assert [customer['name'] for customer in result['customers']] == ['Test Customer 2']
+
+    @pytest.mark.parametrize('per_page', [0, -1, -5])
+    def test_search_non_positive_per_page(self, app, per_page):
+        """Test that a per_page below 1 falls back to the default page size"""
+        with app.app_context():
+            customers = CustomerService.search_customers('test', per_page=per_page)
+            users = UserService.search_users('test', per_page=per_page)
+            
+            for result, key in ((customers, 'customers'), (users, 'users')):
+                assert result['success'] is True
+                assert len(result[key]) == result['total'] == 2
+                assert result['pages'] == 1
+                assert result['per_page'] == 20
+
+    def test_user_search_ranked(self, app):
+        """Test that users match on name and email words, name first"""
+        with app.app_context():
+            UserService.create_user('Mary Major', 'contact@example.com', 'password')
+            UserService.create_user('Someone Else', 'mary@example.com', 'password')
+            
+            result = UserService.search_users('mary')
+            
+            assert result['total'] == 2
+            assert [user['fullname'] for user in result['users']] == ['Mary Major', 'Someone Else']
+            assert result['mode'] == 'prefix'
+
+    def test_user_autocomplete(self, app):
+        """Test user suggestions for a partial word"""
+        with app.app_context():
+            result = UserService.autocomplete_users('adm')
+            
+            assert result['success'] is True
+            assert result['suggestions'] == [
+                {'id': 1, 'fullname': 'Test Admin', 'email': 'admin@test.com'}
+            ]
+            assert UserService.autocomplete_users('')['suggestions'] == []
+
+    def test_like_fallback_without_fts(self, app, monkeypatch):
+        """Test that the LIKE fallback loads model instances or plain rows"""
+        monkeypatch.setattr('models.search.search_index_supported', lambda connection: False)
+        with app.app_context():
+            add_customer('Acme Widgets', 'sales@acme.com')
+            
+            customers, total = customer_search.search(db.session, Customer, 'acme wid')
+            rows, _ = customer_search.search(db.session, Customer, 'acme', columns=[Customer.id, Customer.name])
+            
+            assert total == 1
+            assert isinstance(customers[0], Customer)
+            assert customers[0].name == 'Acme Widgets'
+            assert [tuple(row) for row in rows] == [(customers[0].id, 'Acme Widgets')]
+
+    def test_install_indexes_on_existing_database(self, app):
+        """Test that missing user and customer indexes are created and populated"""
+        with app.app_context():
+            with db.engine.begin() as connection:
+                connection.execute(text('DROP TABLE users_fts'))
+                connection.execute(text('DROP TABLE customers_fts'))
+                for suffix in ('ai', 'ad', 'au'):
+                    connection.execute(text(f'DROP TRIGGER users_fts_{suffix}'))
+                    connection.execute(text(f'DROP TRIGGER customers_fts_{suffix}'))
+                
+                assert user_search.install(connection) is True
+                assert customer_search.install(connection) is True
+            
+            assert customer_names('customer') == ['Test Customer 1', 'Test Customer 2']
+            assert UserService.search_users('admin')['total'] == 1
+
+    def test_customer_search_route(self, client, auth_headers):
+        """Test the customer search and autocomplete endpoints"""
+        headers = auth_headers()
+        
+        response = client.get('/api/customers/search?q=customer%201', headers=headers)
+        assert response.status_code == 200
+        assert [c['name'] for c in response.get_json()['customers']] == ['Test Customer 1']
+        
+        response = client.get('/api/customers/autocomplete?q=cust', headers=headers)
+        assert response.status_code == 200
+        assert len(response.get_json()['suggestions']) == 2
+        
+        response = client.get('/api/customers/search', headers=headers)
+        assert response.status_code == 400
+        
+        response = client.get('/api/customers/search?q=test&mode=fuzzy', headers=headers)
+        assert response.status_code == 400
+        
+        response = client.get('/api/customers/search?q=test')
+        assert response.status_code == 401
+
+    def test_user_autocomplete_route(self, client, admin_headers, auth_headers):
+        """Test that user autocomplete is admin only"""
+        response = client.get('/api/users/autocomplete?q=test', headers=auth_headers())
+        assert response.status_code == 403
+        
+        response = client.get('/api/users/autocomplete?q=test', headers=admin_headers())
+        assert response.status_code == 200
+        assert len(response.get_json()['suggestions']) == 2
+        
+        response = client.get('/api/users/autocomplete?q=test&limit=-1', headers=admin_headers())
+        assert len(response.get_json()['suggestions']) == 1
+
+    def test_autocomplete_limit_is_bounded(self, client, auth_headers):
+        """Test that a limit below 1 still returns at most one suggestion"""
+        for limit in (0, -1):
+            response = client.get(f'/api/customers/autocomplete?q=cust&limit={limit}', headers=auth_headers())
+            assert response.status_code == 200
+            assert len(response.get_json()['suggestions']) == 1
@@ -0,0 +1,169 @@
+import json
+import pytest
+from datetime import date
+from models.customer import Customer
+from models.invoice import Invoice
+from models.serialization import customer_rows, invoice_rows, transaction_rows, user_rows
+from models.transaction import Transaction
+from models.user import User, db
+from services.accounting_service import AccountingService
+from services.invoice_service import InvoiceService
+from services.transaction_service import TransactionService
+from services.user_service import UserService
+from sqlalchemy import event
+from utils.pagination import offset_page
+
+
+def dumps(value):
+    return json.dumps(value, sort_keys=False)
+
+
+class TestRowSerializer:
+
+    @pytest.mark.parametrize('serializer, model', [
+        (transaction_rows, Transaction),
+        (invoice_rows, Invoice),
+        (customer_rows, Customer),
+        (user_rows, User)
+    ])
+    def test_matches_to_dict(self, app, serializer, model):
+        """Test that every row serializes byte for byte like to_dict"""
+        with app.app_context():
+            objects = model.query.order_by(model.id).all()
+            rows = db.session.execute(serializer.select().order_by(model.__table__.c.id)).all()
+
+            assert len(rows) == len(objects) > 0
+            assert dumps(serializer.serialize_all(rows)) == dumps([obj.to_dict() for obj in objects])
+
+    def test_missing_dates(self, app):
+        """Test that NULL dates serialize as None like to_dict"""
+        with app.app_context():
+            transaction = db.session.get(Transaction, 1)
+            transaction.date = None
+            db.session.commit()
+
+            row = db.session.execute(transaction_rows.select().where(Transaction.id == 1)).one()
+
+            assert transaction_rows(row)['date'] is None
+            assert dumps(transaction_rows(row)) == dumps(db.session.get(Transaction, 1).to_dict())
+
+    def test_does_not_load_instances(self, app):
+        """Test that list endpoints no longer fill the identity map"""
+        with app.app_context():
+            db.session.remove()
+
+            TransactionService.get_all_transactions(per_page=50)
+            InvoiceService.get_all_invoices(per_page=50)
+
+            assert len(db.session.identity_map) == 0
+
+
+class TestListOutput:
+
+    def test_transaction_listings(self, app):
+        """Test that transaction listings match the ORM output"""
+        with app.app_context():
+            expected = [t.to_dict() for t in Transaction.query.order_by(Transaction.date.desc()).all()]
+
+            assert dumps(TransactionService.get_all_transactions(per_page=50)['transactions']) == dumps(expected)
+            assert dumps(TransactionService.get_all_transactions(cursor='', per_page=50)['transactions']) == dumps(
+                [t.to_dict() for t in Transaction.query.order_by(Transaction.date.desc(), Transaction.id.desc()).all()]
+            )
+            assert dumps(TransactionService.get_transactions_by_type('income')['transactions']) == dumps(
+                [t for t in expected if t['type'] == 'income']
+            )
+            assert dumps(TransactionService.get_transactions_by_invoice(1)['transactions']) == dumps(
+                [t for t in expected if t['invoice_id'] == 1]
+            )
+            assert dumps(list(TransactionService.iter_transactions(batch_size=2))) == dumps(
+                [t.to_dict() for t in Transaction.query.order_by(Transaction.date, Transaction.id).all()]
+            )
+
+    def test_invoice_listings(self, app):
+        """Test that invoice listings match the ORM output"""
+        with app.app_context():
+            expected = [i.to_dict() for i in Invoice.query.order_by(Invoice.date.desc()).all()]
+
+            assert dumps(InvoiceService.get_all_invoices(per_page=50)['invoices']) == dumps(expected)
+            assert dumps(InvoiceService.get_invoices_by_status('paid')['invoices']) == dumps(
+                [i for i in expected if i['status'] == 'paid']
+            )
+            assert dumps(InvoiceService.get_invoices_by_customer(1)['invoices']) == dumps(
+                [i for i in expected if i['customer_id'] == 1]
+            )
+            assert dumps(list(InvoiceService.iter_invoices())) == dumps(
+                [i.to_dict() for i in Invoice.query.order_by(Invoice.date, Invoice.id).all()]
+            )
+
+    def test_user_and_customer_listings(self, app):
+        """Test that user listings and searches match the ORM output"""
+        with app.app_context():
+            result = UserService.get_all_users()
+
+            assert dumps(result['users']) == dumps([u.to_dict() for u in User.query.all()])
+            assert dumps(UserService.search_users('admin')['users']) == dumps(
+                [User.query.filter_by(email='admin@test.com').one().to_dict()]
+            )
+
+    def test_reports(self, app):
+        """Test that report listings match the ORM output"""
+        with app.app_context():
+            report = AccountingService.get_monthly_report(2024, 1)['report']
+            january = Transaction.query.filter(Transaction.date >= date(2024, 1, 1), Transaction.date <= date(2024, 1, 31))
+
+            assert dumps(report['transactions']) == dumps([t.to_dict() for t in january.all()])
+
+            analysis = AccountingService.get_customer_analysis()['analysis']
+            assert [c['customer'] for c in analysis['customers']] == [c.to_dict() for c in Customer.query.order_by(Customer.id)]
+
+            analysis = AccountingService.get_customer_analysis(1)['analysis']
+            assert analysis['invoices'] == [i.to_dict() for i in Invoice.query.filter_by(customer_id=1).all()]
+            assert analysis['invoice_summary']['total_amount'] == 2500.0
+
+    @pytest.mark.parametrize('page, per_page', [(1, 2), (2, 2), (3, 2), (9, 2), (0, 3), (1, 0), (-1, -5)])
+    def test_select_pagination_matches_query_pagination(self, app, page, per_page):
+        """Test that a Core select paginates like Flask-SQLAlchemy paginates a query"""
+        with app.app_context():
+            query = Transaction.query.order_by(Transaction.date.desc())
+            statement = transaction_rows.select().order_by(Transaction.date.desc())
+
+            objects, expected = offset_page(query, page, per_page)
+            rows, pagination = offset_page(statement, page, per_page, session=db.session)
+
+            assert pagination == expected
+            assert transaction_rows.serialize_all(rows) == [t.to_dict() for t in objects]
+
+    @pytest.mark.parametrize('page, per_page', [(1, 2), (0, 3), (1, 0), (-1, -5)])
+    def test_pagination_without_total_matches_paginate(self, app, page, per_page):
+        """Test that pages without totals apply paginate's page and per_page fallbacks"""
+        with app.app_context():
+            db.session.add_all([
+                Transaction(invoice_id=1, amount=float(i), date=date(2024, 2, 1), type='payment') for i in range(30)
+            ])
+            db.session.commit()
+            query = Transaction.query.order_by(Transaction.date.desc(), Transaction.id.desc())
+
+            expected, _ = offset_page(query, page, per_page)
+            objects, pagination = offset_page(query, page, per_page, include_total=False)
+            statement = transaction_rows.select().order_by(Transaction.date.desc(), Transaction.id.desc())
+            rows, _ = offset_page(statement, page, per_page, include_total=False, session=db.session)
+
+            assert objects == expected
+            assert [row.id for row in rows] == [t.id for t in expected]
+            assert pagination['has_next'] is True
+
+    def test_list_query_selects_only_listed_columns(self, app):
+        """Test that a listing issues a plain column select"""
+        with app.app_context():
+            statements = []
+
+            def record(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                UserService.get_all_users()
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+
+            assert not any('password' in statement for statement in statements)
@@ -769,6 +769,49 @@ class TestInvoiceService:
             
             assert stats['total_invoices'] >= 4
             assert stats['paid_amount'] >= 2000
+    
+    def test_create_invoices_bulk(self, app):
+        """Test bulk invoice creation with per-row errors"""
+        with app.app_context():
+            result = InvoiceService.create_invoices_bulk([
+                {'customer_id': 1, 'date': '2024-03-31', 'total_amount': 100.0},
+                {'customer_id': 99, 'date': '2024-03-31', 'total_amount': 200.0},
+                {'customer_id': 2, 'date': '2024-03-31', 'total_amount': 300.0, 'status': 'paid'},
+                {'customer_id': 2, 'date': '2024-03-31', 'total_amount': 300.0, 'status': 'unknown'}
+            ], chunk_size=1)
+            
+            assert result['success'] is True
+            assert result['created_count'] == 3
+            assert [error['index'] for error in result['errors']] == [1]
+            
+            created = Invoice.query.filter_by(date=date(2024, 3, 31)).order_by(Invoice.id).all()
+            assert [invoice.status for invoice in created] == ['pending', 'paid', 'pending']
+            assert all(invoice.created_at is not None for invoice in created)
+    
+    def test_update_invoice_status_bulk(self, app):
+        """Test bulk status transitions keep counts and reports consistent"""
+        with app.app_context():
+            assert InvoiceService.get_invoices_by_status('paid')['total'] == 2
+            
+            result = InvoiceService.update_invoice_status_bulk([2, 2, 3, 999], 'paid', chunk_size=1)
+            
+            assert result['success'] is True
+            assert result['requested_count'] == 3
+            assert result['updated_count'] == 2
+            assert result['missing_count'] == 1
+            assert db.session.get(Invoice, 2).status == 'paid'
+            assert InvoiceService.get_invoices_by_status('paid')['total'] == 3
+            
+            profit_loss = AccountingService.get_profit_loss_statement('2024-01-01', '2024-12-31')
+            assert profit_loss['profit_loss']['revenue']['total_revenue'] == 4500.0
+    
+    def test_update_invoice_status_bulk_invalid_status(self, app):
+        """Test that bulk status updates reject unknown statuses"""
+        with app.app_context():
+            result = InvoiceService.update_invoice_status_bulk([1], 'archived')
+            
+            assert result['success'] is False
+            assert db.session.get(Invoice, 1).status == 'paid'
 
 
 class TestTransactionService:
@@ -1274,4 +1317,43 @@ class TestTransactionService:
             assert result['success'] is True
             assert 'transactions' in result
             assert result['query'] == "payment"
-            assert len(result['transactions']) >= 1
\ No newline at end of file
+            assert len(result['transactions']) >= 1
+    
+    def test_create_transactions_bulk(self, app):
+        """Test bulk creation with per-row errors"""
+        with app.app_context():
+            rows = [
+                {'invoice_id': 1, 'amount': 100.0, 'date': '2024-03-01', 'type': 'income'},
+                {'invoice_id': 999, 'amount': 50.0, 'date': '2024-03-01', 'type': 'income'},
+                {'invoice_id': 2, 'amount': 25.0, 'date': '2024-03-01', 'type': 'expense'},
+                {'invoice_id': 1, 'amount': 'abc', 'date': '2024-03-01', 'type': 'income'},
+                {'invoice_id': 1, 'amount': 10.0, 'date': '01/03/2024', 'type': 'income'},
+                {'invoice_id': 3, 'amount': 75.0, 'date': '2024-03-02', 'type': 'income'},
+                {'invoice_id': 1, 'date': '2024-03-01', 'type': 'income'}
+            ]
+            
+            result = TransactionService.create_transactions_bulk(rows, chunk_size=2)
+            
+            assert result['success'] is True
+            assert result['created_count'] == 3
+            assert result['error_count'] == 4
+            assert [error['index'] for error in result['errors']] == [1, 3, 4, 6]
+            assert result['errors'][0]['message'] == 'Invoice not found'
+            assert Transaction.query.filter(Transaction.date >= date(2024, 3, 1)).count() == 3
+            
+            summary = AccountingService.get_financial_summary('2024-03-01', '2024-03-31')
+            assert summary['summary']['total_income'] == 175.0
+            assert summary['summary']['total_expense'] == 25.0
+    
+    def test_create_transactions_bulk_all_invalid(self, app):
+        """Test that a batch without valid rows creates nothing"""
+        with app.app_context():
+            result = TransactionService.create_transactions_bulk([
+                {'invoice_id': 999, 'amount': 10.0, 'date': '2024-03-01', 'type': 'income'}
+            ])
+            
+            assert result['success'] is False
+            assert result['created_count'] == 0
+            assert result['error_count'] == 1
+            assert Transaction.query.count() == 4
+
@@ -0,0 +1,168 @@
+import json
+import logging
+from datetime import date
+from models.customer import Customer
+from models.user import User, db
+from services.accounting_service import AccountingService
+from services.user_service import UserService
+from sqlalchemy import text
+from utils.slow_queries import EXTENSION_KEY, LOGGER_NAME, REDACTED, SlowQueryLog, init_slow_query_log, redact
+
+
+def slow_log(app, threshold_ms=0):
+    log = app.extensions[EXTENSION_KEY]
+    log.threshold_ms = threshold_ms
+    log.clear()
+    return log
+
+
+class TestSlowQueryLog:
+
+    def test_fast_statements_are_not_recorded(self, app):
+        """Test that statements under the threshold are ignored"""
+        with app.app_context():
+            log = slow_log(app, threshold_ms=10000)
+
+            AccountingService.get_monthly_report(2024, 1)
+
+            assert log.entries() == []
+
+    def test_records_caller_parameters_and_plan(self, app):
+        """Test that an entry names the service method and carries the plan"""
+        with app.app_context():
+            log = slow_log(app)
+
+            AccountingService.get_monthly_report(2024, 1)
+
+            entries = log.entries()
+            assert entries
+            entry = next(e for e in entries if 'FROM transactions' in e['statement'])
+            assert entry['caller'] == 'services.accounting_service:AccountingService.get_monthly_report'
+            assert entry['bind'] == 'default'
+            assert entry['duration_ms'] >= 0
+            assert '2024-01-01' in entry['parameters'].values()
+            assert entry['plan'] and all(isinstance(step, str) for step in entry['plan'])
+
+    def test_parameters_are_redacted(self, app):
+        """Test that text values such as e-mail addresses never reach the log"""
+        with app.app_context():
+            log = slow_log(app)
+
+            User.query.filter(User.email == 'admin@test.com', User.id > 0).first()
+
+            entry = log.entries()[0]
+            assert 'admin@test.com' not in json.dumps(entry)
+            assert REDACTED in entry['parameters'].values()
+            assert 0 in entry['parameters'].values()
+
+    def test_redact(self):
+        """Test which parameter values are kept"""
+        assert redact(42) == 42
+        assert redact(12.5) == 12.5
+        assert redact(None) is None
+        assert redact(date(2024, 1, 31)) == '2024-01-31'
+        assert redact('2024-01-31') == '2024-01-31'
+        assert redact('2024-01-31 10:15:00.000000') == '2024-01-31 10:15:00.000000'
+        assert redact('secret@example.com') == REDACTED
+        assert redact(b'\x00\x01') == REDACTED
+
+    def test_writes_are_recorded_without_breaking_them(self, app):
+        """Test that writes and executemany batches are recorded and still applied"""
+        with app.app_context():
+            log = slow_log(app)
+
+            db.session.add_all([
+                Customer(name=f'Slow {i}', address='Street', phone='555', email=f'slow{i}@test.com')
+                for i in range(3)
+            ])
+            db.session.commit()
+
+            assert Customer.query.filter(Customer.name.like('Slow %')).count() == 3
+            inserts = [e for e in log.entries() if e['statement'].startswith('INSERT INTO customers')]
+            assert inserts
+            assert all(e['plan'] is None for e in inserts)
+
+    def test_ring_buffer_is_bounded(self, app):
+        """Test that only the newest entries are kept"""
+        with app.app_context():
+            log = slow_log(app)
+            log._entries = type(log._entries)(maxlen=3)
+
+            for value in range(10):
+                db.session.execute(text('SELECT :value'), {'value': value})
+
+            entries = log.entries()
+            assert len(entries) == 3
+            assert [e['parameters']['value'] for e in entries] == [9, 8, 7]
+            assert log.recorded >= 10
+            assert len(log.entries(limit=1)) == 1
+
+    def test_log_line(self, app, caplog):
+        """Test that each slow statement is logged as JSON at WARNING"""
+        with app.app_context():
+            slow_log(app)
+
+            with caplog.at_level(logging.WARNING, logger=LOGGER_NAME):
+                UserService.get_all_users()
+
+            records = [r for r in caplog.records if r.name == LOGGER_NAME]
+            assert records
+            assert json.loads(records[0].getMessage())['caller'] == 'services.user_service:UserService.get_all_users'
+
+    def test_explain_can_be_turned_off(self, app):
+        """Test that no plan is captured when explain is off"""
+        with app.app_context():
+            log = slow_log(app)
+            log.explain = False
+
+            UserService.get_all_users()
+
+            assert log.entries()[0]['plan'] is None
+
+    def test_disabled_by_size(self, app):
+        """Test that a log size of 0 turns the log off"""
+        app.config['SLOW_QUERY_LOG_SIZE'] = 0
+
+        assert init_slow_query_log(app, db) is None
+        assert EXTENSION_KEY not in app.extensions
+
+    def test_defaults(self):
+        """Test the default threshold, size and plan capture"""
+        log = SlowQueryLog()
+
+        assert (log.threshold_ms, log.size, log.explain) == (200, 100, True)
+
+
+class TestSlowQueryEndpoint:
+
+    def test_requires_admin(self, client, auth_headers):
+        """Test that regular users cannot read the slow query log"""
+        assert client.get('/api/accounting/diagnostics/slow-queries').status_code == 401
+        assert client.get('/api/accounting/diagnostics/slow-queries', headers=auth_headers()).status_code == 403
+
+    def test_lists_and_clears_entries(self, app, client, admin_headers):
+        """Test that admins can read recent entries with their request and clear them"""
+        headers = admin_headers()
+        slow_log(app)
+
+        client.get('/api/accounting/monthly-report/2024/1', headers=headers)
+        response = client.get('/api/accounting/diagnostics/slow-queries', headers=headers)
+
+        assert response.status_code == 200
+        data = response.get_json()['slow_queries']
+        assert data['threshold_ms'] == 0
+        entry = next(e for e in data['entries'] if e['request'] == 'GET /api/accounting/monthly-report/2024/1')
+        assert entry['caller'].startswith('services.')
+        limited = client.get('/api/accounting/diagnostics/slow-queries?limit=1', headers=headers)
+        assert len(limited.get_json()['slow_queries']['entries']) == 1
+
+        response = client.delete('/api/accounting/diagnostics/slow-queries', headers=headers)
+        assert response.status_code == 200
+        app.extensions[EXTENSION_KEY].threshold_ms = 10000
+        assert client.get('/api/accounting/diagnostics/slow-queries', headers=headers).get_json()['slow_queries']['entries'] == []
+
+    def test_invalid_limit(self, client, admin_headers):
+        """Test that a non-positive limit is rejected"""
+        response = client.get('/api/accounting/diagnostics/slow-queries?limit=0', headers=admin_headers())
+
+        assert response.status_code == 400
@@ -100,6 +100,87 @@ class TestTransactionRoutes:
         assert data['current_page'] == 1
         assert data['per_page'] == 2
         assert len(data['transactions']) <= 2
+
+    def test_get_transactions_without_total(self, client, auth_headers):
+        """Test that include_total=false omits total and pages"""
+        headers = auth_headers()
+        
+        response = client.get('/api/transactions/?per_page=2&include_total=false', headers=headers)
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['success'] is True
+        assert 'total' not in data
+        assert 'pages' not in data
+        assert data['has_next'] is True
+        assert len(data['transactions']) == 2
+    
+    def test_get_transactions_cursor_pagination(self, client, auth_headers, app):
+        """Test walking all transactions with keyset cursors"""
+        headers = auth_headers()
+        
+        with app.app_context():
+            for i in range(3):
+                transaction = Transaction(
+                    invoice_id=1,
+                    amount=100.0 + i * 50,
+                    date=date(2024, 1, 15),
+                    type="payment"
+                )
+                db.session.add(transaction)
+            db.session.commit()
+            
+            expected_ids = [
+                t.id for t in Transaction.query.order_by(Transaction.date.desc(), Transaction.id.desc()).all()
+            ]
+        
+        seen_ids = []
+        cursor = ''
+        while True:
+            response = client.get(f'/api/transactions/?per_page=2&cursor={cursor}', headers=headers)
+            
+            assert response.status_code == 200
+            data = response.get_json()
+            assert data['success'] is True
+            assert 'total' not in data
+            assert len(data['transactions']) <= 2
+            seen_ids.extend(t['id'] for t in data['transactions'])
+            
+            if data['next_cursor'] is None:
+                break
+            cursor = data['next_cursor']
+        
+        assert seen_ids == expected_ids
+
+    def test_get_transactions_cursor_negative_per_page(self, client, auth_headers, app):
+        """Test that a negative per_page falls back to the default page size"""
+        headers = auth_headers()
+        
+        with app.app_context():
+            db.session.add_all([
+                Transaction(invoice_id=1, amount=10.0 + i, date=date(2024, 1, 15), type="payment")
+                for i in range(30)
+            ])
+            db.session.commit()
+        
+        response = client.get('/api/transactions/?per_page=-5&cursor=', headers=headers)
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['transactions']) == 20
+        assert data['per_page'] == 20
+        assert data['next_cursor'] is not None
+    
+    def test_get_transactions_invalid_cursor(self, client, auth_headers):
+        """Test that a malformed cursor is rejected"""
+        headers = auth_headers()
+        
+        response = client.get('/api/transactions/?cursor=not-a-cursor', headers=headers)
+        
+        assert response.status_code == 400
+        data = response.get_json()
+        assert data['success'] is False
+        assert 'Invalid cursor' in data['message']
     
     def test_get_transaction_by_id_success(self, client, auth_headers, app):
         """Test getting a specific transaction by ID"""
@@ -261,6 +342,32 @@ class TestTransactionRoutes:
         assert data['success'] is False
         assert "not found" in data['message'].lower()
     
+    def test_create_transactions_bulk(self, client, auth_headers):
+        """Test bulk transaction creation"""
+        headers = auth_headers()
+        
+        response = client.post('/api/transactions/bulk', headers=headers, json={
+            'transactions': [
+                {'invoice_id': 1, 'amount': 100.0, 'date': '2024-03-01', 'type': 'income'},
+                {'invoice_id': 999, 'amount': 50.0, 'date': '2024-03-01', 'type': 'income'}
+            ]
+        })
+        
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data['success'] is True
+        assert data['created_count'] == 1
+        assert data['errors'] == [{'index': 1, 'message': 'Invoice not found'}]
+    
+    def test_create_transactions_bulk_missing_list(self, client, auth_headers):
+        """Test that bulk creation requires a transactions list"""
+        headers = auth_headers()
+        
+        response = client.post('/api/transactions/bulk', headers=headers, json={'transactions': []})
+        
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+    
     def test_update_transaction_success(self, client, auth_headers, app):
         """Test successful transaction update"""
         headers = auth_headers()
@@ -665,6 +772,46 @@ class TestTransactionRoutes:
         assert 'by_type' in stats
         assert 'monthly' in stats
     
+    def test_export_transactions_ndjson(self, client, auth_headers):
+        """Test streaming transactions as NDJSON with filters"""
+        headers = auth_headers()
+        
+        response = client.get(
+            '/api/transactions/export?type=expense&start_date=2024-01-01&end_date=2024-01-31',
+            headers=headers
+        )
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.is_streamed
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [record['date'] for record in records] == ['2024-01-16', '2024-01-25']
+        assert all(record['type'] == 'expense' for record in records)
+    
+    def test_export_transactions_csv(self, client, auth_headers):
+        """Test streaming transactions as CSV"""
+        headers = auth_headers()
+        
+        response = client.get('/api/transactions/export?format=csv', headers=headers)
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert 'transactions.csv' in response.headers['Content-Disposition']
+        lines = response.get_data(as_text=True).splitlines()
+        assert lines[0] == 'id,invoice_id,amount,date,type,created_at,updated_at'
+        assert len(lines) == 5
+    
+    def test_export_transactions_invalid_params(self, client, auth_headers):
+        """Test that export rejects unknown formats and malformed dates"""
+        headers = auth_headers()
+        
+        bad_format = client.get('/api/transactions/export?format=xml', headers=headers)
+        bad_date = client.get('/api/transactions/export?start_date=2024-13-01', headers=headers)
+        
+        assert bad_format.status_code == 400
+        assert bad_date.status_code == 400
+        assert 'YYYY-MM-DD' in bad_date.get_json()['message']
+    
     def test_all_endpoints_require_auth(self, client):
         """Test that all transaction endpoints require authentication"""
         endpoints = [
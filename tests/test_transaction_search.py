@@ -0,0 +1,88 @@
+import pytest
+from datetime import date
+from services.transaction_service import TransactionService
+from models.transaction import Transaction
+from models.search import transaction_search
+from models.user import db
+from sqlalchemy import text
+
+
+def search_ids(**kwargs):
+    result = TransactionService.search_transactions(**kwargs)
+    assert result['success'] is True
+    return sorted(transaction['id'] for transaction in result['transactions'])
+
+
+class TestTransactionSearch:
+
+    def test_free_text_prefix_match(self, app):
+        """Test that free text matches type prefixes through the FTS index"""
+        with app.app_context():
+            TransactionService.create_transaction(1, 120.0, '2024-03-01', 'payment')
+            
+            result = TransactionService.search_transactions('pay')
+            
+            assert [t['type'] for t in result['transactions']] == ['payment']
+            assert result['query'] == 'pay'
+            assert search_ids(query='exp') == [3, 4]
+            assert search_ids(query='nothing') == []
+
+    def test_free_text_matches_amount(self, app):
+        """Test that free text matches amounts"""
+        with app.app_context():
+            assert search_ids(query='1500') == [2]
+
+    def test_search_index_follows_writes(self, app):
+        """Test that updates, deletes and bulk inserts are reflected in search"""
+        with app.app_context():
+            TransactionService.update_transaction(3, type='refund')
+            TransactionService.delete_transaction(4)
+            TransactionService.create_transactions_bulk([
+                {'invoice_id': 1, 'amount': 10.0, 'date': '2024-03-01', 'type': 'refund'}
+            ])
+            
+            result = TransactionService.search_transactions('refund')
+            assert sorted((t['amount'], t['type']) for t in result['transactions']) == [(10.0, 'refund'), (500.0, 'refund')]
+            assert search_ids(query='expense') == []
+            assert search_ids(query='300') == []
+
+    def test_structured_filters(self, app):
+        """Test typed filters and their combination with free text"""
+        with app.app_context():
+            assert search_ids(amount_min=400.0, amount_max=1200.0) == [1, 3]
+            assert search_ids(amount=300.0) == [4]
+            assert search_ids(types=['income', 'expense'], invoice_id=1) == [1, 3]
+            assert search_ids(start_date=date(2024, 1, 16), end_date=date(2024, 1, 31)) == [3, 4]
+            assert search_ids(query='income', start_date=date(2024, 2, 1)) == [2]
+
+    def test_install_search_index_on_existing_database(self, app):
+        """Test that a database without the search index gets a populated one"""
+        with app.app_context():
+            with db.engine.begin() as connection:
+                connection.execute(text('DROP TABLE transactions_fts'))
+                for suffix in ('ai', 'ad', 'au'):
+                    connection.execute(text(f'DROP TRIGGER IF EXISTS transactions_fts_{suffix}'))
+            
+            with db.engine.begin() as connection:
+                assert transaction_search.install(connection) is True
+                assert transaction_search.install(connection) is False
+            
+            assert search_ids(query='income') == [1, 2]
+
+    def test_rebuild_search_indexes_command(self, app, runner):
+        """Test the rebuild-search-indexes CLI command"""
+        result = runner.invoke(args=['accounting', 'rebuild-search-indexes'])
+        
+        assert result.exit_code == 0
+        assert 'Search indexes rebuilt' in result.output
+
+    def test_search_route_filters(self, client, auth_headers):
+        """Test the search endpoint with typed filters"""
+        headers = auth_headers()
+        
+        response = client.get('/api/transactions/search?type=income,expense&amount_min=400', headers=headers)
+        invalid = client.get('/api/transactions/search?amount_min=abc', headers=headers)
+        
+        assert response.status_code == 200
+        assert sorted(t['id'] for t in response.get_json()['transactions']) == [1, 2, 3]
+        assert invalid.status_code == 400
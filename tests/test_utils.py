@@ -1,7 +1,10 @@
 import pytest
 import jwt
+import time
 from datetime import datetime, timedelta
-from utils.jwt_utils import JWTUtils
+from utils.jwt_utils import JWTUtils, invalidate_token_cache, token_cache
+from utils.pagination import encode_cursor, decode_cursor
+from utils.export import export_lines, CHUNK_SIZE
 from flask import Flask
 
 
@@ -236,4 +239,99 @@ class TestJWTUtils:
             
             assert data1['user_id'] != data2['user_id']
             assert data1['email'] != data2['email']
-            assert data1['role'] != data2['role'] 
\ No newline at end of file
+            assert data1['role'] != data2['role'] 
+
+
+class TestTokenCache:
+    def test_verified_token_is_cached(self, app):
+        with app.app_context():
+            invalidate_token_cache()
+            token = JWTUtils.generate_token({'id': 1, 'email': 'test@example.com', 'role': 'user'})
+            hits = token_cache.stats()['hits']
+            
+            first = JWTUtils.verify_token_cached(token)
+            second = JWTUtils.verify_token_cached(token)
+            
+            assert first == second
+            assert second['data']['user_id'] == 1
+            assert token_cache.stats()['hits'] == hits + 1
+    
+    def test_invalid_and_expired_tokens_are_not_cached(self, app):
+        with app.app_context():
+            invalidate_token_cache()
+            expired_token = jwt.encode(
+                {'user_id': 1, 'email': 'test@example.com', 'role': 'user',
+                 'exp': datetime.utcnow() - timedelta(seconds=1)},
+                app.config['SECRET_KEY'],
+                algorithm='HS256'
+            )
+            
+            assert JWTUtils.verify_token_cached('invalid.token.here')['success'] is False
+            assert JWTUtils.verify_token_cached(expired_token)['success'] is False
+            assert token_cache.stats()['size'] == 0
+    
+    def test_entry_expires_with_token(self, app):
+        with app.app_context():
+            invalidate_token_cache()
+            short_lived = jwt.encode(
+                {'user_id': 1, 'email': 'test@example.com', 'role': 'user',
+                 'exp': datetime.utcnow() + timedelta(seconds=2)},
+                app.config['SECRET_KEY'],
+                algorithm='HS256'
+            )
+            
+            assert JWTUtils.verify_token_cached(short_lived)['success'] is True
+            entry_expiry = next(iter(token_cache._entries.values()))[1]
+            
+            assert entry_expiry - time.monotonic() <= 2
+    
+    def test_secret_rotation(self, app):
+        with app.app_context():
+            invalidate_token_cache()
+            token = JWTUtils.generate_token({'id': 1, 'email': 'test@example.com', 'role': 'user'})
+            assert JWTUtils.verify_token_cached(token)['success'] is True
+            
+            app.config['SECRET_KEY'] = 'rotated-secret-key'
+            invalidate_token_cache()
+            
+            assert token_cache.stats()['size'] == 0
+            assert JWTUtils.verify_token_cached(token)['success'] is False
+    
+    def test_token_required_uses_cache(self, client, auth_headers):
+        invalidate_token_cache()
+        headers = auth_headers()
+        
+        for _ in range(3):
+            assert client.get('/api/auth/profile', headers=headers).status_code == 200
+        
+        stats = token_cache.stats()
+        assert stats['misses'] >= 1
+        assert stats['hits'] >= 2
+
+
+class TestPagination:
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor(datetime(2024, 1, 15).date(), 42)
+        
+        assert '=' not in cursor
+        assert decode_cursor(cursor) == (datetime(2024, 1, 15).date(), 42)
+
+    def test_decode_invalid_cursor(self):
+        with pytest.raises(ValueError, match='Invalid cursor'):
+            decode_cursor('not-a-cursor')
+
+
+class TestExport:
+    def test_export_lines_are_chunked(self):
+        records = ({'id': i, 'note': 'x' * 100} for i in range(2000))
+        
+        chunks = list(export_lines(records, 'ndjson', ['id', 'note']))
+        
+        assert len(chunks) > 1
+        assert all(len(chunk) < CHUNK_SIZE + 200 for chunk in chunks)
+        assert ''.join(chunks).count('\n') == 2000
+    
+    def test_export_lines_csv(self):
+        chunks = list(export_lines([{'id': 1, 'type': 'income'}], 'csv', ['id', 'type']))
+        
+        assert ''.join(chunks).splitlines() == ['id,type', '1,income']
@@ -0,0 +1,220 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict, defaultdict
+from itertools import chain
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+_MISSING = object()
+
+_caches = weakref.WeakSet()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with per-entry expiry
+
+    Concurrent misses for the same key are collapsed so that only one
+    caller computes the value while the others wait for it. With a
+    max_size the cache holds at most that many entries and evicts the
+    least recently used one first.
+    """
+
+    def __init__(self, name: str, default_ttl: float = 30, max_size: Optional[int] = None):
+        self.name = name
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._key_locks = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+        
+        Returns:
+            Any: Cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+            
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds (default: cache default)
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Get a cached value or compute and store it
+        
+        A value computed while the cache was being invalidated is returned
+        to its caller but not stored.
+        
+        Args:
+            key: Cache key
+            compute: Function producing the value on a miss
+            ttl: Time to live in seconds (default: cache default)
+        
+        Returns:
+            Any: Cached or freshly computed value
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > time.monotonic():
+                    return entry[0]
+                generation = self._generation
+            
+            value = compute()
+            
+            with self._lock:
+                if generation == self._generation:
+                    ttl = self.default_ttl if ttl is None else ttl
+                    if ttl > 0:
+                        self._store(key, value, ttl)
+        
+        return value
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Insert an entry as most recently used, evicting over max_size; caller holds the lock"""
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        
+        if self.max_size is not None:
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """
+        Drop one entry, or every entry when no key is given
+        
+        Args:
+            key: Cache key (optional)
+        """
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+                self._key_locks.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current size"""
+        with self._lock:
+            return {
+                'name': self.name,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+def all_caches() -> List[TTLCache]:
+    """Every live TTLCache, e.g. to report their stats"""
+    return list(_caches)
+
+
+_table_caches = defaultdict(list)
+
+
+def invalidate_on_write(cache: TTLCache, *tables: str) -> TTLCache:
+    """
+    Invalidate a cache whenever a committed write touches one of the tables
+
+    Args:
+        cache: Cache to invalidate
+        *tables: Table names
+
+    Returns:
+        TTLCache: The cache, for use at module level
+    """
+    for table in tables:
+        _table_caches[table].append(cache)
+    return cache
+
+
+def mark_tables_written(session, *tables: str) -> None:
+    """
+    Record tables written outside the ORM unit of work (bulk statements)
+
+    The caches depending on them are invalidated when the session commits.
+    """
+    session.info.setdefault('written_tables', set()).update(tables)
+
+
+def notify_tables_written(*tables: str) -> None:
+    """Invalidate every cache registered for the given tables right away"""
+    invalidated = set()
+    for table in tables:
+        for cache in _table_caches.get(table, []):
+            if id(cache) not in invalidated:
+                cache.invalidate()
+                invalidated.add(id(cache))
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_written_tables(session, flush_context, instances):
+    modified = (obj for obj in session.dirty if session.is_modified(obj))
+    tables = set()
+    for obj in chain(session.new, session.deleted, modified):
+        table = getattr(obj, '__tablename__', None)
+        if table:
+            tables.add(table)
+
+    if tables:
+        mark_tables_written(session, *tables)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_written_tables(session):
+    tables = session.info.pop('written_tables', None)
+    if tables:
+        notify_tables_written(*tables)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_written_tables(session):
+    session.info.pop('written_tables', None)
@@ -0,0 +1,224 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from typing import Any, Callable, Dict, Tuple
+
+EXTENSION_KEY = 'engine_profile'
+
+# Connection pool options and per-connection SQLite pragmas of each profile.
+# 'default' leaves SQLAlchemy's and SQLite's own defaults in place.
+ENGINE_PROFILES = {
+    'default': {
+        'pool': {},
+        'pragmas': {}
+    },
+    'production': {
+        'pool': {
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_timeout': 30,
+            'pool_recycle': 3600,
+            'pool_pre_ping': True
+        },
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -65536,
+            'mmap_size': 268435456,
+            'busy_timeout': 5000,
+            'temp_store': 'MEMORY'
+        }
+    }
+}
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def _choice(*allowed: str) -> Callable[[Any], str]:
+    def convert(value) -> str:
+        value = str(value).strip().upper()
+        if value not in allowed:
+            raise ValueError(f"must be one of: {', '.join(allowed)}")
+        return value
+    return convert
+
+
+# Config key -> (option or pragma name, converter); every key overrides the profile
+POOL_SETTINGS = {
+    'DB_POOL_SIZE': ('pool_size', int),
+    'DB_MAX_OVERFLOW': ('max_overflow', int),
+    'DB_POOL_TIMEOUT': ('pool_timeout', float),
+    'DB_POOL_RECYCLE': ('pool_recycle', int),
+    'DB_POOL_PRE_PING': ('pool_pre_ping', _to_bool)
+}
+
+PRAGMA_SETTINGS = {
+    'SQLITE_JOURNAL_MODE': ('journal_mode', _choice('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')),
+    'SQLITE_SYNCHRONOUS': ('synchronous', _choice('OFF', 'NORMAL', 'FULL', 'EXTRA')),
+    'SQLITE_CACHE_SIZE': ('cache_size', int),
+    'SQLITE_MMAP_SIZE': ('mmap_size', int),
+    'SQLITE_BUSY_TIMEOUT': ('busy_timeout', int),
+    'SQLITE_TEMP_STORE': ('temp_store', _choice('DEFAULT', 'FILE', 'MEMORY'))
+}
+
+ENGINE_SETTING_KEYS = ['DB_ENGINE_PROFILE'] + list(POOL_SETTINGS) + list(PRAGMA_SETTINGS)
+
+# Pool options that only apply to a QueuePool
+QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+# SQLite reports these pragmas as numbers
+PRAGMA_VALUE_NAMES = {
+    'synchronous': {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'},
+    'temp_store': {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'}
+}
+
+
+def engine_settings(config) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+    """
+    Resolve the engine profile named by DB_ENGINE_PROFILE and its overrides
+
+    Args:
+        config: Application config
+
+    Returns:
+        Tuple: (profile name, pool options, SQLite pragmas)
+
+    Raises:
+        ValueError: If the profile is unknown or a setting is invalid
+    """
+    name = config.get('DB_ENGINE_PROFILE') or 'default'
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f"DB_ENGINE_PROFILE must be one of: {', '.join(ENGINE_PROFILES)}")
+
+    pool = dict(ENGINE_PROFILES[name]['pool'])
+    pragmas = dict(ENGINE_PROFILES[name]['pragmas'])
+
+    for settings, target in ((POOL_SETTINGS, pool), (PRAGMA_SETTINGS, pragmas)):
+        for key, (option, convert) in settings.items():
+            value = config.get(key)
+            if value is None or value == '':
+                continue
+            try:
+                target[option] = convert(value)
+            except ValueError as e:
+                raise ValueError(f'Invalid {key}: {str(e)}')
+
+    return name, pool, pragmas
+
+
+def _pool_options(pool: Dict[str, Any], database_uri: str) -> Dict[str, Any]:
+    """The pool options that apply to the pool SQLAlchemy picks for a URI"""
+    url = make_url(database_uri)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {option: value for option, value in pool.items() if option not in QUEUE_POOL_OPTIONS}
+    return dict(pool)
+
+
+def set_sqlite_pragmas(engine, pragmas: Dict[str, Any]) -> None:
+    """
+    Run the pragmas on every new DBAPI connection of a SQLite engine
+
+    Args:
+        engine: SQLAlchemy engine
+        pragmas: Pragma name to value
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas.items()]
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def init_engine(app, database) -> Dict[str, Any]:
+    """
+    Initialize Flask-SQLAlchemy with the configured engine profile
+
+    Sets SQLALCHEMY_ENGINE_OPTIONS from the profile (explicit options
+    there win), initializes the extension and registers the pragmas on
+    every engine before the first connection is made.
+
+    Args:
+        app: Flask application
+        database: Flask-SQLAlchemy extension
+
+    Returns:
+        Dict: Active profile name, pool options and pragmas
+    """
+    name, profile_pool, pragmas = engine_settings(app.config)
+    pool = _pool_options(profile_pool, app.config['SQLALCHEMY_DATABASE_URI'])
+
+    options = dict(pool)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    # Binds given as a plain URL, such as a read replica, get the same profile
+    binds = app.config.get('SQLALCHEMY_BINDS') or {}
+    for key, value in binds.items():
+        if isinstance(value, str):
+            binds[key] = dict(_pool_options(profile_pool, value), url=value)
+
+    database.init_app(app)
+
+    with app.app_context():
+        for engine in database.engines.values():
+            set_sqlite_pragmas(engine, pragmas)
+
+    profile = {'name': name, 'pool': pool, 'pragmas': pragmas}
+    app.extensions[EXTENSION_KEY] = profile
+    return profile
+
+
+def engine_diagnostics(app, engine) -> Dict[str, Any]:
+    """
+    Configured engine profile next to what the database actually reports
+
+    Args:
+        app: Flask application
+        engine: SQLAlchemy engine
+
+    Returns:
+        Dict: Profile, pool state and live pragma values
+    """
+    profile = app.extensions.get(EXTENSION_KEY) or {'name': 'default', 'pool': {}, 'pragmas': {}}
+    pool = engine.pool
+
+    pool_state = {'class': type(pool).__name__, 'status': pool.status()}
+    for attribute in ('size', 'checkedout', 'overflow'):
+        method = getattr(pool, attribute, None)
+        if callable(method):
+            pool_state[attribute] = method()
+    pool_state['pre_ping'] = bool(getattr(pool, '_pre_ping', False))
+
+    active = {}
+    if engine.dialect.name == 'sqlite':
+        with engine.connect() as connection:
+            for name, _ in PRAGMA_SETTINGS.values():
+                value = connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+                if name == 'journal_mode':
+                    value = value.upper()
+                active[name] = PRAGMA_VALUE_NAMES.get(name, {}).get(value, value)
+            active['sqlite_version'] = connection.exec_driver_sql('SELECT sqlite_version()').scalar()
+
+    return {
+        'profile': profile['name'],
+        'dialect': engine.dialect.name,
+        'driver': engine.driver,
+        'url': engine.url.render_as_string(hide_password=True),
+        'configured': {
+            'pool': profile['pool'],
+            'pragmas': profile['pragmas']
+        },
+        'pool': pool_state,
+        'pragmas': active
+    }
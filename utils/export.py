@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_export_dates(start_date: Optional[str], end_date: Optional[str]) -> Tuple:
+    """
+    Parse the optional start_date/end_date export filters
+    
+    Args:
+        start_date: Start date (YYYY-MM-DD) or None
+        end_date: End date (YYYY-MM-DD) or None
+    
+    Returns:
+        Tuple: (start, end) as dates or None
+    
+    Raises:
+        ValueError: If a date is malformed or the range is reversed
+    """
+    parsed = []
+    for label, value in (('Start', start_date), ('End', end_date)):
+        if not value:
+            parsed.append(None)
+            continue
+        try:
+            parsed.append(datetime.strptime(value, '%Y-%m-%d').date())
+        except ValueError:
+            raise ValueError(f'{label} date must be in YYYY-MM-DD format')
+    
+    if parsed[0] and parsed[1] and parsed[0] > parsed[1]:
+        raise ValueError('Start date cannot be after end date')
+    
+    return tuple(parsed)
+
+
+def export_lines(records: Iterable[Dict[str, Any]], export_format: str, fieldnames: List[str]) -> Iterator[str]:
+    """
+    Serialize records as NDJSON or CSV in bounded chunks
+    
+    Records are consumed lazily and written to a small buffer that is
+    flushed every CHUNK_SIZE characters, so memory stays flat however many
+    records there are.
+    
+    Args:
+        records: Iterable of record dicts
+        export_format: 'ndjson' or 'csv'
+        fieldnames: CSV column order
+    
+    Returns:
+        Iterator: Text chunks
+    """
+    buffer = io.StringIO()
+    
+    if export_format == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(record):
+            buffer.write(json.dumps(record))
+            buffer.write('\n')
+    
+    for record in records:
+        write(record)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -1,8 +1,22 @@
+import hashlib
 import jwt
+import time
 from datetime import datetime, timedelta
 from flask import current_app
 from functools import wraps
 from typing import Dict, Any, Optional
+from utils.cache import TTLCache
+
+TOKEN_CACHE_SIZE = 4096
+
+# Payloads of verified tokens, keyed by a digest of the signing secret and
+# the token, each kept until the token's own expiry
+token_cache = TTLCache('tokens', default_ttl=0, max_size=TOKEN_CACHE_SIZE)
+
+
+def invalidate_token_cache() -> None:
+    """Forget every verified token, e.g. after rotating SECRET_KEY"""
+    token_cache.invalidate()
 
 
 class JWTUtils:
@@ -81,6 +95,41 @@ class JWTUtils:
                 'message': f'Error verifying token: {str(e)}'
             }
     
+    @staticmethod
+    def verify_token_cached(token: str) -> Dict[str, Any]:
+        """
+        Verify a token, reusing the payload of an earlier successful verification
+        
+        Only valid tokens are cached, until their exp claim, so an expired
+        token is never accepted. The cache key covers the secret, so
+        tokens verified under a previous SECRET_KEY are not reused.
+        
+        Args:
+            token: JWT token string
+            
+        Returns:
+            Dict: Decoded token data or error, as verify_token
+        """
+        secret = current_app.config['SECRET_KEY']
+        key = hashlib.sha256(f'{secret}\0{token}'.encode()).digest()
+        
+        payload = token_cache.get(key)
+        if payload is not None:
+            return {
+                'success': True,
+                'data': dict(payload),
+                'message': 'Token is valid'
+            }
+        
+        result = JWTUtils.verify_token(token)
+        
+        if result['success']:
+            expires_at = result['data'].get('exp')
+            if isinstance(expires_at, (int, float)):
+                token_cache.set(key, dict(result['data']), ttl=expires_at - time.time())
+        
+        return result
+    
     @staticmethod
     def get_user_from_token(token: str) -> Optional[Dict[str, Any]]:
         """
@@ -166,7 +215,7 @@ def token_required(f):
                 'message': 'Token is missing'
             }), 401
         
-        result = JWTUtils.verify_token(token)
+        result = JWTUtils.verify_token_cached(token)
         
         if not result['success']:
             return jsonify({
@@ -0,0 +1,406 @@
+import hmac
+import math
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, current_app, g, request
+from models.user import db
+from utils.cache import all_caches
+from utils.passwords import EXTENSION_KEY as PASSWORD_HASHER_KEY
+from utils.query_stats import current_request_stats
+from utils.replica import EXTENSION_KEY as REPLICA_ROUTER_KEY
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+EXTENSION_KEY = 'metrics'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ENDPOINT = '<unmatched>'
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """
+    A named metric with one series per combination of label values
+
+    Updates take the metric's lock for a dict lookup and an addition, so
+    they are safe from any request thread and cost about a microsecond.
+    """
+
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f'{self.name} expects labels: {", ".join(self.labelnames)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            series = list(self._series.items())
+        return [(f'{self.name}_total', self._labels(key), value) for key, value in series]
+
+
+class Gauge(Metric):
+    """Value that goes up and down"""
+
+    type = 'gauge'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            series = list(self._series.items())
+        return [(self.name, self._labels(key), value) for key, value in series]
+
+
+class Histogram(Metric):
+    """Observations counted into fixed cumulative buckets, with their sum"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+
+        samples = []
+        for key, counts, total, count in series:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                samples.append((f'{self.name}_bucket', dict(labels, le=_format_value(bound)), cumulative))
+            samples.append((f'{self.name}_sum', labels, total))
+            samples.append((f'{self.name}_count', labels, count))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Metrics of one application, rendered in the Prometheus text format
+
+    Besides the metrics updated as requests run, collectors are called at
+    scrape time to report state other components already keep (cache and
+    pool counters), so that state costs nothing between scrapes.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric already registered: {metric.name}')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]) -> None:
+        """
+        Register a function called on every scrape
+
+        It yields (name, type, help, samples) tuples; samples are
+        (sample name, labels, value).
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format (0.0.4)
+
+        Returns:
+            str: Exposition text
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        families = [(metric.name, metric.type, metric.documentation, metric.samples()) for metric in metrics]
+        for collector in collectors:
+            families.extend(collector())
+
+        lines = []
+        for name, type_, documentation, samples in families:
+            if type_ == 'counter' and not name.endswith('_total'):
+                # Counter samples end in _total, and 0.0.4 parsers only type samples named like their family
+                name = f'{name}_total'
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {type_}')
+            for sample_name, labels, value in samples:
+                lines.append(f'{sample_name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _route_labels() -> Tuple[str, str]:
+    rule = request.url_rule
+    endpoint = rule.endpoint if rule is not None else UNMATCHED_ENDPOINT
+    return request.blueprint or 'app', endpoint
+
+
+def init_metrics(app) -> MetricsRegistry:
+    """
+    Collect request metrics for an application and serve them at /metrics
+
+    Records per blueprint and endpoint: request latency, database time and
+    statement count (from the per-request query stats) as histograms,
+    in-flight requests, request counts by status, 5xx responses and
+    unhandled exceptions. When METRICS_TOKEN is set, /metrics requires it
+    as a bearer token.
+
+    Args:
+        app: Flask application
+
+    Returns:
+        MetricsRegistry: The application's registry
+    """
+    registry = MetricsRegistry()
+    labelnames = ('blueprint', 'endpoint')
+
+    duration = registry.histogram(
+        'http_request_duration_seconds', 'Request latency in seconds', labelnames + ('method',)
+    )
+    db_duration = registry.histogram(
+        'http_request_db_seconds', 'Database time spent per request in seconds', labelnames
+    )
+    db_queries = registry.histogram(
+        'http_request_db_queries', 'SQL statements run per request', labelnames, buckets=QUERY_COUNT_BUCKETS
+    )
+    in_flight = registry.gauge('http_requests_in_flight', 'Requests being handled', labelnames)
+    requests_total = registry.counter(
+        'http_requests', 'Requests handled, by status code', labelnames + ('method', 'status')
+    )
+    errors = registry.counter('http_request_errors', 'Responses with a 5xx status', labelnames + ('status',))
+    exceptions = registry.counter(
+        'http_request_exceptions', 'Unhandled exceptions raised by requests', labelnames + ('exception',)
+    )
+    registry.gauge('process_start_time_seconds', 'Start time of the process since the epoch').set(time.time())
+
+    for collector in DEFAULT_COLLECTORS:
+        registry.add_collector(lambda collector=collector: collector(app))
+
+    @app.before_request
+    def _start_request_metrics():
+        blueprint, endpoint = _route_labels()
+        g.metrics_labels = (blueprint, endpoint)
+        g.metrics_started = time.perf_counter()
+        in_flight.inc(blueprint=blueprint, endpoint=endpoint)
+
+    @app.after_request
+    def _record_request_metrics(response):
+        labels = g.get('metrics_labels')
+        if labels is None:
+            return response
+
+        blueprint, endpoint = labels
+        elapsed = time.perf_counter() - g.metrics_started
+        duration.observe(elapsed, blueprint=blueprint, endpoint=endpoint, method=request.method)
+        requests_total.inc(blueprint=blueprint, endpoint=endpoint, method=request.method, status=response.status_code)
+        if response.status_code >= 500:
+            errors.inc(blueprint=blueprint, endpoint=endpoint, status=response.status_code)
+
+        stats = current_request_stats()
+        if stats is not None:
+            db_duration.observe(stats.total_time, blueprint=blueprint, endpoint=endpoint)
+            db_queries.observe(stats.count, blueprint=blueprint, endpoint=endpoint)
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exc):
+        labels = g.pop('metrics_labels', None)
+        if labels is None:
+            return
+
+        blueprint, endpoint = labels
+        in_flight.dec(blueprint=blueprint, endpoint=endpoint)
+        if exc is not None:
+            exceptions.inc(blueprint=blueprint, endpoint=endpoint, exception=type(exc).__name__)
+
+    @app.route('/metrics')
+    def metrics():
+        token = current_app.config.get('METRICS_TOKEN')
+        if token:
+            supplied = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+                return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(registry.render(), content_type=CONTENT_TYPE)
+
+    app.extensions[EXTENSION_KEY] = registry
+    return registry
+
+
+def collect_cache_metrics(app):
+    """Hit, miss and eviction counters, hit ratio and size of every TTLCache, by cache name"""
+    totals = {}
+    for cache in all_caches():
+        stats = cache.stats()
+        total = totals.setdefault(stats['name'], {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0})
+        for key in total:
+            total[key] += stats[key]
+
+    names = sorted(totals)
+
+    def family(name, type_, documentation, key):
+        sample_name = f'{name}_total' if type_ == 'counter' else name
+        return name, type_, documentation, [(sample_name, {'cache': cache}, totals[cache][key]) for cache in names]
+
+    ratios = []
+    for cache in names:
+        lookups = totals[cache]['hits'] + totals[cache]['misses']
+        ratios.append(('cache_hit_ratio', {'cache': cache}, totals[cache]['hits'] / lookups if lookups else 0.0))
+
+    return [
+        family('cache_hits', 'counter', 'Cache lookups answered from the cache', 'hits'),
+        family('cache_misses', 'counter', 'Cache lookups that had to compute the value', 'misses'),
+        family('cache_evictions', 'counter', 'Entries evicted to stay under max_size', 'evictions'),
+        family('cache_entries', 'gauge', 'Entries currently cached', 'size'),
+        ('cache_hit_ratio', 'gauge', 'Share of lookups answered from the cache', ratios)
+    ]
+
+
+def collect_database_metrics(app):
+    """Connection pool usage of each engine and replica routing counters"""
+    with app.app_context():
+        engines = sorted(db.engines.items(), key=lambda item: item[0] or '')
+
+    in_use = []
+    size = []
+    for bind, engine in engines:
+        labels = {'bind': bind or 'primary'}
+        if callable(getattr(engine.pool, 'checkedout', None)):
+            in_use.append(('db_pool_connections_in_use', labels, engine.pool.checkedout()))
+        if callable(getattr(engine.pool, 'size', None)):
+            size.append(('db_pool_size', labels, engine.pool.size()))
+
+    families = [
+        ('db_pool_connections_in_use', 'gauge', 'Connections checked out of the pool', in_use),
+        ('db_pool_size', 'gauge', 'Configured pool size', size)
+    ]
+
+    router = app.extensions.get(REPLICA_ROUTER_KEY)
+    if router is not None:
+        stats = router.stats()
+        families.append(('replica_reads', 'counter', 'Reads sent to the replica',
+                         [('replica_reads_total', {}, stats['replica_reads'])]))
+        families.append(('replica_primary_fallbacks', 'counter', 'Read-only reads sent to the primary because of lag',
+                         [('replica_primary_fallbacks_total', {}, stats['primary_fallbacks'])]))
+        if stats['lag'] is not None:
+            families.append(('replica_lag_seconds', 'gauge', 'Last measured replica lag',
+                             [('replica_lag_seconds', {}, stats['lag'])]))
+    return families
+
+
+def collect_password_hasher_metrics(app):
+    """Completed and rejected password hashing operations"""
+    hasher = app.extensions.get(PASSWORD_HASHER_KEY)
+    if hasher is None:
+        return []
+
+    stats = hasher.stats()
+    return [
+        ('password_hash_operations', 'counter', 'Password hashes and checks completed',
+         [('password_hash_operations_total', {}, stats['completed'])]),
+        ('password_hash_rejections', 'counter', 'Password operations refused because the pool was saturated',
+         [('password_hash_rejections_total', {}, stats['rejected'])])
+    ]
+
+
+DEFAULT_COLLECTORS = [collect_cache_metrics, collect_database_metrics, collect_password_hasher_metrics]
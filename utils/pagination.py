@@ -0,0 +1,183 @@
+import base64
+import json
+from datetime import date, datetime
+from math import ceil
+from sqlalchemy import Select, and_, func, or_, select
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Page size used when per_page is out of range, as in Flask-SQLAlchemy's paginate
+DEFAULT_PER_PAGE = 20
+
+
+def page_size(per_page: int) -> int:
+    """
+    The number of rows to fetch for a requested page size
+
+    A page size below 1 falls back to DEFAULT_PER_PAGE like paginate does;
+    it must never reach LIMIT, where SQLite reads a negative value as no
+    limit at all.
+
+    Args:
+        per_page: Requested number of records per page
+
+    Returns:
+        int: Page size to use
+    """
+    return per_page if per_page >= 1 else DEFAULT_PER_PAGE
+
+
+def encode_cursor(date_value: date, row_id: int) -> str:
+    """
+    Encode a (date, id) position as an opaque cursor
+
+    Args:
+        date_value: Date of the last row on the page
+        row_id: ID of the last row on the page
+
+    Returns:
+        str: URL-safe cursor
+    """
+    payload = json.dumps([date_value.isoformat(), row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        Tuple: (date, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(row_id, int):
+            raise ValueError('cursor id must be an integer')
+        return datetime.strptime(date_value, '%Y-%m-%d').date(), row_id
+    except Exception as e:
+        raise ValueError(f'Invalid cursor: {str(e)}')
+
+
+def fetch_rows(query, session=None) -> List[Any]:
+    """
+    All rows of an ORM query, or of a Core select executed on a session
+
+    Args:
+        query: ORM query or Core select
+        session: Session running a Core select
+
+    Returns:
+        List: Model instances or column rows
+    """
+    if isinstance(query, Select):
+        return session.execute(query).all()
+    return query.all()
+
+
+def keyset_page(query, date_column, id_column, cursor: str, per_page: int, session=None) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page ordered by (date DESC, id DESC) starting after a cursor
+
+    The position is applied as a range predicate, so the database seeks
+    through the (date, id) index instead of skipping OFFSET rows, and no
+    COUNT(*) is issued. Rows are expected to have a date.
+
+    Args:
+        query: Filtered query or Core select without ordering
+        date_column: Date column of the ordering key
+        id_column: Primary key column of the ordering key
+        cursor: Cursor from a previous page, or an empty string for the first page
+        per_page: Number of records per page
+        session: Session running a Core select
+
+    Returns:
+        Tuple: (rows, next_cursor); next_cursor is None on the last page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    per_page = page_size(per_page)
+    if cursor:
+        date_value, row_id = decode_cursor(cursor)
+        query = query.filter(
+            and_(
+                date_column <= date_value,
+                or_(date_column < date_value, id_column < row_id)
+            )
+        )
+
+    rows = fetch_rows(query.order_by(date_column.desc(), id_column.desc()).limit(per_page + 1), session)
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, date_column.key), getattr(last, id_column.key))
+
+    return rows, next_cursor
+
+
+def offset_page(query, page: int, per_page: int, include_total: bool = True, count: Callable[[], int] = None,
+                session=None) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Fetch one page by page number
+    
+    A Core select is paginated like Flask-SQLAlchemy paginates a query
+    (out-of-range page and per_page fall back to 1 and 20), so both give
+    the same pagination information.
+    
+    Args:
+        query: Filtered and ordered query or Core select
+        page: Page number (1-based)
+        per_page: Number of records per page
+        include_total: Whether to report total and pages
+        count: Function returning the total row count; when omitted the
+            total is computed with COUNT(*) on the query
+        session: Session running a Core select
+    
+    Returns:
+        Tuple: (rows, pagination information). Without totals the
+        information carries has_next instead of total and pages.
+    """
+    page_number = page if page >= 1 else 1
+    size = page_size(per_page)
+    
+    if not include_total:
+        rows = fetch_rows(query.limit(size + 1).offset((page_number - 1) * size), session)
+        return rows[:size], {
+            'current_page': page,
+            'per_page': per_page,
+            'has_next': len(rows) > size
+        }
+    
+    if isinstance(query, Select):
+        rows = fetch_rows(query.limit(size).offset((page_number - 1) * size), session)
+        
+        if count is not None:
+            total = count()
+        else:
+            total = session.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+        
+        return rows, {
+            'total': total,
+            'pages': ceil(total / size) if total else 0,
+            'current_page': page,
+            'per_page': per_page
+        }
+    
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False, count=count is None)
+    if count is not None:
+        pagination.total = count()
+    
+    return pagination.items, {
+        'total': pagination.total,
+        'pages': pagination.pages,
+        'current_page': page,
+        'per_page': per_page
+    }
@@ -0,0 +1,206 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app, has_app_context
+from typing import Any, Callable, Dict, Optional
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'pbkdf2:sha256:600000'
+DEFAULT_SALT_LENGTH = 16
+DEFAULT_QUEUE_LIMIT = 64
+DEFAULT_TIMEOUT = 10.0
+EXTENSION_KEY = 'password_hasher'
+
+_create_lock = threading.Lock()
+
+
+class PasswordHashBusy(Exception):
+    """Raised when the password hashing pool cannot take more work"""
+
+
+def normalize_method(method: str) -> str:
+    """
+    Spell out werkzeug's defaults in a hashing method
+
+    'pbkdf2' becomes 'pbkdf2:sha256:600000' and 'scrypt' becomes
+    'scrypt:32768:8:1', which is how the method is recorded in the hash.
+
+    Raises:
+        ValueError: If the method is not pbkdf2 or scrypt
+    """
+    name, *args = method.split(':')
+
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = int(args[1]) if len(args) > 1 else 600000
+        return f'pbkdf2:{hash_name}:{iterations}'
+
+    if name == 'scrypt':
+        n = int(args[0]) if args else 2 ** 15
+        r = int(args[1]) if len(args) > 1 else 8
+        p = int(args[2]) if len(args) > 2 else 1
+        return f'scrypt:{n}:{r}:{p}'
+
+    raise ValueError(f'Unsupported password hash method: {method}')
+
+
+class PasswordHasher:
+    """
+    Hashes and checks passwords on a bounded pool of worker threads
+
+    At most workers hashes run at once and at most queue_limit more wait
+    for a worker; beyond that, or when a hash takes longer than timeout,
+    PasswordHashBusy is raised so a burst of logins fails fast instead of
+    tying up every request thread. With workers=0 hashing runs inline.
+    """
+
+    def __init__(self, method: str = DEFAULT_METHOD, salt_length: int = DEFAULT_SALT_LENGTH,
+                 workers: int = None, queue_limit: int = DEFAULT_QUEUE_LIMIT, timeout: float = DEFAULT_TIMEOUT):
+        self.method = normalize_method(method)
+        self.salt_length = salt_length
+        self.workers = min(4, os.cpu_count() or 1) if workers is None else workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.completed = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash') if self.workers else None
+        self._slots = threading.BoundedSemaphore(self.workers + queue_limit) if self.workers else None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'PasswordHasher':
+        """Build a hasher from the PASSWORD_HASH_* settings of an app config"""
+        return cls(
+            method=config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+            salt_length=config.get('PASSWORD_SALT_LENGTH', DEFAULT_SALT_LENGTH),
+            workers=config.get('PASSWORD_HASH_WORKERS'),
+            queue_limit=config.get('PASSWORD_HASH_QUEUE_LIMIT', DEFAULT_QUEUE_LIMIT),
+            timeout=config.get('PASSWORD_HASH_TIMEOUT', DEFAULT_TIMEOUT)
+        )
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured method
+
+        Raises:
+            PasswordHashBusy: If the pool is saturated
+        """
+        return self._run(generate_password_hash, password, method=self.method, salt_length=self.salt_length)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        """
+        Check a password against a stored hash
+
+        Raises:
+            PasswordHashBusy: If the pool is saturated
+        """
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """Whether a stored hash was made with other parameters than the configured ones"""
+        return pwhash.split('$', 1)[0] != self.method
+
+    def _run(self, function: Callable, *args, **kwargs) -> Any:
+        if self._executor is None:
+            result = function(*args, **kwargs)
+            with self._lock:
+                self.completed += 1
+            return result
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHashBusy('Too many password operations in progress, please retry')
+
+        try:
+            future = self._executor.submit(function, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+
+        # The slot is held until the hash finishes, even if the caller
+        # stops waiting, so abandoned work still counts against the limit
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHashBusy('Password operation timed out, please retry')
+
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def shutdown(self) -> None:
+        """Stop the worker threads once queued work is done"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Configuration and completed/rejected counters"""
+        with self._lock:
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'queue_limit': self.queue_limit,
+                'completed': self.completed,
+                'rejected': self.rejected
+            }
+
+
+def init_password_hasher(app) -> PasswordHasher:
+    """
+    (Re)build the application's password hasher from its config
+
+    Args:
+        app: Flask application
+
+    Returns:
+        PasswordHasher: The new hasher
+    """
+    hasher = PasswordHasher.from_config(app.config)
+    previous = app.extensions.get(EXTENSION_KEY)
+    app.extensions[EXTENSION_KEY] = hasher
+    if previous is not None:
+        previous.shutdown()
+    return hasher
+
+
+def get_password_hasher() -> Optional[PasswordHasher]:
+    """The current application's hasher, built on first use; None outside an app context"""
+    if not has_app_context():
+        return None
+
+    app = current_app._get_current_object()
+    hasher = app.extensions.get(EXTENSION_KEY)
+    if hasher is None:
+        with _create_lock:
+            hasher = app.extensions.get(EXTENSION_KEY)
+            if hasher is None:
+                hasher = init_password_hasher(app)
+    return hasher
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with the current application's hasher"""
+    hasher = get_password_hasher()
+    if hasher is None:
+        return generate_password_hash(password, method=DEFAULT_METHOD, salt_length=DEFAULT_SALT_LENGTH)
+    return hasher.hash(password)
+
+
+def verify_password(pwhash: str, password: str) -> bool:
+    """Check a password with the current application's hasher"""
+    hasher = get_password_hasher()
+    if hasher is None:
+        return check_password_hash(pwhash, password)
+    return hasher.verify(pwhash, password)
+
+
+def password_needs_rehash(pwhash: str) -> bool:
+    """Whether a stored hash should be upgraded to the configured parameters"""
+    hasher = get_password_hasher()
+    method = hasher.method if hasher is not None else DEFAULT_METHOD
+    return pwhash.split('$', 1)[0] != method
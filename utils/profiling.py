@@ -0,0 +1,242 @@
+import cProfile
+import marshal
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from flask import g, request
+from typing import Any, Dict, List, Optional
+from utils.jwt_utils import JWTUtils
+from utils.query_stats import current_request_stats
+
+EXTENSION_KEY = 'request_profiler'
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAMETER = 'profile'
+
+# Sort order of the top functions -> column sorted on, largest first
+SORT_COLUMNS = {
+    'cumulative': 'cumulative_ms',
+    'tottime': 'total_ms',
+    'calls': 'calls'
+}
+
+_FALSE = ('', '0', 'false', 'no', 'off')
+
+
+def _function_name(function) -> str:
+    filename, line, name = function
+    if filename == '~':
+        # Built-ins such as '<method 'execute' of 'sqlite3.Cursor' objects>'
+        return name
+    return f'{_short_path(filename)}:{line}({name})'
+
+
+def _short_path(filename: str) -> str:
+    root = os.getcwd() + os.sep
+    if filename.startswith(root):
+        return filename[len(root):]
+    marker = os.sep + 'site-packages' + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return filename
+
+
+class RequestProfile:
+    """
+    The cProfile statistics of one profiled request
+
+    Keeps the raw pstats data, so a profile can be summarized with any
+    sort order or downloaded and opened with pstats, snakeviz and the like.
+    """
+
+    def __init__(self, stats: Dict, method: str, path: str, status: int, duration: float,
+                 user: Optional[str] = None, queries: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex[:16]
+        self.created_at = datetime.now(timezone.utc)
+        self.stats = stats
+        self.method = method
+        self.path = path
+        self.status = status
+        self.duration = duration
+        self.user = user
+        self.queries = queries
+
+    def top(self, limit: int = 30, sort: str = 'cumulative') -> List[Dict[str, Any]]:
+        """
+        The most expensive functions of the request
+
+        Args:
+            limit: Number of functions returned
+            sort: 'cumulative', 'tottime' or 'calls'
+
+        Returns:
+            List: Function name, call counts and times in milliseconds
+        """
+        rows = []
+        for function, (primitive_calls, calls, total_time, cumulative_time, _) in self.stats.items():
+            rows.append({
+                'function': _function_name(function),
+                'calls': calls,
+                'primitive_calls': primitive_calls,
+                'total_ms': round(total_time * 1000, 3),
+                'cumulative_ms': round(cumulative_time * 1000, 3)
+            })
+
+        column = SORT_COLUMNS[sort]
+        rows.sort(key=lambda row: row[column], reverse=True)
+        return rows[:limit]
+
+    def dump(self) -> bytes:
+        """The profile in the pstats file format (as written by Profile.dump_stats)"""
+        return marshal.dumps(self.stats)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'created_at': self.created_at.isoformat(),
+            'request': f'{self.method} {self.path}',
+            'status': self.status,
+            'duration_ms': round(self.duration * 1000, 2),
+            'user': self.user,
+            'queries': self.queries,
+            'functions': len(self.stats)
+        }
+
+    def to_dict(self, limit: int = 30, sort: str = 'cumulative') -> Dict[str, Any]:
+        return {**self.summary(), 'sort': sort, 'top': self.top(limit, sort)}
+
+
+class RequestProfiler:
+    """
+    Profiles single requests on demand and keeps the latest profiles
+
+    A request is profiled when it carries the X-Profile header or the
+    profile query parameter and an admin token; the flag is ignored for
+    everyone else. Requests without the flag only pay for the header and
+    parameter lookup.
+    """
+
+    def __init__(self, history: int = 20, top: int = 30):
+        self.history = history
+        self.top = top
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.history:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def profiles(self) -> List[RequestProfile]:
+        """Kept profiles, newest first"""
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+    def clear(self) -> int:
+        with self._lock:
+            dropped = len(self._profiles)
+            self._profiles.clear()
+        return dropped
+
+
+def _requested() -> bool:
+    flag = request.headers.get(PROFILE_HEADER)
+    if flag is None:
+        flag = request.args.get(PROFILE_PARAMETER)
+    return flag is not None and flag.strip().lower() not in _FALSE
+
+
+def _admin_email() -> Optional[str]:
+    """The e-mail of the admin the request's token belongs to, or None"""
+    parts = request.headers.get('Authorization', '').split(' ')
+    if len(parts) != 2:
+        return None
+
+    result = JWTUtils.verify_token_cached(parts[1])
+    if not result['success'] or result['data'].get('role') != 'admin':
+        return None
+    return result['data'].get('email', '')
+
+
+def init_profiling(app) -> Optional[RequestProfiler]:
+    """
+    Let admins profile single requests of an application with cProfile
+
+    Send 'X-Profile: 1' (or ?profile=1) with an admin token: the request
+    runs under cProfile, the response gets an X-Profile-Id header, and the
+    profile is kept for the admin diagnostics endpoints, which return the
+    top functions or the raw pstats file. PROFILE_HISTORY_SIZE profiles are
+    kept; a size of 0 turns profiling off.
+
+    Args:
+        app: Flask application
+
+    Returns:
+        RequestProfiler: The profiler, or None when turned off
+    """
+    history = int(app.config.get('PROFILE_HISTORY_SIZE', 20))
+    if history <= 0:
+        app.extensions.pop(EXTENSION_KEY, None)
+        return None
+
+    profiler = RequestProfiler(history=history, top=int(app.config.get('PROFILE_TOP_FUNCTIONS', 30)))
+
+    @app.before_request
+    def _start_profile():
+        if not _requested():
+            return
+
+        user = _admin_email()
+        if user is None:
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return
+        g.profile = profile
+        g.profile_user = user
+        g.profile_started = time.perf_counter()
+
+    @app.after_request
+    def _finish_profile(response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+
+        profile.disable()
+        duration = time.perf_counter() - g.profile_started
+        profile.create_stats()
+
+        stats = current_request_stats()
+        result = RequestProfile(
+            profile.stats,
+            method=request.method,
+            path=request.path,
+            status=response.status_code,
+            duration=duration,
+            user=g.profile_user,
+            queries=stats.to_dict() if stats is not None else None
+        )
+        profiler.add(result)
+        response.headers['X-Profile-Id'] = result.id
+        return response
+
+    @app.teardown_request
+    def _discard_profile(exc):
+        # Only left over when the request failed before after_request ran
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.disable()
+
+    app.extensions[EXTENSION_KEY] = profiler
+    return profiler
@@ -0,0 +1,211 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from typing import Any, Dict, Iterator, List, Optional
+
+LOGGER_NAME = 'accounting.queries'
+STATEMENT_PREVIEW = 300
+
+# Collectors receiving the statements of the current request or block;
+# nested blocks each see every statement run inside them
+_collectors = ContextVar('query_collectors', default=())
+
+
+def _preview(statement: str) -> str:
+    statement = ' '.join(statement.split())
+    if len(statement) > STATEMENT_PREVIEW:
+        return statement[:STATEMENT_PREVIEW] + '...'
+    return statement
+
+
+class QueryStats:
+    """
+    Statements run while a collector is active
+
+    Keeps the statement count, the total database time and the slowest
+    statement, and counts how often each statement text repeats: the
+    same SELECT issued once per row of a listing is the signature of an
+    N+1 query pattern.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+        self.statements: List[str] = []
+        self._repeats = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.statements.append(statement)
+        self._repeats[statement] += 1
+        if self.slowest_statement is None or duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+    def repeated(self, threshold: int) -> List[Dict[str, Any]]:
+        """
+        Statements run at least threshold times, most repeated first
+
+        Args:
+            threshold: Smallest repeat count reported
+
+        Returns:
+            List: Statement previews with their counts
+        """
+        return [
+            {'statement': _preview(statement), 'count': count}
+            for statement, count in self._repeats.most_common()
+            if count >= threshold
+        ]
+
+    def to_dict(self, repeat_threshold: int = None) -> Dict[str, Any]:
+        data = {
+            'queries': self.count,
+            'db_ms': round(self.total_time * 1000, 2),
+            'slowest_ms': round(self.slowest_time * 1000, 2),
+            'slowest': _preview(self.slowest_statement) if self.slowest_statement else None
+        }
+        if repeat_threshold:
+            data['repeated'] = self.repeated(repeat_threshold)
+        return data
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if _collectors.get() and context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    collectors = _collectors.get()
+    started = getattr(context, '_query_started', None)
+    if not collectors or started is None:
+        return
+
+    duration = time.perf_counter() - started
+    for stats in collectors:
+        stats.record(statement, duration)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Collect the statements run inside the block, on every engine
+
+    Returns:
+        Iterator: The QueryStats filled while the block runs
+    """
+    stats = QueryStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """
+    Fail when the block runs more than limit statements
+
+    Meant for tests that lock in the query budget of a route or service
+    call; the failure lists the statements that were run.
+
+    Args:
+        limit: Largest allowed statement count
+
+    Raises:
+        AssertionError: If the budget is exceeded
+    """
+    with track_queries() as stats:
+        yield stats
+
+    if stats.count > limit:
+        listing = '\n'.join(f'  {index}. {_preview(statement)}' for index, statement in enumerate(stats.statements, 1))
+        raise AssertionError(f'Expected at most {limit} queries, {stats.count} were run:\n{listing}')
+
+
+def current_request_stats() -> Optional[QueryStats]:
+    """The statements of the current request so far, or None when not tracked"""
+    return g.get('query_stats') if has_request_context() else None
+
+
+def server_timing(stats: QueryStats, total_time: Optional[float] = None) -> str:
+    """
+    Server-Timing header value for a request's database work
+
+    Args:
+        stats: Statements of the request
+        total_time: Whole request time in seconds (optional)
+
+    Returns:
+        str: Header value
+    """
+    noun = 'query' if stats.count == 1 else 'queries'
+    metrics = [f'db;dur={stats.total_time * 1000:.2f};desc="{stats.count} {noun}"']
+    if stats.count:
+        metrics.append(f'db-slowest;dur={stats.slowest_time * 1000:.2f}')
+    if total_time is not None:
+        metrics.append(f'total;dur={total_time * 1000:.2f}')
+    return ', '.join(metrics)
+
+
+def init_query_stats(app) -> None:
+    """
+    Track the SQL statements of every request of an application
+
+    Each response gets a Server-Timing header with the statement count
+    and database time, and one JSON log line is written per request to
+    the 'accounting.queries' logger: at INFO normally, at WARNING when a
+    statement repeated QUERY_REPEAT_THRESHOLD times or more (a likely
+    N+1 pattern). QUERY_STATS_ENABLED=False turns it all off.
+
+    Args:
+        app: Flask application
+    """
+    if not app.config.get('QUERY_STATS_ENABLED', True):
+        return
+
+    logger = logging.getLogger(LOGGER_NAME)
+
+    @app.before_request
+    def _start_query_stats():
+        g.query_stats = QueryStats()
+        g.query_stats_started = time.perf_counter()
+        g.query_stats_token = _collectors.set(_collectors.get() + (g.query_stats,))
+
+    @app.after_request
+    def _report_query_stats(response):
+        stats = g.get('query_stats')
+        if stats is None:
+            return response
+
+        total_time = time.perf_counter() - g.query_stats_started
+        response.headers['Server-Timing'] = server_timing(stats, total_time)
+
+        threshold = app.config.get('QUERY_REPEAT_THRESHOLD', 5)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_time * 1000, 2),
+            **stats.to_dict(repeat_threshold=threshold)
+        }
+        logger.log(logging.WARNING if record.get('repeated') else logging.INFO, json.dumps(record))
+        return response
+
+    @app.teardown_request
+    def _stop_query_stats(exc):
+        token = g.pop('query_stats_token', None)
+        if token is not None:
+            _collectors.reset(token)
@@ -0,0 +1,234 @@
+import inspect
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from flask import current_app, has_app_context
+from flask_sqlalchemy.session import Session
+from functools import wraps
+from sqlalchemy import TextClause, text
+from typing import Any, Callable, Dict, Optional
+
+REPLICA_BIND = 'replica'
+HEARTBEAT_TABLE = 'replication_heartbeat'
+EXTENSION_KEY = 'replica_router'
+
+PRIMARY = 'primary'
+REPLICA = 'replica'
+
+# Where the statements of the current call may go: None (primary, the
+# default), REPLICA inside read_only calls, PRIMARY when pinned by primary
+_target = ContextVar('database_target', default=None)
+
+
+def _route(target: str, function: Callable) -> Callable:
+    def enter():
+        if target == REPLICA and _target.get() == PRIMARY:
+            return None
+        return _target.set(target)
+
+    def leave(token):
+        if token is not None:
+            _target.reset(token)
+
+    if inspect.isgeneratorfunction(function):
+        # Route each step of the generator, not the caller between steps
+        @wraps(function)
+        def generator(*args, **kwargs):
+            iterator = function(*args, **kwargs)
+            while True:
+                token = enter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    leave(token)
+                yield item
+        return generator
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        token = enter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            leave(token)
+    return wrapper
+
+
+def read_only(function: Callable) -> Callable:
+    """
+    Mark a service method as read-only so its queries may use the replica
+
+    Has no effect inside a primary call, and statements issued while the
+    session holds unflushed or uncommitted writes still go to the primary.
+    """
+    return _route(REPLICA, function)
+
+
+def primary(function: Callable) -> Callable:
+    """Pin a method's queries, and those of read_only methods it calls, to the primary"""
+    return _route(PRIMARY, function)
+
+
+def current_target() -> str:
+    """'replica' inside a read_only call, otherwise 'primary'"""
+    return REPLICA if _target.get() == REPLICA else PRIMARY
+
+
+def _is_read(clause) -> bool:
+    if clause is None:
+        return True
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip().upper().startswith('SELECT')
+    return bool(getattr(clause, 'is_select', False))
+
+
+def _heartbeat_time(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+class ReplicaRouter:
+    """
+    Decides whether reads may go to the replica engine
+
+    The replica is used while its copy of the primary's heartbeat is at
+    most max_lag seconds old. The lag is re-read at most once every
+    check_interval seconds.
+    """
+
+    def __init__(self, replica_engine, max_lag: float = 30, check_interval: float = 1.0):
+        self.replica_engine = replica_engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+        self._lag = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def read_lag(self) -> Optional[float]:
+        """
+        Seconds since the heartbeat the replica holds was written
+
+        Returns:
+            float: Lag in seconds, or None when the replica has no heartbeat
+            or cannot be read
+        """
+        try:
+            with self.replica_engine.connect() as connection:
+                beat_at = connection.execute(
+                    text(f'SELECT beat_at FROM {HEARTBEAT_TABLE} WHERE id = 1')
+                ).scalar()
+        except Exception:
+            return None
+
+        beat_at = _heartbeat_time(beat_at)
+        if beat_at is None:
+            return None
+        return max(0.0, (datetime.utcnow() - beat_at).total_seconds())
+
+    def lag(self) -> Optional[float]:
+        """Replica lag, re-read when the last reading is older than check_interval"""
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return self._lag
+
+        lag = self.read_lag()
+        with self._lock:
+            self._lag = lag
+            self._checked_at = now
+        return lag
+
+    def engine_for_read(self):
+        """
+        The replica engine if it is within the lag tolerance, else None
+
+        Returns:
+            Engine: Replica engine or None
+        """
+        lag = self.lag()
+        with self._lock:
+            if lag is not None and lag <= self.max_lag:
+                self.replica_reads += 1
+                return self.replica_engine
+            self.primary_fallbacks += 1
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Last measured lag, tolerance and routing counters"""
+        with self._lock:
+            return {
+                'lag': self._lag,
+                'max_lag': self.max_lag,
+                'replica_reads': self.replica_reads,
+                'primary_fallbacks': self.primary_fallbacks
+            }
+
+
+class RoutingSession(Session):
+    """
+    Session sending the reads of read_only calls to the replica engine
+
+    Flushes, non-SELECT statements and every statement of a transaction
+    that has written something go to the primary, so a request always
+    reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and _target.get() == REPLICA
+            and not self._flushing
+            and _is_read(clause)
+            and not self._has_writes()
+            and has_app_context()
+        ):
+            router = current_app.extensions.get(EXTENSION_KEY)
+            if router is not None:
+                engine = router.engine_for_read()
+                if engine is not None:
+                    return engine
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _has_writes(self) -> bool:
+        return not self._is_clean() or bool(self.info.get('written_tables'))
+
+
+def init_replica(app, database) -> Optional[ReplicaRouter]:
+    """
+    Route read_only calls to the 'replica' bind when one is configured
+
+    Args:
+        app: Flask application, already initialized with the extension
+        database: Flask-SQLAlchemy extension
+
+    Returns:
+        ReplicaRouter: The router, or None without a replica bind
+    """
+    with app.app_context():
+        replica_engine = database.engines.get(REPLICA_BIND)
+
+    if replica_engine is None:
+        app.extensions.pop(EXTENSION_KEY, None)
+        return None
+
+    # The replica copies the primary's tables and has no models of its own.
+    # Its empty metadata would make create_all and drop_all of every app
+    # sharing the extension look for a 'replica' bind, so it is removed.
+    metadata = database.metadatas.get(REPLICA_BIND)
+    if metadata is not None and not metadata.tables:
+        del database.metadatas[REPLICA_BIND]
+
+    router = ReplicaRouter(
+        replica_engine,
+        max_lag=float(app.config.get('REPLICA_MAX_LAG', 30)),
+        check_interval=float(app.config.get('REPLICA_LAG_CHECK_INTERVAL', 1.0))
+    )
+    app.extensions[EXTENSION_KEY] = router
+    return router
@@ -0,0 +1,53 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class IntervalJob:
+    """
+    Run a function every interval seconds on a daemon thread
+
+    The first run happens one interval after start(). Exceptions raised by
+    the function are kept in last_error and do not stop the job.
+    """
+
+    def __init__(self, name: str, interval: float, function: Callable[[], Any]):
+        self.name = name
+        self.interval = interval
+        self.function = function
+        self.runs = 0
+        self.last_result = None
+        self.last_error = None
+        self.last_run_at = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> 'IntervalJob':
+        """Start the background thread (no-op if already running)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background thread and wait for it to exit"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self) -> Any:
+        """Run the function now, recording its result or error"""
+        self.last_run_at = time.time()
+        try:
+            self.last_result = self.function()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = e
+        finally:
+            self.runs += 1
+        return self.last_result
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.run_once()
@@ -0,0 +1,34 @@
+from sqlalchemy import inspect
+from typing import List
+
+
+def ensure_indexes(engine, metadata) -> List[str]:
+    """
+    Create the indexes declared on the models that the database lacks
+    
+    create_all() only creates indexes together with new tables, so a
+    database created before an index was declared is brought up to date
+    here. Tables that do not exist yet are skipped.
+    
+    Args:
+        engine: SQLAlchemy engine
+        metadata: Metadata holding the model tables
+    
+    Returns:
+        List: Names of the indexes created
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in existing:
+                index.create(engine)
+                created.append(index.name)
+    
+    return created
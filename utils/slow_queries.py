@@ -0,0 +1,220 @@
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from flask import has_request_context, request
+from sqlalchemy import event
+from typing import Any, Dict, List, Optional
+
+EXTENSION_KEY = 'slow_query_log'
+LOGGER_NAME = 'accounting.slow_queries'
+REDACTED = '<redacted>'
+MAX_PARAMETER_SETS = 5
+
+# EXPLAIN prefix per dialect; statements of other dialects are logged without a plan
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+    'mysql': 'EXPLAIN '
+}
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+# Dates and timestamps reach the driver as ISO strings; they are kept since
+# report plans depend on them and they identify no one
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$')
+
+
+def redact(value: Any) -> Any:
+    """
+    A bound parameter value safe to log
+
+    Numbers, booleans, NULLs and dates are kept; any other text or binary
+    value (names, e-mail addresses, password hashes, search terms) is
+    replaced by a placeholder.
+    """
+    if value is None or isinstance(value, (bool, int, float, Decimal, date)):
+        return value.isoformat() if isinstance(value, date) else value
+    if isinstance(value, str) and _ISO_DATE.match(value):
+        return value
+    return REDACTED
+
+
+def _named_parameters(parameters, context) -> Any:
+    if isinstance(parameters, dict):
+        return {name: redact(value) for name, value in parameters.items()}
+
+    # Positional drivers (SQLite) get a tuple; the compiled statement knows the names
+    values = [redact(value) for value in parameters]
+    names = getattr(getattr(context, 'compiled', None), 'positiontup', None)
+    if names and len(names) == len(values):
+        return dict(zip(names, values))
+    return values
+
+
+def _calling_service() -> Optional[str]:
+    """The innermost services.* function on the stack, as 'module:Qualified.name'"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith('services.'):
+            code = frame.f_code
+            return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+        frame = frame.f_back
+    return None
+
+
+def _explain(connection, statement: str, parameters) -> Optional[List[str]]:
+    prefix = EXPLAIN_PREFIXES.get(connection.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+
+    # Run on the raw DBAPI cursor: no engine events fire, so the EXPLAIN is
+    # neither timed nor counted in the request's query stats
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [str(row[-1]) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """
+    Bounded, thread-safe ring buffer of statements slower than a threshold
+
+    Each entry holds the statement, its duration, the redacted bound
+    parameters, the service method that issued it, the request it ran in
+    and, when explain is on, the statement's plan. Once size entries are
+    held, the oldest is dropped for each new one.
+    """
+
+    def __init__(self, threshold_ms: float = 200, size: int = 100, explain: bool = True):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.recorded = 0
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger(LOGGER_NAME)
+
+    @property
+    def size(self) -> int:
+        return self._entries.maxlen
+
+    def attach(self, engine, bind: Optional[str] = None) -> None:
+        """Time every statement run on an engine"""
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _start_timer(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._slow_query_started = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _check_duration(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, '_slow_query_started', None)
+            if started is None:
+                return
+
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= self.threshold_ms:
+                self.record(conn, statement, parameters, context, executemany, duration_ms, bind)
+
+    def record(self, connection, statement: str, parameters, context, executemany: bool,
+               duration_ms: float, bind: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Add a slow statement to the buffer and the slow query log
+
+        Returns:
+            Dict: The recorded entry
+        """
+        entry = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': round(duration_ms, 2),
+            'bind': bind or 'default',
+            'statement': ' '.join(statement.split()),
+            'caller': _calling_service(),
+            'request': f'{request.method} {request.path}' if has_request_context() else None
+        }
+
+        if executemany:
+            entry['parameters'] = [_named_parameters(p, context) for p in parameters[:MAX_PARAMETER_SETS]]
+            entry['parameter_sets'] = len(parameters)
+        else:
+            entry['parameters'] = _named_parameters(parameters, context)
+
+        entry['plan'] = None
+        if self.explain and not executemany:
+            try:
+                entry['plan'] = _explain(connection, statement, parameters)
+            except Exception as e:
+                entry['plan_error'] = str(e)
+
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+
+        self._logger.warning(json.dumps(entry, default=str))
+        return entry
+
+    def entries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recorded entries, newest first"""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        return entries[:limit] if limit is not None else entries
+
+    def clear(self) -> int:
+        """Empty the buffer and return how many entries were dropped"""
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+        return dropped
+
+    def to_dict(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            'threshold_ms': self.threshold_ms,
+            'size': self.size,
+            'explain': self.explain,
+            'recorded': self.recorded,
+            'entries': self.entries(limit)
+        }
+
+
+def init_slow_query_log(app, database) -> Optional[SlowQueryLog]:
+    """
+    Record the statements of an application slower than SLOW_QUERY_THRESHOLD_MS
+
+    Watches every engine of the extension (the primary and any binds such
+    as the replica). SLOW_QUERY_LOG_SIZE entries are kept in memory for
+    the admin diagnostics endpoint; SLOW_QUERY_EXPLAIN=False skips the
+    plan capture, and a size of 0 turns the log off.
+
+    Args:
+        app: Flask application, already initialized with the extension
+        database: Flask-SQLAlchemy extension
+
+    Returns:
+        SlowQueryLog: The log, or None when turned off
+    """
+    size = int(app.config.get('SLOW_QUERY_LOG_SIZE', 100))
+    if size <= 0:
+        app.extensions.pop(EXTENSION_KEY, None)
+        return None
+
+    explain = app.config.get('SLOW_QUERY_EXPLAIN', True)
+    if isinstance(explain, str):
+        explain = explain.strip().lower() in ('1', 'true', 'yes', 'on')
+
+    log = SlowQueryLog(
+        threshold_ms=float(app.config.get('SLOW_QUERY_THRESHOLD_MS', 200)),
+        size=size,
+        explain=bool(explain)
+    )
+    with app.app_context():
+        for bind, engine in database.engines.items():
+            log.attach(engine, bind)
+
+    app.extensions[EXTENSION_KEY] = log
+    return log